@@ -0,0 +1,78 @@
+import random
+from typing import Dict, List, Optional
+from parser import Grammar, NonTerminal, Terminal
+from compiled_grammar import CompiledGrammar
+from earley import EarleyRecognizer
+from sppf import ParseForest
+from stack import EMPTY_STACK
+
+
+def random_string(
+    compiled: CompiledGrammar, rng: random.Random, max_length: int
+) -> Optional[str]:
+    # Leftmost random derivation. Alternatives are picked uniformly among those that
+    # keep the shortest string derivable from the stack within `max_length`; the
+    # alternative of the shortest yield always does, so there is one at every step.
+    # `None` if the start symbol derives no strings of at most `max_length`.
+    start = compiled.start
+    stack = EMPTY_STACK.push(start, compiled.bounds(start))
+    if stack.min_yield > max_length:
+        return None
+
+    result: List[str] = []
+    length = 0
+
+    while len(stack):
+        (single, stack) = stack.pop()
+        obj = single.object
+
+        if isinstance(obj, Terminal):
+            result.append(obj.value)
+            length += len(obj.value)
+        elif isinstance(obj, NonTerminal):
+            expansions = [
+                stack.push_sequence(values, bounds)
+                for (values, bounds) in zip(
+                    compiled.alternatives[obj.value],
+                    compiled.alternative_bounds[obj.value],
+                )
+            ]
+            stack = rng.choice(
+                [
+                    expansion
+                    for expansion in expansions
+                    if length + expansion.min_yield <= max_length
+                ]
+            )
+
+    return "".join(result)
+
+
+def find_ambiguous_nonterminals(
+    grammar: Grammar,
+    samples: int = 200,
+    max_length: int = 16,
+    seed: Optional[int] = None,
+) -> Dict[str, str]:
+    # Samples random strings of the grammar and maps every non-terminal that derives
+    # some span of a sampled string in several ways to the shortest such string.
+    # Non-terminals that are not reported may still be ambiguous on other strings.
+    compiled = CompiledGrammar(grammar)
+    recognizer = EarleyRecognizer(grammar)
+    rng = random.Random(seed)
+    witnesses: Dict[str, str] = {}
+    seen = set()
+
+    for _ in range(samples):
+        string = random_string(compiled, rng, max_length)
+        if string is None:
+            break
+        if string in seen:
+            continue
+        seen.add(string)
+
+        for nonterm in ParseForest(recognizer.chart(string)).ambiguous_nonterminals():
+            if nonterm not in witnesses or len(string) < len(witnesses[nonterm]):
+                witnesses[nonterm] = string
+
+    return witnesses
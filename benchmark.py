@@ -0,0 +1,112 @@
+import argparse
+import time
+from typing import Callable, List
+from parser import (
+    Grammar,
+    Multiple,
+    Root,
+    Rule,
+    Ruleset,
+    SYMBOLS,
+    Single,
+    Start,
+    get_non_terminals,
+    get_terminals,
+)
+from transformer import Transformer
+
+
+def layered_grammar(layers: int) -> Grammar:
+    # Expression-like grammar of `layers` levels of precedence:
+    #
+    # Ni → Ni oi Ni+1 | Ni+1 Ri | ti
+    # Ri → ri Ri | ε
+    #
+    # with left recursion, nullable non-terminals and alternatives that start with
+    # the next level, so that the Greibah weak form has about 4ⁿ alternatives.
+    rules: List[Rule] = []
+    for i in range(layers):
+        nonterm = SYMBOLS.nonterminal(f"N{i}")
+        rest = SYMBOLS.nonterminal(f"R{i}")
+        if i + 1 < layers:
+            following = SYMBOLS.nonterminal(f"N{i + 1}")
+        else:
+            following = SYMBOLS.terminal(f"t{i}")
+
+        rules.append(
+            Rule(
+                nonterm,
+                [
+                    Multiple(
+                        [
+                            Single(nonterm),
+                            Single(SYMBOLS.terminal(f"o{i}")),
+                            Single(following),
+                        ]
+                    ),
+                    Multiple([Single(following), Single(rest)]),
+                    Multiple([Single(SYMBOLS.terminal(f"t{i}"))]),
+                ],
+            )
+        )
+        rules.append(
+            Rule(
+                rest,
+                [
+                    Multiple([Single(SYMBOLS.terminal(f"r{i}")), Single(rest)]),
+                    Multiple([Single(SYMBOLS.empty)]),
+                ],
+            )
+        )
+
+    ast = Root(Start(SYMBOLS.nonterminal("N0")), Ruleset(rules))
+    return Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+
+
+def count_alternatives(grammar: Grammar) -> int:
+    return sum(len(rule.values) for rule in grammar.ast.ruleset.rules)
+
+
+def measure(convert: Callable[[Grammar], Grammar], grammar: Grammar, repeat: int):
+    # best time of `repeat` conversions and the converted grammar
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = convert(grammar)
+        best = min(best, time.perf_counter() - start)
+    return (best, result)
+
+
+def main():
+    arguments = argparse.ArgumentParser(
+        description="Measures conversions of generated grammars with many productions "
+        "into Greibah weak form and Chomsky normal form."
+    )
+    arguments.add_argument(
+        "layers",
+        type=int,
+        nargs="*",
+        default=[5, 6, 7],
+        help="numbers of levels of the generated grammars (default: 5 6 7)",
+    )
+    arguments.add_argument(
+        "--repeat", type=int, default=3, help="conversions of every grammar"
+    )
+    args = arguments.parse_args()
+
+    tr = Transformer()
+    print(
+        f"{'layers':>6} {'productions':>11} {'gwf':>8} {'gwf time':>9} {'cnf time':>9}"
+    )
+    for layers in args.layers:
+        grammar = layered_grammar(layers)
+        (gwf_time, gwf) = measure(tr.to_greibah_weak_form, grammar, args.repeat)
+        (cnf_time, _) = measure(tr.to_chomsky_normal_form, grammar, args.repeat)
+        print(
+            f"{layers:>6} {count_alternatives(grammar):>11} "
+            f"{count_alternatives(gwf):>8} {gwf_time:>8.3f}s {cnf_time:>8.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Tuple
+from parser import Grammar, NonTerminal, Single, Terminal
+from transformer import Transformer
+
+# lower and upper bound of the length of a string derived from a symbol
+Bounds = Tuple[float, float]
+
+INFINITY = float("inf")
+# bounds of a non-terminal that derives no strings at all
+EMPTY_LANGUAGE: Bounds = (INFINITY, INFINITY)
+
+
+class TerminalTrie:
+    # trie of terminals, finds all terminals that prefix the input in a single walk
+
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, TerminalTrie] = {}
+        self.terminal: Optional[str] = None
+
+    def add(self, terminal: str) -> None:
+        node = self
+        for char in terminal:
+            if char not in node.children:
+                node.children[char] = TerminalTrie()
+            node = node.children[char]
+        node.terminal = terminal
+
+    def matches(self, string: str, position: int) -> Iterator[str]:
+        # yields terminals `t` with `string.startswith(t, position)`, shortest first
+        node = self
+        for index in range(position, len(string)):
+            node = node.children.get(string[index])
+            if node is None:
+                return
+            if node.terminal is not None:
+                yield node.terminal
+
+    def token(self, string: str, position: int) -> Optional[str]:
+        # shortest terminal at `position`, the only one if terminals are not prefixes of
+        # each other as in LL(1) and LALR(1) parsing
+        return next(self.matches(string, position), None)
+
+
+class CompiledGrammar:
+    # read-only tables of a grammar in Greibah weak form for the evaluation loop:
+    # alternatives by non-terminal and by leading terminal, nullable non-terminals and
+    # yield bounds of every non-terminal
+
+    start: Single
+    alternatives: Mapping[str, Tuple[Tuple[Single, ...], ...]]
+    nullable: FrozenSet[str]
+    terminals: TerminalTrie
+    yield_bounds: Mapping[str, Bounds]
+    alternative_bounds: Mapping[str, Tuple[Tuple[Bounds, ...], ...]]
+
+    def __init__(self, grammar: Grammar):
+        tr = Transformer()
+
+        alternatives: dict[str, list[Tuple[Single, ...]]] = {}
+
+        for rule in grammar.ast.ruleset.rules:
+            alternatives.setdefault(rule.variable.value, []).extend(
+                tuple(multiple.values) for multiple in rule.values
+            )
+
+        self.start = Single(grammar.ast.start.variable)
+        self.alternatives = MappingProxyType(
+            {nonterm: tuple(values) for (nonterm, values) in alternatives.items()}
+        )
+        self.nullable = frozenset(tr.get_epsilon_generating_nonterminals(grammar))
+
+        # indices of alternatives by leading terminal; alternatives that do not start
+        # with a terminal are tried unconditionally
+        self.terminals = TerminalTrie()
+        self._by_leading_terminal: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        self._unconditional: Dict[str, Tuple[int, ...]] = {}
+
+        for (nonterm, values) in self.alternatives.items():
+            by_terminal: Dict[str, List[int]] = {}
+            unconditional: List[int] = []
+
+            for (index, singles) in enumerate(values):
+                if len(singles) and isinstance(singles[0].object, Terminal):
+                    terminal = singles[0].object.value
+                    self.terminals.add(terminal)
+                    by_terminal.setdefault(terminal, []).append(index)
+                else:
+                    unconditional.append(index)
+
+            self._by_leading_terminal[nonterm] = {
+                terminal: tuple(indices) for (terminal, indices) in by_terminal.items()
+            }
+            self._unconditional[nonterm] = tuple(unconditional)
+
+        self._compute_yield_bounds()
+
+    def __getstate__(self) -> dict:
+        # mapping proxies cannot be pickled, worker processes get plain dictionaries
+        return {
+            name: dict(value) if isinstance(value, MappingProxyType) else value
+            for (name, value) in self.__dict__.items()
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        for name in ("alternatives", "yield_bounds", "alternative_bounds"):
+            state[name] = MappingProxyType(state[name])
+        self.__dict__.update(state)
+
+    def alternatives_at(
+        self, nonterminal: str, string: str, position: int
+    ) -> List[Tuple[Single, ...]]:
+        # alternatives of `nonterminal` that may match `string` from `position`,
+        # in the order they are listed in the grammar
+        values = self.alternatives.get(nonterminal, ())
+        return [
+            values[index] for index in self._indices_at(nonterminal, string, position)
+        ]
+
+    def expansions_at(
+        self, nonterminal: str, string: str, position: int
+    ) -> List[Tuple[Tuple[Single, ...], Tuple[Bounds, ...]]]:
+        # same as `alternatives_at` but pairs every alternative with the yield bounds
+        # of its singles, ready to be pushed onto the stack
+        values = self.alternatives.get(nonterminal, ())
+        bounds = self.alternative_bounds.get(nonterminal, ())
+        return [
+            (values[index], bounds[index])
+            for index in self._indices_at(nonterminal, string, position)
+        ]
+
+    def bounds(self, single: Single) -> Bounds:
+        # bounds of the length of a string derived from `single`
+        obj = single.object
+        if isinstance(obj, Terminal):
+            return (len(obj.value), len(obj.value))
+        if isinstance(obj, NonTerminal):
+            return self.yield_bounds.get(obj.value, EMPTY_LANGUAGE)
+        return (0, 0)
+
+    def _indices_at(self, nonterminal: str, string: str, position: int) -> List[int]:
+        if nonterminal not in self.alternatives:
+            return []
+
+        by_terminal = self._by_leading_terminal[nonterminal]
+        indices = list(self._unconditional[nonterminal])
+        for terminal in self.terminals.matches(string, position):
+            indices += by_terminal.get(terminal, ())
+
+        if len(indices) > 1:
+            indices.sort()
+        return indices
+
+    def _compute_yield_bounds(self) -> None:
+        # Minimal yields: fixpoint starting from infinity (non-productive non-terminals
+        # keep it). Maximal yields are infinite for non-terminals that reach a pumping
+        # cycle `A ⇒+ αAβ` where `αβ` derives a non-empty string; for the rest the
+        # fixpoint starting from minus infinity converges.
+        min_yield: Dict[str, float] = {
+            nonterm: INFINITY for nonterm in self.alternatives
+        }
+        max_yield: Dict[str, float] = {
+            nonterm: -INFINITY for nonterm in self.alternatives
+        }
+
+        def symbol_min(single: Single) -> float:
+            obj = single.object
+            if isinstance(obj, Terminal):
+                return len(obj.value)
+            if isinstance(obj, NonTerminal):
+                return min_yield.get(obj.value, INFINITY)
+            return 0
+
+        def symbol_max(single: Single) -> float:
+            obj = single.object
+            if isinstance(obj, Terminal):
+                return len(obj.value)
+            if isinstance(obj, NonTerminal):
+                return max_yield.get(obj.value, -INFINITY)
+            return 0
+
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, values) in self.alternatives.items():
+                for singles in values:
+                    value = sum(symbol_min(single) for single in singles)
+                    if value < min_yield[nonterm]:
+                        min_yield[nonterm] = value
+                        changed = True
+
+        productive_alternatives = {
+            nonterm: [
+                singles
+                for singles in values
+                if all(symbol_min(single) != INFINITY for single in singles)
+            ]
+            for (nonterm, values) in self.alternatives.items()
+        }
+
+        # non-terminals that derive at least one non-empty string
+        non_empty: Set[str] = set()
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, values) in productive_alternatives.items():
+                if nonterm in non_empty:
+                    continue
+                for singles in values:
+                    if any(
+                        isinstance(single.object, Terminal)
+                        or single.object.value in non_empty
+                        for single in singles
+                    ):
+                        non_empty.add(nonterm)
+                        changed = True
+                        break
+
+        def is_non_empty(single: Single) -> bool:
+            return (
+                isinstance(single.object, Terminal) or single.object.value in non_empty
+            )
+
+        # A -> B edges over productive alternatives; growing ones have other
+        # singles next to B that derive something
+        edges: Dict[str, Set[str]] = {nonterm: set() for nonterm in self.alternatives}
+        growing_edges: List[Tuple[str, str]] = []
+        for (nonterm, values) in productive_alternatives.items():
+            for singles in values:
+                for (index, single) in enumerate(singles):
+                    if not isinstance(single.object, NonTerminal):
+                        continue
+                    edges[nonterm].add(single.object.value)
+                    if any(
+                        is_non_empty(other)
+                        for (other_index, other) in enumerate(singles)
+                        if other_index != index
+                    ):
+                        growing_edges.append((nonterm, single.object.value))
+
+        def reachable(nonterm: str) -> Set[str]:
+            result: Set[str] = set()
+            pending = [nonterm]
+            while len(pending):
+                for target in edges.get(pending.pop(), ()):
+                    if target not in result:
+                        result.add(target)
+                        pending.append(target)
+            return result
+
+        reachable_from = {nonterm: reachable(nonterm) for nonterm in self.alternatives}
+        pumping = {
+            source
+            for (source, target) in growing_edges
+            if source in reachable_from.get(target, ())
+        }
+
+        for nonterm in self.alternatives:
+            if min_yield[nonterm] == INFINITY:
+                continue
+            if nonterm in pumping or len(reachable_from[nonterm] & pumping):
+                max_yield[nonterm] = INFINITY
+
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, values) in productive_alternatives.items():
+                for singles in values:
+                    value = sum(symbol_max(single) for single in singles)
+                    if value > max_yield[nonterm]:
+                        max_yield[nonterm] = value
+                        changed = True
+
+        self.yield_bounds = MappingProxyType(
+            {
+                nonterm: (
+                    min_yield[nonterm], max(max_yield[nonterm], min_yield[nonterm])
+                )
+                for nonterm in self.alternatives
+            }
+        )
+        self.alternative_bounds = MappingProxyType(
+            {
+                nonterm: tuple(
+                    tuple(self.bounds(single) for single in singles)
+                    for singles in values
+                )
+                for (nonterm, values) in self.alternatives.items()
+            }
+        )
@@ -0,0 +1,114 @@
+from typing import Dict, List, Sequence
+import numpy as np
+from parser import Grammar, NonTerminal, Terminal
+from transformer import Transformer
+
+
+class CYKRecognizer:
+    # CYK recognizer over the grammar in Chomsky normal form; the chart of a batch of
+    # strings of one length is a boolean array `[string, start, length, non-terminal]`
+    # filled span length by span length with array operations
+
+    nonterminals: List[str]
+    # terminal -> indices of non-terminals `A` such that `A → terminal`
+    terminal_rules: Dict[str, np.ndarray]
+    accepts_empty: bool
+
+    def __init__(self, grammar: Grammar):
+        tr = Transformer()
+        self.grammar = tr.to_chomsky_normal_form(grammar)
+
+        self.nonterminals = sorted(self.grammar.non_terminals)
+        index = {nonterm: i for (i, nonterm) in enumerate(self.nonterminals)}
+        self.start = index[self.grammar.ast.start.variable.value]
+        self.accepts_empty = False
+
+        terminal_rules: Dict[str, List[int]] = {}
+        binary_rules: List[List[int]] = []
+
+        for rule in self.grammar.ast.ruleset.rules:
+            for multiple in rule.values:
+                objects = [single.object for single in multiple.values]
+                head = index[rule.variable.value]
+
+                if len(objects) == 2:
+                    binary_rules.append(
+                        [head, index[objects[0].value], index[objects[1].value]]
+                    )
+                elif isinstance(objects[0], Terminal):
+                    terminal_rules.setdefault(objects[0].value, []).append(head)
+                elif not isinstance(objects[0], NonTerminal):
+                    self.accepts_empty = True
+
+        self.terminal_rules = {
+            terminal: np.array(sorted(set(heads)), dtype=np.intp)
+            for (terminal, heads) in terminal_rules.items()
+        }
+
+        rules = np.array(binary_rules, dtype=np.intp).reshape(-1, 3)
+        self._left = rules[:, 1]
+        self._right = rules[:, 2]
+        # production -> head one-hot matrix, reduces productions into non-terminals
+        self._heads = np.zeros((len(rules), len(self.nonterminals)), dtype=np.float32)
+        self._heads[np.arange(len(rules)), rules[:, 0]] = 1
+
+    def recognize(self, string: str) -> bool:
+        return self.recognize_many([string])[0]
+
+    def recognize_many(self, strings: Sequence[str]) -> List[bool]:
+        # strings of the same length are checked together in one pass
+        result: List[bool] = [False] * len(strings)
+        by_length: Dict[int, List[int]] = {}
+
+        for (i, string) in enumerate(strings):
+            by_length.setdefault(len(string), []).append(i)
+
+        for (length, indices) in by_length.items():
+            if length == 0:
+                accepted = [self.accepts_empty] * len(indices)
+            else:
+                chart = self._chart([strings[i] for i in indices], length)
+                accepted = chart[:, 0, length, self.start].tolist()
+
+            for (i, value) in zip(indices, accepted):
+                result[i] = bool(value)
+
+        return result
+
+    def _chart(self, strings: Sequence[str], n: int) -> np.ndarray:
+        batch = len(strings)
+        nonterminals = len(self.nonterminals)
+        chart = np.zeros((batch, n, n + 1, nonterminals), dtype=bool)
+
+        # spans covered by terminals (of any length), all strings at once
+        codes = np.array([[ord(char) for char in string] for string in strings])
+        for (terminal, heads) in self.terminal_rules.items():
+            width = len(terminal)
+            if width > n:
+                continue
+
+            matches = np.ones((batch, n - width + 1), dtype=bool)
+            for (offset, char) in enumerate(terminal):
+                matches &= codes[:, offset : n - width + 1 + offset] == ord(char)
+
+            (strings_index, starts) = np.nonzero(matches)
+            for head in heads:
+                chart[strings_index, starts, width, head] = True
+
+        if len(self._left) == 0:
+            return chart
+
+        for length in range(2, n + 1):
+            starts = n - length + 1
+            pairs = np.zeros((batch, starts, len(self._left)), dtype=bool)
+
+            for split in range(1, length):
+                left = chart[:, :starts, split, :]
+                right = chart[:, split : split + starts, length - split, :]
+                pairs |= left[:, :, self._left] & right[:, :, self._right]
+
+            chart[:, :starts, length, :] |= (
+                pairs.astype(np.float32) @ self._heads
+            ) > 0
+
+        return chart
@@ -0,0 +1,120 @@
+from typing import Dict, List, Set, Tuple
+from parser import Grammar, Empty, NonTerminal, Single, Terminal
+from transformer import Transformer
+
+# { rule index, dot position, origin }: rule `A → α • β` started at `origin`
+Item = Tuple[int, int, int]
+
+
+class EarleyChart:
+    # Earley sets of a single string, `sets[i]` are the items after `i` characters
+
+    def __init__(self, recognizer: "EarleyRecognizer", string: str):
+        self.recognizer = recognizer
+        self.string = string
+        self.sets: List[List[Item]] = [[] for _ in range(len(string) + 1)]
+        self._seen: List[Set[Item]] = [set() for _ in range(len(string) + 1)]
+
+    def add(self, position: int, item: Item) -> None:
+        if item not in self._seen[position]:
+            self._seen[position].add(item)
+            self.sets[position].append(item)
+
+    def __contains__(self, entry: Tuple[int, Item]) -> bool:
+        (position, item) = entry
+        return item in self._seen[position]
+
+    def is_accepted(self) -> bool:
+        rules = self.recognizer.rules
+        start = self.recognizer.start
+
+        for (rule_index, dot, origin) in self.sets[-1]:
+            (nonterm, singles) = rules[rule_index]
+            if origin == 0 and nonterm == start and dot == len(singles):
+                return True
+        return False
+
+
+class EarleyRecognizer:
+    # Earley recognizer over the grammar as it is provided, without conversion: nullable
+    # non-terminals are skipped at prediction (Aycock and Horspool), O(n³) at worst
+
+    start: str
+    # flattened rules: { non-terminal, singles without epsilons }
+    rules: List[Tuple[str, Tuple[Single, ...]]]
+    rules_by_nonterminal: Dict[str, List[int]]
+    nullable: Set[str]
+
+    def __init__(self, grammar: Grammar):
+        self.start = grammar.ast.start.variable.value
+        self.rules = []
+        self.rules_by_nonterminal = {}
+
+        for rule in grammar.ast.ruleset.rules:
+            nonterm = rule.variable.value
+
+            if nonterm not in self.rules_by_nonterminal:
+                self.rules_by_nonterminal[nonterm] = []
+
+            for multiple in rule.values:
+                singles = tuple(
+                    single
+                    for single in multiple.values
+                    if not isinstance(single.object, Empty)
+                )
+                self.rules_by_nonterminal[nonterm].append(len(self.rules))
+                self.rules.append((nonterm, singles))
+
+        self.nullable = set(Transformer().get_epsilon_generating_nonterminals(grammar))
+
+    def recognize(self, string: str) -> bool:
+        return self.chart(string).is_accepted()
+
+    def chart(self, string: str) -> EarleyChart:
+        chart = EarleyChart(self, string)
+        # items of each set that wait for a non-terminal right after the dot
+        waiting: List[Dict[str, List[Item]]] = [{} for _ in range(len(string) + 1)]
+
+        for rule_index in self.rules_by_nonterminal.get(self.start, ()):
+            chart.add(0, (rule_index, 0, 0))
+
+        for position in range(len(string) + 1):
+            items = chart.sets[position]
+            index = 0
+
+            while index < len(items):
+                item = items[index]
+                index += 1
+
+                (rule_index, dot, origin) = item
+                (nonterm, singles) = self.rules[rule_index]
+
+                if dot == len(singles):
+                    # completion: A → γ • from `origin` advances the items waiting for A
+                    for (waiting_rule, waiting_dot, waiting_origin) in list(
+                        waiting[origin].get(nonterm, ())
+                    ):
+                        chart.add(
+                            position, (waiting_rule, waiting_dot + 1, waiting_origin)
+                        )
+                    continue
+
+                obj = singles[dot].object
+
+                if isinstance(obj, NonTerminal):
+                    # prediction
+                    waiting[position].setdefault(obj.value, []).append(item)
+
+                    for predicted_rule in self.rules_by_nonterminal.get(obj.value, ()):
+                        chart.add(position, (predicted_rule, 0, position))
+
+                    if obj.value in self.nullable:
+                        chart.add(position, (rule_index, dot + 1, origin))
+                elif isinstance(obj, Terminal):
+                    # scanning
+                    if string.startswith(obj.value, position):
+                        chart.add(
+                            position + len(obj.value), (rule_index, dot + 1, origin)
+                        )
+
+        return chart
@@ -0,0 +1,194 @@
+import argparse
+from typing import Dict, Iterator, List, Sequence
+from parser import Single, Terminal
+from earley import EarleyRecognizer
+from incremental import IncrementalRecognizer
+
+
+def enumerate_language(
+    earley: EarleyRecognizer, max_length: int, min_length: int = 0
+) -> Iterator[str]:
+    # Yields every string of the language with length in `min_length..max_length`,
+    # shorter strings first and strings of the same length in lexicographic order.
+    #
+    # Strings of each length are found by a depth-first walk over their prefixes on
+    # an `IncrementalRecognizer`, whose chart grows and shrinks with the prefix.
+    # Different derivations of the same prefix merge into its Earley items, so every
+    # string is yielded once. A prefix is only extended if some continuation of it
+    # has exactly the remaining length, so every prefix walked is a prefix of a
+    # string that is yielded. Memory is bounded by the chart of the current prefix,
+    # whatever the number of strings yielded.
+    recognizer = IncrementalRecognizer(earley)
+    lengths = _CompletionLengths(recognizer, max_length)
+
+    for length in range(min_length, max_length + 1):
+        if not lengths.admits(length):
+            continue
+        if length == 0:
+            yield ""
+            continue
+
+        prefix: List[str] = []
+        frames: List[Iterator[str]] = [iter(recognizer.next_chars())]
+
+        while len(frames):
+            char = next(frames[-1], None)
+
+            if char is None:
+                frames.pop()
+                del prefix[max(len(frames) - 1, 0) :]
+                recognizer.retreat(len(prefix))
+                lengths.retreat(len(prefix))
+                continue
+
+            recognizer.advance(char)
+            lengths.advance()
+            remaining = length - recognizer.position
+
+            if remaining == 0 and recognizer.finish():
+                yield "".join(prefix) + char
+            elif remaining > 0 and lengths.admits(remaining):
+                prefix.append(char)
+                frames.append(iter(recognizer.next_chars()))
+                continue
+
+            recognizer.retreat(len(prefix))
+            lengths.retreat(len(prefix))
+
+
+class _CompletionLengths:
+    # Lengths of the strings that continue the input read by the recognizer into a
+    # string of the language, up to `max_length`. Sets of lengths are bit masks.
+    #
+    # `suffixes[rule][dot]` are the lengths derived from the singles of the rule after
+    # the dot, and `contexts[i][A]` the lengths that follow a string derived from `A`
+    # predicted after the first `i` characters, collected from the items of set `i`
+    # that wait for `A`. The continuations of the input are the rests of the
+    # terminals it can be continued with, followed by their items and contexts.
+
+    def __init__(self, recognizer: IncrementalRecognizer, max_length: int):
+        self.recognizer = recognizer
+        self.mask = (1 << (max_length + 1)) - 1
+
+        rules = recognizer.earley.rules
+        derived: Dict[str, int] = {nonterm: 0 for (nonterm, _) in rules}
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, singles) in rules:
+                lengths = derived[nonterm] | self._sequence(singles, derived)
+                if lengths != derived[nonterm]:
+                    derived[nonterm] = lengths
+                    changed = True
+
+        self.suffixes: List[List[int]] = [
+            [
+                self._sequence(singles[dot:], derived)
+                for dot in range(len(singles) + 1)
+            ]
+            for (_, singles) in rules
+        ]
+        self.contexts: List[Dict[str, int]] = []
+        self.advance()
+
+    def admits(self, remaining: int) -> bool:
+        # some continuation of the input read so far has `remaining` characters
+        if remaining == 0:
+            return self.recognizer.finish()
+
+        rules = self.recognizer.earley.rules
+        for scans in self.recognizer.scans[-1].values():
+            for ((rule_index, dot, origin), matched) in scans:
+                (nonterm, singles) = rules[rule_index]
+                rest = len(singles[dot].object.value) - matched
+                if remaining >= rest and self._concatenate(
+                    self.suffixes[rule_index][dot + 1],
+                    self.contexts[origin].get(nonterm, 0),
+                ) >> (remaining - rest) & 1:
+                    return True
+        return False
+
+    def advance(self):
+        # contexts of the last set of the recognizer, which was just added
+        position = self.recognizer.position
+        rules = self.recognizer.earley.rules
+        contexts: Dict[str, int] = {}
+        if position == 0:
+            contexts[self.recognizer.earley.start] = 1
+        self.contexts.append(contexts)
+
+        # items predicted in the same set wait for each other, hence the fixpoint
+        changed = True
+        while changed:
+            changed = False
+            for (rule_index, dot, origin) in self.recognizer.sets[position]:
+                (nonterm, singles) = rules[rule_index]
+                if dot == len(singles) or isinstance(singles[dot].object, Terminal):
+                    continue
+
+                waited = singles[dot].object.value
+                lengths = contexts.get(waited, 0) | self._concatenate(
+                    self.suffixes[rule_index][dot + 1],
+                    self.contexts[origin].get(nonterm, 0),
+                )
+                if lengths != contexts.get(waited, 0):
+                    contexts[waited] = lengths
+                    changed = True
+
+    def retreat(self, position: int):
+        del self.contexts[position + 1 :]
+
+    def _sequence(self, singles: Sequence[Single], derived: Dict[str, int]) -> int:
+        lengths = 1
+        for single in singles:
+            if isinstance(single.object, Terminal):
+                lengths = (lengths << len(single.object.value)) & self.mask
+            else:
+                lengths = self._concatenate(
+                    lengths, derived.get(single.object.value, 0)
+                )
+        return lengths
+
+    def _concatenate(self, first: int, second: int) -> int:
+        # lengths of concatenations of strings with lengths in `first` and `second`
+        result = 0
+        while first:
+            lowest = first & -first
+            result |= second * lowest
+            first ^= lowest
+        return result & self.mask
+
+
+def main():
+    from interpreter import Interpreter, messages_to_stderr, read_grammar
+
+    arguments = argparse.ArgumentParser(
+        description="Prints all strings of the language of the grammar up to the "
+        "given length, one per line, shorter strings first."
+    )
+    arguments.add_argument("grammar", help="path to file with grammar")
+    arguments.add_argument("max_length", type=int, help="maximal length of strings")
+    arguments.add_argument(
+        "--min-length", type=int, default=0, help="minimal length of strings"
+    )
+    arguments.add_argument(
+        "-o", "--output", help="file to write strings into (default: stdout)"
+    )
+    args = arguments.parse_args()
+
+    interpreter = Interpreter()
+    with messages_to_stderr():
+        interpreter.set_grammar(read_grammar(args.grammar))
+
+    strings = interpreter.enumerate_language(args.max_length, args.min_length)
+    if args.output is None:
+        for string in strings:
+            print(string)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            for string in strings:
+                print(string, file=output)
+
+
+if __name__ == "__main__":
+    main()
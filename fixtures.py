@@ -0,0 +1,26 @@
+from interpreter import Interpreter
+from parser import parser, Grammar, get_terminals, get_non_terminals
+
+# grammars and builders shared by the tests
+
+BRACKETS = """start=🤯S🤯
+🤯S🤯 👉 🥵(🥵 🤯S🤯 🥵)🥵 🤌 🥵(🥵 🤯S🤯 🥵)🥵 🤯S🤯 🤌 😵 🗿"""
+
+PALINDROMES = """start=🤯str🤯
+🤯str🤯 👉 🥵a🥵 🤯str🤯 🥵a🥵 🤌 🥵b🥵 🤯str🤯 🥵b🥵 🤌 🥵a🥵 🤌 🥵b🥵 🤌 😵 🗿"""
+
+ARITHMETICS = """start=🤯expr🤯
+🤯expr🤯 👉 🤯expr🤯 🥵+🥵 🤯term🤯 🤌 🤯expr🤯 🥵-🥵 🤯term🤯 🤌 🤯term🤯🗿
+🤯term🤯 👉 🤯term🤯 🥵*🥵 🤯mult🤯 🤌 🤯term🤯 🥵/🥵 🤯mult🤯 🤌 🤯mult🤯🗿
+🤯mult🤯 👉 🥵(🥵 🤯expr🤯 🥵)🥵   🤌 🥵0🥵 🤌 🥵1🥵 🤌 🥵2🥵 🤌 🥵3🥵🗿"""
+
+
+def build_grammar(description: str) -> Grammar:
+    ast = parser.parse(description)
+    return Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+
+
+def build_interpreter(description: str, **kwargs) -> Interpreter:
+    interpreter = Interpreter(**kwargs)
+    interpreter.set_grammar(build_grammar(description))
+    return interpreter
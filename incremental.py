@@ -0,0 +1,172 @@
+from typing import Dict, List, Set, Tuple
+from parser import NonTerminal
+from earley import EarleyRecognizer, Item
+
+# { item with the dot before a terminal, number of its characters matched so far }
+Scan = Tuple[Item, int]
+
+
+class IncrementalRecognizer:
+    # Earley recognizer over the provided grammar fed with chunks of input, one set per
+    # character; rules with non-productive non-terminals are never predicted, so the
+    # input is a viable prefix while the last set or scans are not empty
+
+    earley: EarleyRecognizer
+    # number of characters read so far; reading stops at the first character after
+    # which the input is not a viable prefix anymore
+    position: int
+    # sets[i]: items that are valid after the first `i` characters
+    sets: List[List[Item]]
+    # scans[i]: terminals that continue the input after the first `i` characters,
+    # by their next character
+    scans: List[Dict[str, List[Scan]]]
+
+    def __init__(self, earley: EarleyRecognizer):
+        self.earley = earley
+        self.position = 0
+
+        productive = _productive_nonterminals(earley)
+        self.rules_by_nonterminal: Dict[str, List[int]] = {
+            nonterm: [
+                rule_index
+                for rule_index in rules
+                if all(
+                    single.object.value in productive
+                    for single in earley.rules[rule_index][1]
+                    if isinstance(single.object, NonTerminal)
+                )
+            ]
+            for (nonterm, rules) in earley.rules_by_nonterminal.items()
+        }
+
+        self.sets = []
+        self.scans = []
+        self._seen: List[Set[Item]] = []
+        # waiting[i]: items of `sets[i]` that wait for a non-terminal after the dot
+        self._waiting: List[Dict[str, List[Item]]] = []
+
+        self._add_set()
+        for rule_index in self.rules_by_nonterminal.get(earley.start, ()):
+            self._add(0, (rule_index, 0, 0))
+        self._close(0)
+
+    def feed(self, chunk: str) -> bool:
+        # returns whether the input is still a viable prefix
+        for char in chunk:
+            if not self.is_viable_prefix():
+                break
+
+            self.advance(char)
+
+        return self.is_viable_prefix()
+
+    def is_viable_prefix(self) -> bool:
+        # some extension of the input fed so far is accepted by the grammar
+        return len(self.sets[-1]) > 0 or len(self.scans[-1]) > 0
+
+    def finish(self) -> bool:
+        # the input fed so far is accepted by the grammar
+        rules = self.earley.rules
+        start = self.earley.start
+
+        for (rule_index, dot, origin) in self.sets[-1]:
+            (nonterm, singles) = rules[rule_index]
+            if origin == 0 and nonterm == start and dot == len(singles):
+                return True
+        return False
+
+    def next_chars(self) -> List[str]:
+        # characters that continue the input fed so far, in order
+        return sorted(self.scans[-1])
+
+    def advance(self, char: str) -> bool:
+        # reads one more character; returns whether the input is still a viable prefix
+        scans = self.scans[-1].get(char, ())
+        self.position += 1
+        self._add_set()
+
+        for (item, matched) in scans:
+            (rule_index, dot, origin) = item
+            terminal = self.earley.rules[rule_index][1][dot].object.value
+            if matched + 1 == len(terminal):
+                self._add(self.position, (rule_index, dot + 1, origin))
+            else:
+                # inside of the terminal, the item stays in the set where it started
+                self.scans[-1].setdefault(terminal[matched + 1], []).append(
+                    (item, matched + 1)
+                )
+
+        self._close(self.position)
+        return self.is_viable_prefix()
+
+    def retreat(self, position: int):
+        # forgets the characters read after the first `position` ones
+        self.position = position
+        del self.sets[position + 1 :]
+        del self.scans[position + 1 :]
+        del self._seen[position + 1 :]
+        del self._waiting[position + 1 :]
+
+    def _add_set(self):
+        self.sets.append([])
+        self.scans.append({})
+        self._seen.append(set())
+        self._waiting.append({})
+
+    def _add(self, position: int, item: Item):
+        if item not in self._seen[position]:
+            self._seen[position].add(item)
+            self.sets[position].append(item)
+
+    def _close(self, position: int):
+        # predictions and completions of the items of the set, as in
+        # `EarleyRecognizer.chart`
+        items = self.sets[position]
+        waiting = self._waiting
+        index = 0
+
+        while index < len(items):
+            item = items[index]
+            index += 1
+
+            (rule_index, dot, origin) = item
+            (nonterm, singles) = self.earley.rules[rule_index]
+
+            if dot == len(singles):
+                for (waiting_rule, waiting_dot, waiting_origin) in list(
+                    waiting[origin].get(nonterm, ())
+                ):
+                    self._add(position, (waiting_rule, waiting_dot + 1, waiting_origin))
+                continue
+
+            obj = singles[dot].object
+
+            if isinstance(obj, NonTerminal):
+                waiting[position].setdefault(obj.value, []).append(item)
+
+                for predicted_rule in self.rules_by_nonterminal.get(obj.value, ()):
+                    self._add(position, (predicted_rule, 0, position))
+
+                if obj.value in self.earley.nullable:
+                    self._add(position, (rule_index, dot + 1, origin))
+            else:
+                self.scans[position].setdefault(obj.value[0], []).append((item, 0))
+
+
+def _productive_nonterminals(earley: EarleyRecognizer) -> Set[str]:
+    # non-terminals that derive at least one string
+    productive: Set[str] = set()
+    changed = True
+
+    while changed:
+        changed = False
+        for (nonterm, singles) in earley.rules:
+            if nonterm not in productive and all(
+                single.object.value in productive
+                for single in singles
+                if isinstance(single.object, NonTerminal)
+            ):
+                productive.add(nonterm)
+                changed = True
+
+    return productive
@@ -1,40 +1,377 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
 import sys
-import copy
-from typing import List, Tuple
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import (
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 from parser import (
     parser,
     Grammar,
-    Single,
     NonTerminal,
     Terminal,
-    Empty,
-    Rule,
     Root,
     get_terminals,
     get_non_terminals,
 )
 from transformer import Transformer
+from compiled_grammar import CompiledGrammar
+from earley import EarleyRecognizer
+from sppf import ParseForest, tree_to_string
+from ambiguity import find_ambiguous_nonterminals
+from cyk import CYKRecognizer
+from ll1 import LL1Parser
+from lalr import LALRParser
+from pda import PushdownAutomaton
+from memo import FailureMemo
+from incremental import IncrementalRecognizer
+from enumerator import enumerate_language
+from stack import Stack, EMPTY_STACK
+
+
+class Configuration:
+    # `{ offset, stack }` pair linked to the configuration it was reached from
+
+    __slots__ = ("position", "stack", "parent")
+
+    def __init__(
+        self, position: int, stack: Stack, parent: Optional[Configuration] = None
+    ):
+        self.position = position
+        self.stack = stack
+        self.parent = parent
+
+    def key(self, remaining: Hashable) -> Hashable:
+        # `remaining` identifies the rest of the input
+        return (remaining, self.stack)
+
+    def trace(self) -> List[Tuple[int, Stack]]:
+        result: List[Tuple[int, Stack]] = []
+        configuration: Optional[Configuration] = self
+        while configuration is not None:
+            result.append((configuration.position, configuration.stack))
+            configuration = configuration.parent
+        result.reverse()
+        return result
+
+
+class CancellationToken:
+    # cooperative cancellation of the evaluations it is passed to, `cancel()` may be
+    # called from another thread; the search checks it every `CHECK_INTERVAL` steps
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class LimitExceeded:
+    # returned in place of the trace when the search is stopped before the answer is
+    # known: why it was stopped, how many configurations were entered and the furthest
+    # input offset that was reached
+
+    __slots__ = ("reason", "steps", "position")
+
+    def __init__(self, reason: str, steps: int, position: int):
+        self.reason = reason
+        self.steps = steps
+        self.position = position
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LimitExceeded):
+            return NotImplemented
+        return (self.reason, self.steps, self.position) == (
+            other.reason,
+            other.steps,
+            other.position,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LimitExceeded(reason={self.reason!r}, steps={self.steps}, "
+            f"position={self.position})"
+        )
+
+
+# reasons of `LimitExceeded`
+MAX_STEPS = "max_steps"
+DEADLINE = "deadline"
+CANCELLED = "cancelled"
+
+# number of search steps between checks of the deadline and the cancellation token
+CHECK_INTERVAL = 256
+
+# `{ accepted, trace }`; `accepted` is `None` if the search was stopped by a limit,
+# the second value is `LimitExceeded` then
+EvaluationResult = Tuple[
+    Optional[bool], Union[List[Tuple[int, Stack]], LimitExceeded, None]
+]
+
+
+# "gwf" - backtracking search over the grammar in Greibah weak form (provides trace),
+#         replaced with LL(1) predictive parsing if the left-factored grammar allows it
+# "earley" - Earley recognizer over the provided grammar
+# "cyk" - CYK recognizer over the grammar in Chomsky normal form
+# "lalr" - LALR(1) parser generated by ply.yacc from the provided grammar,
+#          falls back to "gwf" if the grammar has conflicts
+# "pda" - pushdown automaton with integer tables compiled from the left-factored
+#         grammar in Greibah weak form
+ENGINES = ["gwf", "earley", "cyk", "lalr", "pda"]
 
 
 class Interpreter:
-    grammar: Grammar
+    # grammar in Greibah weak form, it is not built for engines that do not need it
+    grammar: Optional[Grammar]
+    provided_grammar: Grammar
+    compiled: CompiledGrammar
+    # built for the "earley" engine and on demand for parse forests
+    earley: Optional[EarleyRecognizer]
+    cyk: CYKRecognizer
+    # predictive parser over left-factored grammar in Greibah weak form
+    ll1: Optional[LL1Parser]
+    # LALR(1) parser of the provided grammar, set only if it has no conflicts
+    lalr: Optional[LALRParser]
+    # pushdown automaton of the grammar in Greibah weak form for the "pda" engine
+    pda: Optional[PushdownAutomaton]
+    memo: FailureMemo
+
+    def __init__(
+        self,
+        memo_size: Optional[int] = 100_000,
+        share_memo: bool = False,
+        engine: str = "gwf",
+        predictive: bool = True,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
+        # configurations that are known to be rejected; when `share_memo` is set
+        # the table survives between `evaluate()` calls on the same grammar, so
+        # strings that are evaluated again are rejected from it.
+        # Keys are whole stacks, so it only helps when different derivations reach
+        # equal stacks (e.g. `E → E + E`). It does not help on the brackets grammar:
+        # every derivation there leaves a different stack and the memo is never hit
+        # within one evaluation, rejected strings still take exponential time.
+        self.memo = FailureMemo(memo_size)
+        self.share_memo = share_memo
+        self.engine = engine
+        self.predictive = predictive
+        self.ll1 = None
+        self.lalr = None
+        self.pda = None
+        self.earley = None
 
     def set_grammar(self, grammar: Grammar):
         print("Grammar set: ")
         print(grammar.to_string())
+        self.provided_grammar = grammar
+        self.earley = None
+
+        if self.engine == "earley":
+            self.grammar = None
+            self.earley = EarleyRecognizer(grammar)
+            return
+        if self.engine == "cyk":
+            self.grammar = None
+            self.cyk = CYKRecognizer(grammar)
+            print("Convert grammar to Chomsky normal form:")
+            print(self.cyk.grammar.to_string())
+            return
+
+        self.lalr = None
+        if self.engine == "lalr":
+            try:
+                lalr = LALRParser(grammar)
+            except ValueError as error:
+                print("Grammar cannot be parsed with LALR(1), using backtracking:")
+                print(f"  {error}")
+            else:
+                if lalr.is_lalr():
+                    self.grammar = None
+                    self.lalr = lalr
+                    print("Grammar is LALR(1), using LALR parsing")
+                    return
+                print("Grammar is not LALR(1), using backtracking search:")
+                for conflict in lalr.conflicts:
+                    print(f"  {conflict}")
 
         self.grammar = Transformer().to_greibah_weak_form(grammar)
         print("Convert grammar to Greibah weak form:")
         print(self.grammar.to_string())
 
-    def evaluate(self, string: str) -> Tuple[bool, List[Tuple[str, List[Single]]]]:
-        evaluation_trace: List[Tuple[str, List[Single]]] = []
-        result = self._traverse(
-            string, [Single(self.grammar.ast.start.variable)], evaluation_trace
+        self.compiled = CompiledGrammar(self.grammar)
+        self.memo.clear()
+
+        self.pda = None
+        if self.engine == "pda":
+            self.pda = PushdownAutomaton(self.grammar)
+            print("Compile grammar into pushdown automaton:")
+            print(self.pda.dump())
+
+        self.ll1 = None
+        if self.predictive and self.pda is None:
+            ll1 = LL1Parser(Transformer().left_factor(self.grammar))
+            if ll1.is_ll1():
+                self.ll1 = ll1
+                print("Left-factored grammar is LL(1), using predictive parsing:")
+                print(ll1.grammar.to_string())
+            else:
+                print(
+                    "Left-factored grammar is not LL(1), conflicts in non-terminals "
+                    f"{ll1.conflicting_nonterminals()}, using backtracking search"
+                )
+
+    def evaluate(
+        self,
+        string: str,
+        trace: bool = True,
+        max_steps: Optional[int] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> EvaluationResult:
+        # trace consists of `{ offset, stack }` pairs, where `offset` points at
+        # the suffix of `string` that is not covered by the grammar yet;
+        # it is built only for accepted strings and only if `trace` is set;
+        # engines other than "gwf" provide no trace
+        #
+        # the backtracking search stops after `max_steps` configurations, at the
+        # `deadline` (in `time.monotonic()` seconds) or once `cancel` is cancelled,
+        # whichever comes first, and returns `{ None, LimitExceeded }`; other engines
+        # are not limited
+        if self.engine == "earley":
+            return (self.earley.recognize(string), None)
+        if self.engine == "cyk":
+            return (self.cyk.recognize(string), None)
+        if self.lalr is not None:
+            return (self.lalr.recognize(string), None)
+        if self.pda is not None:
+            return (self.pda.recognize(string), None)
+        if self.ll1 is not None:
+            return self.ll1.recognize(string, trace)
+
+        if not self.share_memo:
+            self.memo.clear()
+
+        start = self.compiled.start
+        accepted = self._traverse(
+            string,
+            0,
+            EMPTY_STACK.push(start, self.compiled.bounds(start)),
+            max_steps,
+            deadline,
+            cancel,
+        )
+
+        if isinstance(accepted, LimitExceeded):
+            return (None, accepted)
+        if not trace:
+            return (accepted is not None, None)
+        if accepted is None:
+            return (False, [])
+        return (True, accepted.trace())
+
+    def parse_forest(self, string: str) -> ParseForest:
+        # all derivations of `string` with the provided grammar, see `ParseForest`
+        return ParseForest(self._earley().chart(string))
+
+    def count_derivations(
+        self, string: str, modulus: Optional[int] = None
+    ) -> Union[int, float]:
+        # number of parse trees of `string` with the provided grammar (modulo `modulus`
+        # if it is set), infinite if it has a derivation through a cycle `A ⇒+ A`
+        return self.parse_forest(string).count(modulus)
+
+    def ambiguous_nonterminals(
+        self, samples: int = 200, max_length: int = 16, seed: Optional[int] = None
+    ) -> Dict[str, str]:
+        # non-terminals of the provided grammar that are found to be ambiguous on
+        # random strings of the grammar, each with the shortest such string
+        return find_ambiguous_nonterminals(
+            self.provided_grammar, samples, max_length, seed
         )
-        return (result, evaluation_trace)
 
-    def stack_to_string(self, stack: List[Single]) -> str:
+    def incremental(self) -> IncrementalRecognizer:
+        # recognizer that is fed with the input in chunks, see `IncrementalRecognizer`
+        return IncrementalRecognizer(self._earley())
+
+    def enumerate_language(
+        self, max_length: int, min_length: int = 0
+    ) -> Iterator[str]:
+        # strings of the language up to `max_length`, see `enumerate_language`
+        return enumerate_language(self._earley(), max_length, min_length)
+
+    def _earley(self) -> EarleyRecognizer:
+        # Earley recognizer over the provided grammar, built once per grammar
+        if self.earley is None:
+            self.earley = EarleyRecognizer(self.provided_grammar)
+        return self.earley
+
+    def evaluate_many(
+        self,
+        strings: Iterable[str],
+        jobs: int = 1,
+        chunksize: int = 256,
+        ordered: bool = True,
+        trace: bool = False,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Tuple[int, EvaluationResult]]:
+        # yields `{ index, result of evaluate() }` pairs, in the order of `strings` if
+        # `ordered` is set or as soon as they are ready otherwise; with `jobs > 1`
+        # chunks of strings are evaluated in worker processes, each of which receives
+        # the compiled grammar once, when it starts;
+        # `max_steps` and `timeout` (in seconds) limit the evaluation of every string
+        if jobs <= 1:
+            for (index, string) in enumerate(strings):
+                yield (
+                    index, _evaluate_limited(self, string, trace, max_steps, timeout)
+                )
+            return
+
+        limits = (trace, max_steps, timeout)
+
+        chunks = _chunks(strings, chunksize)
+        with ProcessPoolExecutor(
+            jobs, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            # a bounded number of chunks is in flight, so `strings` may be a stream
+            pending: Deque[Future] = deque()
+            for (start, chunk) in itertools.islice(chunks, 2 * jobs):
+                pending.append(executor.submit(_evaluate_chunk, start, chunk, *limits))
+
+            while len(pending):
+                if ordered:
+                    done: Iterable[Future] = [pending.popleft()]
+                else:
+                    done = wait(pending, return_when=FIRST_COMPLETED).done
+                    for future in done:
+                        pending.remove(future)
+
+                for future in done:
+                    yield from future.result()
+                    for (start, chunk) in itertools.islice(chunks, 1):
+                        pending.append(
+                            executor.submit(_evaluate_chunk, start, chunk, *limits)
+                        )
+
+    def stack_to_string(self, stack: Stack) -> str:
         result = "["
         index = 0
         for elem in stack:
@@ -48,87 +385,205 @@ class Interpreter:
     def _traverse(
         self,
         string: str,
-        stack: List[Single],
-        evaluation_trace: List[Tuple[str, List[Single]]],
-    ):
-        evaluation_trace.append((string, copy.deepcopy(stack)))
-
-        if len(string) == 0:
-            # removing epsilon generating non-terminals from stack
-            while len(stack) and isinstance(stack[-1].object, NonTerminal):
-                rules = Transformer().get_rules_by_nonterminal(self.grammar)[
-                    stack[-1].object.value
-                ]
-
-                able_to_generate_epsilon = False
-                for rule in rules:
-                    if Transformer().has_immediate_epsilon_generating_evaluation(rule):
-                        able_to_generate_epsilon = True
-                        break
-
-                if able_to_generate_epsilon:
-                    stack.pop()
-                    evaluation_trace.append((string, copy.deepcopy(stack)))
-                else:
-                    break
+        position: int,
+        stack: Stack,
+        max_steps: Optional[int] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Union[Configuration, LimitExceeded, None]:
+        # Explicit work stack replacing recursion: every frame holds the configuration
+        # that has been entered and the iterator over configurations reachable from it.
+        # Frames are popped (and configurations remembered as rejected) once all of
+        # their successors have failed. Configurations keep parent pointers only,
+        # so the path to the accepting configuration can be restored afterwards.
+        # When a limit stops the search, configurations of the remaining frames are
+        # not explored completely, so they are not remembered as rejected.
+        frames: List[Tuple[Optional[Configuration], Iterator[Tuple[int, Stack]]]] = [
+            (None, iter([(position, stack)]))
+        ]
+        # Without sharing, the memo only holds configurations of this string and the
+        # offset identifies the remaining input. A shared memo is keyed by the input
+        # and the offset: the string is referenced, not copied, and its hash is
+        # computed once.
+        def key(configuration: Configuration) -> Hashable:
+            if not self.share_memo:
+                return configuration.key(configuration.position)
+            return configuration.key((string, configuration.position))
+
+        length = len(string)
+        steps = 0
+        furthest = position
+
+        while len(frames):
+            (parent, successors) = frames[-1]
+            successor = next(successors, None)
+
+            if successor is None:
+                frames.pop()
+                if parent is not None:
+                    self.memo.add(key(parent))
+                continue
+
+            if max_steps is not None and steps >= max_steps:
+                return LimitExceeded(MAX_STEPS, steps, furthest)
+            if steps % CHECK_INTERVAL == 0:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return LimitExceeded(DEADLINE, steps, furthest)
+                if cancel is not None and cancel.cancelled:
+                    return LimitExceeded(CANCELLED, steps, furthest)
+            steps += 1
+
+            configuration = Configuration(successor[0], successor[1], parent)
+            if configuration.position > furthest:
+                furthest = configuration.position
+
+            # every string derived from the stack is known to be either longer or
+            # shorter than the remaining input
+            remaining = length - configuration.position
+            if (
+                configuration.stack.min_yield > remaining
+                or configuration.stack.max_yield < remaining
+            ):
+                continue
+
+            configuration_key = key(configuration)
+            if configuration_key in self.memo:
+                continue
+
+            if configuration.position == length:
+                accepted = self._pop_epsilon_generating_nonterminals(configuration)
+                if accepted is not None:
+                    return accepted
+
+                self.memo.add(configuration_key)
+            elif len(configuration.stack) == 0:
+                self.memo.add(configuration_key)
+            else:
+                frames.append(
+                    (
+                        configuration,
+                        self._successors(
+                            string, configuration.position, configuration.stack
+                        ),
+                    )
+                )
 
-            result = len(stack) == 0
+        return None
 
-            if result is False:
-                evaluation_trace.pop()
+    def _pop_epsilon_generating_nonterminals(
+        self, configuration: Configuration
+    ) -> Optional[Configuration]:
+        # The stack derives the empty string exactly when its minimal yield is zero,
+        # `_traverse` only gets here for such stacks. Symbols are popped one by one
+        # for the trace: epsilons and non-terminals that derive the empty string.
+        stack = configuration.stack
+        nullable = self.compiled.nullable
 
-            return result
+        while len(stack):
+            obj = stack.top.object
+            if isinstance(obj, Terminal) or (
+                isinstance(obj, NonTerminal) and obj.value not in nullable
+            ):
+                break
+
+            stack = stack.below
+            configuration = Configuration(configuration.position, stack, configuration)
 
         if len(stack) == 0:
-            evaluation_trace.pop()
-            return False
+            return configuration
+        return None
 
-        tr = Transformer()
-        rules_by_nonterminals: dict[str, List[Rule]] = tr.get_rules_by_nonterminal(
-            self.grammar
-        )
-        a = stack.pop().object
+    def _successors(
+        self, string: str, position: int, stack: Stack
+    ) -> Iterator[Tuple[int, Stack]]:
+        (single, stack) = stack.pop()
+        a = single.object
 
         if isinstance(a, NonTerminal):
-            for rule in rules_by_nonterminals[a.value]:
-                for multiple in rule.values:
-                    if self._traverse(
-                        string,
-                        stack + list(reversed(multiple.values)),
-                        evaluation_trace,
-                    ):
-                        return True
+            for (values, bounds) in self.compiled.expansions_at(
+                a.value, string, position
+            ):
+                yield (position, stack.push_sequence(values, bounds))
         elif isinstance(a, Terminal):
-            if string[0:len(a.value)] == a.value:
-                result = self._traverse(string[len(a.value):], stack, evaluation_trace)
-
-                if result is False:
-                    evaluation_trace.pop()
-                return result
-            else:
-                evaluation_trace.pop()
-                return False
+            if string.startswith(a.value, position):
+                yield (position + len(a.value), stack)
         else:
-            result = self._traverse(string, stack, evaluation_trace)
+            yield (position, stack)
 
-            if result is False:
-                evaluation_trace.pop()
-            return result
 
-        evaluation_trace.pop()
-        return False
+interpreter = Interpreter()
 
+# interpreter of a worker process of `Interpreter.evaluate_many`
+_worker_interpreter: Optional[Interpreter] = None
+
+
+def _init_worker(shipped: Interpreter) -> None:
+    global _worker_interpreter
+    _worker_interpreter = shipped
+
+
+def _evaluate_chunk(
+    start: int,
+    strings: List[str],
+    trace: bool,
+    max_steps: Optional[int],
+    timeout: Optional[float],
+) -> List[Tuple[int, EvaluationResult]]:
+    return [
+        (
+            start + offset,
+            _evaluate_limited(_worker_interpreter, string, trace, max_steps, timeout),
+        )
+        for (offset, string) in enumerate(strings)
+    ]
+
+
+def _evaluate_limited(
+    interpreter: Interpreter,
+    string: str,
+    trace: bool,
+    max_steps: Optional[int],
+    timeout: Optional[float],
+) -> EvaluationResult:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    return interpreter.evaluate(string, trace, max_steps, deadline)
 
-interpreter = Interpreter()
+
+def _chunks(strings: Iterable[str], chunksize: int) -> Iterator[Tuple[int, List[str]]]:
+    # `{ index of the first string, strings }` chunks
+    iterator = iter(strings)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if len(chunk) == 0:
+            return
+        yield (start, chunk)
+        start += len(chunk)
+
+
+def read_grammar(filepath: str) -> Grammar:
+    with open(filepath, "r", encoding="utf-8") as grammar_description:
+        ast: Root = parser.parse("".join(grammar_description.readlines()))
+        return Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+
+
+def messages_to_stderr() -> contextlib.redirect_stdout:
+    # for tools that print strings on stdout: messages of the grammar parser and of the
+    # interpreter must not mix with them
+    return contextlib.redirect_stdout(sys.stderr)
 
 
 def write_evaluation_steps_to_file(
     filename: str,
     provided_grammar: Grammar,
-    greibah_weak_formed_grammar: Grammar,
+    greibah_weak_formed_grammar: Optional[Grammar],
     string: str,
-    evaluation_result: bool,
-    evaluation_trace: List[Tuple[str, List[Single]]],
+    evaluation_result: Optional[bool],
+    evaluation_trace: Union[List[Tuple[int, Stack]], LimitExceeded, None],
+    predictive_grammar: Optional[Grammar] = None,
+    forest: Optional[ParseForest] = None,
+    max_trees: int = 0,
+    derivations: Optional[Union[int, float]] = None,
 ) -> None:
     with open(filename, "w", encoding="utf-8") as output:
 
@@ -136,38 +591,197 @@ def write_evaluation_steps_to_file(
         print(provided_grammar.to_string(), file=output)
         print(file=output)
 
-        print("Grammar in Greibah weak form:", file=output)
-        print(greibah_weak_formed_grammar.to_string(), file=output)
-        print(file=output)
+        if greibah_weak_formed_grammar is not None:
+            print("Grammar in Greibah weak form:", file=output)
+            print(greibah_weak_formed_grammar.to_string(), file=output)
+            print(file=output)
+
+        if predictive_grammar is not None:
+            print("Left-factored grammar (LL(1)):", file=output)
+            print(predictive_grammar.to_string(), file=output)
+            print(file=output)
 
         print("-- Evaluation --", file=output)
-        print(f"Grammar contains '{string}': {evaluation_result}\n", file=output)
+        if isinstance(evaluation_trace, LimitExceeded):
+            print(
+                f"Grammar contains '{string}': unknown, the search is stopped by "
+                f"{evaluation_trace.reason} after {evaluation_trace.steps} steps "
+                f"reaching offset {evaluation_trace.position}\n",
+                file=output,
+            )
+        else:
+            print(f"Grammar contains '{string}': {evaluation_result}\n", file=output)
 
-        if evaluation_result:
+        if evaluation_result and evaluation_trace is not None:
             print(f"Evaluation trace:", file=output)
-            for (s, stack) in evaluation_trace:
+            for (position, stack) in evaluation_trace:
                 trace_step: str = (
-                    "{ " + f"'{s}', {interpreter.stack_to_string(stack)}" + " }"
+                    "{ "
+                    + f"'{string[position:]}', {interpreter.stack_to_string(stack)}"
+                    + " }"
                 )
                 print(trace_step, file=output)
         else:
             print(f"No evaluation trace", file=output)
 
+        if derivations is not None:
+            print(file=output)
+            print(f"Number of derivations: {derivations}", file=output)
+
+        if forest is not None and forest.root is not None:
+            print(file=output)
+            print(
+                f"Parse forest: {len(forest)} nodes, {forest.packed_nodes()} packed "
+                f"nodes, first {max_trees} parse trees:",
+                file=output,
+            )
+            for tree in itertools.islice(forest.trees(), max_trees):
+                print(tree_to_string(tree), file=output)
+
 
 def main():
-    if len(sys.argv) > 1:
-        filepath: str = sys.argv[1]
+    global interpreter
+
+    arguments = argparse.ArgumentParser(
+        description="Evaluates input strings with the grammar loaded from the file."
+    )
+    arguments.add_argument("grammar", nargs="?", help="path to file with grammar")
+    arguments.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="gwf",
+        help="recognition algorithm (default: gwf)",
+    )
+    arguments.add_argument(
+        "--no-predictive",
+        action="store_true",
+        help="do not switch to LL(1) predictive parsing when the grammar allows it",
+    )
+    arguments.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="evaluate every line of the file ('-' for standard input) and print "
+        "the results instead of reading strings interactively",
+    )
+    arguments.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes for --batch (default: 1)",
+    )
+    arguments.add_argument(
+        "--max-steps",
+        type=int,
+        help="stop the backtracking search of a string after this number of steps",
+    )
+    arguments.add_argument(
+        "--timeout",
+        type=float,
+        help="stop the backtracking search of a string after this number of seconds",
+    )
+    arguments.add_argument(
+        "--trees",
+        type=int,
+        default=0,
+        metavar="N",
+        help="build the parse forest of every string over the provided grammar and "
+        "print its first N parse trees",
+    )
+    arguments.add_argument(
+        "--count",
+        action="store_true",
+        help="count the derivations of every string over the provided grammar",
+    )
+    arguments.add_argument(
+        "--ambiguity",
+        type=int,
+        default=0,
+        metavar="SAMPLES",
+        help="report non-terminals that are ambiguous on SAMPLES random strings "
+        "of the grammar",
+    )
+    arguments.add_argument(
+        "--stream",
+        action="store_true",
+        help="evaluate the whole standard input as a single string, reading it in "
+        "chunks and stopping as soon as it cannot be recognized",
+    )
+    args = arguments.parse_args()
+
+    if args.grammar is not None:
+        filepath: str = args.grammar
+        interpreter = Interpreter(engine=args.engine, predictive=not args.no_predictive)
+
+        grammar = read_grammar(filepath)
+        print(grammar.to_string())
+        interpreter.set_grammar(grammar)
+
+        if args.ambiguity > 0:
+            witnesses = interpreter.ambiguous_nonterminals(args.ambiguity)
+            print(f"Ambiguous non-terminals on {args.ambiguity} random strings:")
+            for (nonterm, string) in sorted(witnesses.items()):
+                print(f"  '{nonterm}', e.g. in '{string}'")
+            if len(witnesses) == 0:
+                print("  none found")
+
+        if args.batch is not None:
+            # lines are read as they are evaluated and kept until their results are
+            # printed, so the input may be a stream
+            strings: Dict[int, str] = {}
+
+            def read(batch: TextIO) -> Iterator[str]:
+                for (index, line) in enumerate(batch):
+                    strings[index] = line.rstrip("\n")
+                    yield strings[index]
+
+            with (
+                open(args.batch, "r", encoding="utf-8")
+                if args.batch != "-"
+                else contextlib.nullcontext(sys.stdin)
+            ) as batch:
+                for (index, (result, _)) in interpreter.evaluate_many(
+                    read(batch),
+                    jobs=args.jobs,
+                    max_steps=args.max_steps,
+                    timeout=args.timeout,
+                ):
+                    string = strings.pop(index)
+                    if args.count:
+                        count = interpreter.count_derivations(string)
+                        print(f"{result}\t{count}\t{string}")
+                    else:
+                        print(f"{result}\t{string}")
+            return
+
+        if args.stream:
+            recognizer = interpreter.incremental()
+            # a line break that ends the input is not a part of it, as in `--batch`
+            held = ""
+            while True:
+                chunk = sys.stdin.read(65536)
+                if chunk == "":
+                    break
 
-        with open(filepath, "r", encoding="utf-8") as grammar_description:
-            ast: Root = parser.parse("".join(grammar_description.readlines()))
-            grammar = Grammar(ast, get_terminals(ast), get_non_terminals(ast))
-            print(grammar.to_string())
-            interpreter.set_grammar(grammar)
+                chunk = held + chunk
+                held = "\n" if chunk.endswith("\n") else ""
+                if not recognizer.feed(chunk[: len(chunk) - len(held)]):
+                    break
+
+            if recognizer.is_viable_prefix():
+                print(f"Grammar contains the input: {recognizer.finish()}")
+            else:
+                print(
+                    "Grammar contains the input: False (no string starts with its "
+                    f"first {recognizer.position} characters)"
+                )
+            return
 
         print("Enter string to evaluate with grammar:")
         while True:
             string = input("> ")
-            (result, evaluation_trace) = interpreter.evaluate(string)
+            (result, evaluation_trace) = _evaluate_limited(
+                interpreter, string, True, args.max_steps, args.timeout
+            )
             output_file = f"{filepath}.out"
             write_evaluation_steps_to_file(
                 output_file,
@@ -176,6 +790,10 @@ def main():
                 string,
                 result,
                 evaluation_trace,
+                interpreter.ll1.grammar if interpreter.ll1 is not None else None,
+                interpreter.parse_forest(string) if args.trees > 0 else None,
+                args.trees,
+                interpreter.count_derivations(string) if args.count else None,
             )
 
             print(f"Result has been printed into '{output_file}' file")
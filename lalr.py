@@ -0,0 +1,184 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, List, Optional, Tuple
+import ply
+import ply.yacc as yacc
+from parser import Grammar, Empty, Terminal
+from compiled_grammar import TerminalTrie
+
+# directory where generated tables are kept between runs
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".lalr_cache"
+)
+
+# token that ply appends to the input
+END_TOKEN = "$end"
+
+
+class LALRParser:
+    # LALR(1) parser of the provided grammar with tables generated by `ply.yacc` and
+    # cached in `cache_dir`; `conflicts` lists conflicts, terminals that prefix other
+    # terminals and failures to generate tables, `recognize` is linear without them
+
+    grammar: Grammar
+    conflicts: List[str]
+    from_cache: bool
+
+    def __init__(self, grammar: Grammar, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.grammar = grammar
+        self._terminals = TerminalTrie()
+        self._tokens: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+
+        for (index, terminal) in enumerate(sorted(grammar.terminals)):
+            self._terminals.add(terminal)
+            self._tokens[terminal] = f"t{index}"
+            self._names[f"t{index}"] = f"'{terminal}'"
+
+        undefined = sorted(
+            grammar.non_terminals
+            - {rule.variable.value for rule in grammar.ast.ruleset.rules}
+        )
+        if len(undefined):
+            raise ValueError(
+                "Non-terminals are used without rules: "
+                + ", ".join(f"'{nonterm}'" for nonterm in undefined)
+            )
+
+        nonterminals = {
+            nonterm: f"n{index}"
+            for (index, nonterm) in enumerate(sorted(grammar.non_terminals))
+        }
+        for (nonterm, name) in nonterminals.items():
+            self._names[name] = nonterm
+
+        productions: List[Tuple[str, Tuple[str, ...]]] = []
+        for rule in grammar.ast.ruleset.rules:
+            for multiple in rule.values:
+                syms = tuple(
+                    self._tokens[single.object.value]
+                    if isinstance(single.object, Terminal)
+                    else nonterminals[single.object.value]
+                    for single in multiple.values
+                    if not isinstance(single.object, Empty)
+                )
+                production = (nonterminals[rule.variable.value], syms)
+                if production not in productions:
+                    productions.append(production)
+
+        start = nonterminals[grammar.ast.start.variable.value]
+        signature = hashlib.sha256(
+            repr((ply.__version__, start, productions)).encode("utf-8")
+        ).hexdigest()
+
+        tables = self._read_cache(cache_dir, signature)
+        self.from_cache = tables is not None
+        if tables is None:
+            tables = self._generate(start, productions)
+            self._write_cache(cache_dir, signature, tables)
+
+        (self._action, self._goto, self._productions, conflicts) = tables
+
+        self.conflicts = [
+            f"terminal '{other}' is a prefix of '{terminal}'"
+            for terminal in sorted(grammar.terminals)
+            for other in self._terminals.matches(terminal, 0)
+            if other != terminal
+        ] + conflicts
+
+    def is_lalr(self) -> bool:
+        return len(self.conflicts) == 0
+
+    def recognize(self, string: str) -> bool:
+        assert self.is_lalr(), f"Grammar is not LALR(1): {self.conflicts}"
+
+        states = [0]
+        position = 0
+        (token, width) = self._token(string, position)
+
+        while True:
+            action = self._action[states[-1]].get(token)
+            if action is None:
+                return False
+            if action > 0:
+                states.append(action)
+                position += width
+                (token, width) = self._token(string, position)
+            elif action < 0:
+                (name, length) = self._productions[-action]
+                if length:
+                    del states[-length:]
+                states.append(self._goto[states[-1]][name])
+            else:
+                return True
+
+    def _token(self, string: str, position: int) -> Tuple[Optional[str], int]:
+        if position == len(string):
+            return (END_TOKEN, 0)
+        terminal = self._terminals.token(string, position)
+        if terminal is None:
+            return (None, 0)
+        return (self._tokens[terminal], len(terminal))
+
+    def _generate(self, start: str, productions: List[Tuple[str, Tuple[str, ...]]]):
+        ply_grammar = yacc.Grammar(sorted(self._tokens.values()))
+        for (name, syms) in productions:
+            ply_grammar.add_production(name, list(syms))
+        ply_grammar.set_start(start)
+
+        try:
+            table = yacc.LRGeneratedTable(ply_grammar, "LALR")
+        except yacc.LALRError as error:
+            # e.g. cycles `A ⇒+ A`, for which ply finds conflicts it cannot classify
+            return ({}, {}, [], [f"tables cannot be generated: {error}"])
+
+        conflicts: List[str] = []
+        for conflict in [
+            f"shift/reduce conflict in state {state} on {self._names[token]} "
+            f"(resolved as {resolution})"
+            for (state, token, resolution) in table.sr_conflicts
+        ] + [
+            f"reduce/reduce conflict in state {state} between "
+            f"{self._production_to_string(chosen)} and "
+            f"{self._production_to_string(rejected)}"
+            for (state, chosen, rejected) in table.rr_conflicts
+        ]:
+            # ply reports the same conflict once per lookahead
+            if conflict not in conflicts:
+                conflicts.append(conflict)
+
+        return (
+            table.lr_action,
+            table.lr_goto,
+            [(production.name, production.len) for production in table.lr_productions],
+            conflicts,
+        )
+
+    def _production_to_string(self, production) -> str:
+        right = " ".join(self._names[name] for name in production.prod)
+        return f"{self._names[production.name]} → {right or 'ε'}"
+
+    def _read_cache(self, cache_dir: Optional[str], signature: str):
+        if cache_dir is None:
+            return None
+        try:
+            with open(os.path.join(cache_dir, f"{signature}.pickle"), "rb") as cache:
+                (cached_signature, tables) = pickle.load(cache)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+        return tables if cached_signature == signature else None
+
+    def _write_cache(self, cache_dir: Optional[str], signature: str, tables) -> None:
+        if cache_dir is None:
+            return
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # written under a temporary name first, so readers never see partial files
+            (descriptor, path) = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as cache:
+                pickle.dump((signature, tables), cache)
+            os.replace(path, os.path.join(cache_dir, f"{signature}.pickle"))
+        except OSError:
+            pass
@@ -0,0 +1,194 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+from parser import Grammar, Empty, NonTerminal, Single, Terminal
+from compiled_grammar import TerminalTrie
+from stack import Stack, EMPTY_STACK
+
+
+class _EndOfInput:
+    # lookahead at the end of input, never equal to a terminal
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "$"
+
+    def __reduce__(self) -> str:
+        # unpickled as the module-level instance
+        return "END_OF_INPUT"
+
+
+END_OF_INPUT = _EndOfInput()
+
+Lookahead = Union[str, _EndOfInput]
+
+
+class LL1Parser:
+    # predictive parser from FIRST/FOLLOW sets; `conflicts` maps non-terminals to the
+    # lookaheads that select several alternatives (`None` for terminals that prefix
+    # other terminals), `recognize` runs in linear time if there are none
+
+    grammar: Grammar
+    first: Dict[str, Set[str]]
+    follow: Dict[str, Set[Lookahead]]
+    nullable: Set[str]
+    table: Dict[str, Dict[Lookahead, Tuple[Single, ...]]]
+    conflicts: Dict[Optional[str], Set[Lookahead]]
+
+    def __init__(self, grammar: Grammar):
+        self.grammar = grammar
+        self.start = grammar.ast.start.variable
+        # alternatives without epsilons for FIRST/FOLLOW sets, and as they are
+        # pushed onto the stack, so that epsilons are popped like in the trace of
+        # `Interpreter.evaluate`
+        self.alternatives: Dict[str, List[Tuple[Single, ...]]] = {}
+        self.bodies: Dict[str, List[Tuple[Single, ...]]] = {}
+
+        for rule in grammar.ast.ruleset.rules:
+            values = self.alternatives.setdefault(rule.variable.value, [])
+            bodies = self.bodies.setdefault(rule.variable.value, [])
+            for multiple in rule.values:
+                values.append(
+                    tuple(
+                        single
+                        for single in multiple.values
+                        if not isinstance(single.object, Empty)
+                    )
+                )
+                bodies.append(tuple(multiple.values))
+
+        self._compute_first()
+        self._compute_follow()
+        self._build_table()
+
+    def is_ll1(self) -> bool:
+        return len(self.conflicts) == 0
+
+    def conflicting_nonterminals(self) -> List[str]:
+        return sorted(nonterm for nonterm in self.conflicts if nonterm is not None)
+
+    def first_of(self, singles: Sequence[Single]) -> Tuple[Set[str], bool]:
+        # FIRST set of a sequence of singles and whether it derives epsilon
+        result: Set[str] = set()
+        for single in singles:
+            obj = single.object
+            if isinstance(obj, Terminal):
+                result.add(obj.value)
+                return (result, False)
+            result |= self.first.get(obj.value, set())
+            if obj.value not in self.nullable:
+                return (result, False)
+        return (result, True)
+
+    def recognize(
+        self, string: str, trace: bool = False
+    ) -> Tuple[bool, Optional[List[Tuple[int, Stack]]]]:
+        # `{ offset, stack }` trace like the one of `Interpreter.evaluate`, but over
+        # the grammar of the parser (usually the left-factored Greibah weak form),
+        # so non-terminals and steps differ from the backtracking search
+        assert self.is_ll1(), f"Grammar is not LL(1): {self.conflicting_nonterminals()}"
+
+        length = len(string)
+        position = 0
+        stack = EMPTY_STACK.push(Single(self.start))
+        evaluation_trace: Optional[List[Tuple[int, Stack]]] = [] if trace else None
+
+        while True:
+            if evaluation_trace is not None:
+                evaluation_trace.append((position, stack))
+
+            if len(stack) == 0:
+                break
+
+            (single, below) = stack.pop()
+            obj = single.object
+
+            if isinstance(obj, Terminal):
+                if not string.startswith(obj.value, position):
+                    return (False, [] if trace else None)
+                position += len(obj.value)
+                stack = below
+            elif isinstance(obj, NonTerminal):
+                lookahead = self._lookahead(string, position)
+                values = self.table.get(obj.value, {}).get(lookahead)
+                if values is None:
+                    return (False, [] if trace else None)
+                stack = below.push_sequence(values)
+            else:
+                stack = below
+
+        if position != length:
+            return (False, [] if trace else None)
+        return (True, evaluation_trace)
+
+    def _lookahead(self, string: str, position: int) -> Optional[Lookahead]:
+        if position == len(string):
+            return END_OF_INPUT
+        return self._terminals.token(string, position)
+
+    def _compute_first(self) -> None:
+        self.first = {nonterm: set() for nonterm in self.alternatives}
+        self.nullable = set()
+
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, values) in self.alternatives.items():
+                for singles in values:
+                    (first, nullable) = self.first_of(singles)
+                    if not first <= self.first[nonterm]:
+                        self.first[nonterm] |= first
+                        changed = True
+                    if nullable and nonterm not in self.nullable:
+                        self.nullable.add(nonterm)
+                        changed = True
+
+    def _compute_follow(self) -> None:
+        self.follow = {nonterm: set() for nonterm in self.alternatives}
+        self.follow.setdefault(self.start.value, set()).add(END_OF_INPUT)
+
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, values) in self.alternatives.items():
+                for singles in values:
+                    for (index, single) in enumerate(singles):
+                        if not isinstance(single.object, NonTerminal):
+                            continue
+
+                        (first, nullable) = self.first_of(singles[index + 1 :])
+                        if nullable:
+                            first = first | self.follow[nonterm]
+
+                        follow = self.follow.setdefault(single.object.value, set())
+                        if not first <= follow:
+                            follow |= first
+                            changed = True
+
+    def _build_table(self) -> None:
+        self.table = {}
+        self.conflicts = {}
+        self._terminals = TerminalTrie()
+
+        terminals = sorted(self.grammar.terminals)
+        for terminal in terminals:
+            self._terminals.add(terminal)
+        for terminal in terminals:
+            if len(list(self._terminals.matches(terminal, 0))) > 1:
+                self.conflicts.setdefault(None, set()).add(terminal)
+
+        for (nonterm, values) in self.alternatives.items():
+            row = self.table.setdefault(nonterm, {})
+            # alternatives without epsilons of the entries of the row
+            selected: Dict[Lookahead, Tuple[Single, ...]] = {}
+
+            for (singles, body) in zip(values, self.bodies[nonterm]):
+                (lookaheads, nullable) = self.first_of(singles)
+                if nullable:
+                    lookaheads = lookaheads | self.follow[nonterm]
+
+                for lookahead in lookaheads:
+                    if lookahead in selected and selected[lookahead] != singles:
+                        self.conflicts.setdefault(nonterm, set()).add(lookahead)
+                    elif lookahead not in selected:
+                        selected[lookahead] = singles
+                        row[lookahead] = body
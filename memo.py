@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class FailureMemo:
+    # LRU set of keys of configurations that are known to be rejected, bounded by
+    # `max_size` unless it is `None`
+
+    def __init__(self, max_size: Optional[int] = 100_000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._table: OrderedDict[Hashable, None] = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key in self._table:
+            self._table.move_to_end(key)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def add(self, key: Hashable) -> None:
+        self._table[key] = None
+        self._table.move_to_end(key)
+
+        if self.max_size is not None and len(self._table) > self.max_size:
+            self._table.popitem(last=False)
+
+    def clear(self) -> None:
+        self._table.clear()
+        self.hits = 0
+        self.misses = 0
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import sys
 import ply.yacc as yacc
-import copy
 
 from dataclasses import dataclass
-from typing import List, Set, Union
+from typing import ClassVar, Container, Dict, List, Set, Tuple, Union
 import lexer
 from tokens import tokens
 
@@ -30,20 +29,39 @@ from tokens import tokens
 # Root        : Start Ruleset
 
 # Data classes
-@dataclass
+@dataclass(frozen=True)
 class Empty:
     value: str = "ε"
 
+    # symbols cannot be changed and are shared between grammars, see `SymbolTable`
+    def __copy__(self) -> Empty:
+        return self
 
-@dataclass
+    def __deepcopy__(self, memo: dict) -> Empty:
+        return self
+
+
+@dataclass(frozen=True)
 class NonTerminal:
     value: str
 
+    def __copy__(self) -> NonTerminal:
+        return self
 
-@dataclass
+    def __deepcopy__(self, memo: dict) -> NonTerminal:
+        return self
+
+
+@dataclass(frozen=True)
 class Terminal:
     value: str
 
+    def __copy__(self) -> Terminal:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> Terminal:
+        return self
+
 
 @dataclass
 class Single:
@@ -116,9 +134,15 @@ class Ruleset:
         return result
 
     def sort(self):
-        for rule in self.rules:
-            rule.sort()
-        self.rules = sorted(self.rules, key=lambda rule: rule.to_string())
+        # rules may be shared with other grammars, sorted copies replace them
+        sorted_rules = [
+            Rule(
+                rule.variable,
+                sorted(rule.values, key=lambda multiple: multiple.to_string()),
+            )
+            for rule in self.rules
+        ]
+        self.rules = sorted(sorted_rules, key=lambda rule: rule.to_string())
 
 
 @dataclass
@@ -152,24 +176,21 @@ class Grammar:
         return Grammar(result_ast, self.terminals, self.non_terminals)
 
     def unflatten(self) -> Grammar:
-        non_terminals_rules: dict[str, List[Rule]] = {}
+        non_terminals_multiples: dict[str, List[Multiple]] = {}
 
         for rule in self.ast.ruleset.rules:
             nonterm = rule.variable.value
 
-            if nonterm not in non_terminals_rules:
-                non_terminals_rules[nonterm] = []
+            if nonterm not in non_terminals_multiples:
+                non_terminals_multiples[nonterm] = []
 
-            non_terminals_rules[nonterm].append(copy.deepcopy(rule))
+            non_terminals_multiples[nonterm] += rule.values
 
         new_ruleset = Ruleset([])
-        for (non_terminal_name, rules) in non_terminals_rules.items():
-            total_multiples: List[Multiple] = []
-            for rule in rules:
-                for multiple in rule.values:
-                    total_multiples.append(multiple)
-
-            new_ruleset.append(Rule(NonTerminal(non_terminal_name), total_multiples))
+        for (non_terminal_name, total_multiples) in non_terminals_multiples.items():
+            new_ruleset.append(
+                Rule(SYMBOLS.nonterminal(non_terminal_name), total_multiples)
+            )
 
         return Grammar(
             ast=Root(start=self.ast.start, ruleset=new_ruleset),
@@ -186,6 +207,190 @@ Rules:
 {self.ast.ruleset.to_string()}"""
 
 
+# Frozen data classes: immutable, slotted and hashable variants of the AST nodes
+# with tuples of children, usable as keys of sets and dictionaries; `freeze` and
+# `thaw` convert nodes between both kinds
+class _Frozen:
+    __slots__ = ()
+
+    def __reduce__(self):
+        # frozen instances cannot be restored by setting slots one by one
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+
+@dataclass(frozen=True)
+class FrozenEmpty(_Frozen):
+    __slots__ = ()
+    value: ClassVar[str] = "ε"
+
+
+@dataclass(frozen=True)
+class FrozenNonTerminal(_Frozen):
+    __slots__ = ("value",)
+    value: str
+
+
+@dataclass(frozen=True)
+class FrozenTerminal(_Frozen):
+    __slots__ = ("value",)
+    value: str
+
+
+@dataclass(frozen=True)
+class FrozenSingle(_Frozen):
+    __slots__ = ("object",)
+    object: Union[FrozenEmpty, FrozenNonTerminal, FrozenTerminal]
+
+    def to_string(self) -> str:
+        return "'" + self.object.value + "'"
+
+
+@dataclass(frozen=True)
+class FrozenMultiple(_Frozen):
+    __slots__ = ("values",)
+    values: Tuple[FrozenSingle, ...]
+
+    def to_string(self) -> str:
+        return ", ".join(single.to_string() for single in self.values)
+
+
+@dataclass(frozen=True)
+class FrozenRule(_Frozen):
+    __slots__ = ("variable", "values")
+    variable: FrozenNonTerminal
+    values: Tuple[FrozenMultiple, ...]
+
+    def to_string(self) -> str:
+        result = " | ".join(
+            "[" + multiple.to_string() + "]" for multiple in self.values
+        )
+        return "'" + self.variable.value + "'" + " -> " + result
+
+
+Node = Union[Empty, NonTerminal, Terminal, Single, Multiple, Rule]
+FrozenNode = Union[
+    FrozenEmpty,
+    FrozenNonTerminal,
+    FrozenTerminal,
+    FrozenSingle,
+    FrozenMultiple,
+    FrozenRule,
+]
+
+
+def freeze(node: Node) -> FrozenNode:
+    if isinstance(node, Empty):
+        return FrozenEmpty()
+    if isinstance(node, NonTerminal):
+        return FrozenNonTerminal(node.value)
+    if isinstance(node, Terminal):
+        return FrozenTerminal(node.value)
+    if isinstance(node, Single):
+        return FrozenSingle(freeze(node.object))
+    if isinstance(node, Multiple):
+        return FrozenMultiple(tuple(freeze(single) for single in node.values))
+    if isinstance(node, Rule):
+        return FrozenRule(
+            freeze(node.variable), tuple(freeze(multiple) for multiple in node.values)
+        )
+    raise TypeError(f"Cannot freeze {type(node).__name__}")
+
+
+def thaw(node: FrozenNode) -> Node:
+    # mutable copy that only shares the symbols of `SYMBOLS` with other nodes
+    if isinstance(node, FrozenEmpty):
+        return SYMBOLS.empty
+    if isinstance(node, FrozenNonTerminal):
+        return SYMBOLS.nonterminal(node.value)
+    if isinstance(node, FrozenTerminal):
+        return SYMBOLS.terminal(node.value)
+    if isinstance(node, FrozenSingle):
+        return Single(thaw(node.object))
+    if isinstance(node, FrozenMultiple):
+        return Multiple([thaw(single) for single in node.values])
+    if isinstance(node, FrozenRule):
+        return Rule(thaw(node.variable), [thaw(multiple) for multiple in node.values])
+    raise TypeError(f"Cannot thaw {type(node).__name__}")
+
+
+Symbol = Union[Empty, NonTerminal, Terminal]
+
+
+class SymbolTable:
+    # interned frozen terminals and non-terminals, one per kind and name, shared by all
+    # grammars; ids are given out in order of interning, so a table of its own numbers
+    # the symbols of a single grammar densely (see `PushdownAutomaton`)
+
+    def __init__(self):
+        self._ids: Dict[Tuple[type, str], int] = {}
+        self._symbols: List[Symbol] = []
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    @property
+    def empty(self) -> Empty:
+        # interned when it is first used, like other symbols
+        return self._intern(Empty())
+
+    def terminal(self, name: str) -> Terminal:
+        return self._intern(Terminal(name))
+
+    def nonterminal(self, name: str) -> NonTerminal:
+        return self._intern(NonTerminal(name))
+
+    def id(self, symbol: Symbol) -> int:
+        self._intern(symbol)
+        return self._ids[(type(symbol), symbol.value)]
+
+    def symbol(self, index: int) -> Symbol:
+        return self._symbols[index]
+
+    def fresh_names(self, used_names: Container[str]) -> FreshNames:
+        return FreshNames(self, used_names)
+
+    def _intern(self, symbol: Symbol) -> Symbol:
+        key = (type(symbol), symbol.value)
+        index = self._ids.get(key)
+        if index is None:
+            index = len(self._symbols)
+            self._ids[key] = index
+            name = sys.intern(symbol.value)
+            if name is not symbol.value:
+                symbol = type(symbol)(name)
+            self._symbols.append(symbol)
+        return self._symbols[index]
+
+
+class FreshNames:
+    # Non-terminals with names that are not used yet: `A`, `A'`, `A''`, ... for base
+    # name `A`, the shortest unused one first. Every name it returns becomes used.
+    # The number of primes tried last is remembered for every base name, since names
+    # are only added, so a sequence of `n` names of the same base costs O(n).
+
+    def __init__(self, table: SymbolTable, used_names: Container[str]):
+        # `used_names` is not copied and must not change while names are generated
+        self.table = table
+        self.used_names = used_names
+        self._added: Set[str] = set()
+        self._primes: Dict[str, int] = {}
+
+    def nonterminal(self, base: str) -> NonTerminal:
+        primes = self._primes.get(base, 0)
+        name = base + "'" * primes
+        while name in self.used_names or name in self._added:
+            primes += 1
+            name += "'"
+
+        self._primes[base] = primes
+        self._added.add(name)
+        return self.table.nonterminal(name)
+
+
+# symbols shared by the parser, the transformer and the interpreter
+SYMBOLS = SymbolTable()
+
+
 # Parsing
 def p_error(p):
     if p is None:
@@ -207,7 +412,7 @@ def p_start(p):
     """
     Start : START
     """
-    p[0] = Start(NonTerminal(p[1]))
+    p[0] = Start(SYMBOLS.nonterminal(p[1]))
 
 
 def p_ruleset(p):
@@ -226,7 +431,7 @@ def p_rule(p):
     """
     Rule : NON_TERMINAL ARROW Description END
     """
-    p[0] = Rule(NonTerminal(p[1]), p[3].values)
+    p[0] = Rule(SYMBOLS.nonterminal(p[1]), p[3].values)
 
 
 def p_description(p):
@@ -257,21 +462,21 @@ def p_single_empty(p):
     """
     Single : EMPTY
     """
-    p[0] = Single(Empty())
+    p[0] = Single(SYMBOLS.empty)
 
 
 def p_single_non_terminal(p):
     """
     Single : NON_TERMINAL
     """
-    p[0] = Single(NonTerminal(p[1]))
+    p[0] = Single(SYMBOLS.nonterminal(p[1]))
 
 
 def p_single_terminal(p):
     """
     Single : TERMINAL
     """
-    p[0] = Single(Terminal(p[1]))
+    p[0] = Single(SYMBOLS.terminal(p[1]))
 
 
 # Helper functions
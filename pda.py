@@ -0,0 +1,302 @@
+import argparse
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+from parser import Grammar, NonTerminal, SYMBOLS, Single, SymbolTable, Terminal
+from compiled_grammar import CompiledGrammar, INFINITY
+from transformer import Transformer
+
+# stack cell of the empty stack in `PushdownAutomaton.recognize`
+EMPTY = 0
+
+
+class PushdownAutomaton:
+    # pushdown automaton of a left-factored grammar in Greibah weak form over flat
+    # integer tables; codes are ids of `symbols`: characters, the epsilon as the `end`
+    # of input lookahead, then non-terminals. `table` has a row of `end + 1` lookahead
+    # columns per non-terminal with ranges of `entries`, alternative `i` pushes
+    # `bodies[body_offsets[i]:body_offsets[i + 1]]`
+
+    symbols: SymbolTable
+    # number of characters, also the code of the epsilon and of the end of input
+    # lookahead
+    end: int
+    start: int
+    table: array
+    entries: array
+    body_offsets: array
+    bodies: array
+    min_yield: array
+    max_yield: array
+
+    def __init__(self, grammar: Grammar):
+        # runs that read the same prefix share a stack after left factoring; without
+        # it, runs of ambiguous alternatives such as `( S )` and `( S ) S` multiply
+        compiled = CompiledGrammar(Transformer().left_factor(grammar))
+
+        objects = [
+            single.object
+            for values in compiled.alternatives.values()
+            for singles in values
+            for single in singles
+        ]
+        chars = sorted(
+            {char for obj in objects if isinstance(obj, Terminal) for char in obj.value}
+        )
+        # non-terminals without rules derive nothing, but may still be referenced
+        nonterminals = sorted(
+            set(compiled.alternatives)
+            | {obj.value for obj in objects if isinstance(obj, NonTerminal)}
+            | {compiled.start.object.value}
+        )
+
+        self.symbols = SymbolTable()
+        self.codes: Dict[str, int] = {
+            char: self.symbols.id(SYMBOLS.terminal(char)) for char in chars
+        }
+        self.end = self.symbols.id(SYMBOLS.empty)
+        nonterminal_codes = {
+            nonterm: self.symbols.id(SYMBOLS.nonterminal(nonterm))
+            for nonterm in nonterminals
+        }
+        self.start = nonterminal_codes[compiled.start.object.value]
+
+        self.min_yield = array("d", [1] * len(chars) + [0])
+        self.max_yield = array("d", [1] * len(chars) + [0])
+        for nonterm in nonterminals:
+            (low, high) = compiled.bounds(Single(SYMBOLS.nonterminal(nonterm)))
+            self.min_yield.append(low)
+            self.max_yield.append(high)
+
+        # alternatives as sequences of codes, without epsilons
+        alternatives: Dict[int, List[List[int]]] = {}
+        for nonterm in nonterminals:
+            alternatives[nonterminal_codes[nonterm]] = [
+                [
+                    code
+                    for single in singles
+                    for code in (
+                        [self.codes[char] for char in single.object.value]
+                        if isinstance(single.object, Terminal)
+                        else [nonterminal_codes[single.object.value]]
+                        if isinstance(single.object, NonTerminal)
+                        else []
+                    )
+                ]
+                for singles in compiled.alternatives.get(nonterm, ())
+            ]
+
+        (first, nullable) = self._first_sets(alternatives)
+
+        self.body_offsets = array("i", [0])
+        self.bodies = array("i")
+        self.table = array("i", [0])
+        self.entries = array("i")
+        lookaheads = range(self.end + 1)
+
+        for nonterm in range(self.end + 1, len(self.symbols)):
+            columns: List[List[int]] = [[] for _ in lookaheads]
+
+            for body in alternatives[nonterm]:
+                if sum(self.min_yield[code] for code in body) == INFINITY:
+                    continue
+
+                index = len(self.body_offsets) - 1
+                self.bodies.extend(reversed(body))
+                self.body_offsets.append(len(self.bodies))
+
+                (starts, is_nullable) = self._first_of(body, first, nullable)
+                for lookahead in lookaheads if is_nullable else sorted(starts):
+                    columns[lookahead].append(index)
+
+            for column in columns:
+                self.entries.extend(column)
+                self.table.append(len(self.entries))
+
+    def recognize(self, string: str) -> bool:
+        codes = []
+        for char in string:
+            code = self.codes.get(char)
+            if code is None:
+                return False
+            codes.append(code)
+        codes.append(self.end)
+
+        # Stacks are interned into cells of a trie: the cell of a stack is pushed
+        # onto the cell of the stack below it, so every stack is a single integer.
+        cells: Dict[int, int] = {}
+        top = [-1]
+        below = [-1]
+        min_yield = [0.0]
+        max_yield = [0.0]
+
+        def push(stack: int, code: int) -> int:
+            key = stack * len(self.symbols) + code
+            cell = cells.get(key)
+            if cell is None:
+                cell = len(top)
+                cells[key] = cell
+                top.append(code)
+                below.append(stack)
+                min_yield.append(min_yield[stack] + self.min_yield[code])
+                max_yield.append(max_yield[stack] + self.max_yield[code])
+            return cell
+
+        def closure(stacks: Iterable[int], position: int) -> Set[int]:
+            # stacks with the lookahead on the top (or empty at the end of input)
+            # reachable by expansions of non-terminals
+            lookahead = codes[position]
+            remaining = len(string) - position
+            result: Set[int] = set()
+            seen: Set[int] = set()
+            pending = list(stacks)
+
+            while len(pending):
+                stack = pending.pop()
+                if stack in seen:
+                    continue
+                seen.add(stack)
+                if not min_yield[stack] <= remaining <= max_yield[stack]:
+                    continue
+
+                if stack == EMPTY:
+                    if lookahead == self.end:
+                        result.add(stack)
+                    continue
+
+                code = top[stack]
+                if code < self.end:
+                    if code == lookahead:
+                        result.add(stack)
+                    continue
+
+                column = self._column(code, lookahead)
+                for entry in range(self.table[column], self.table[column + 1]):
+                    alternative = self.entries[entry]
+                    pushed = below[stack]
+                    for offset in range(
+                        self.body_offsets[alternative],
+                        self.body_offsets[alternative + 1],
+                    ):
+                        pushed = push(pushed, self.bodies[offset])
+                    pending.append(pushed)
+
+            return result
+
+        stacks = closure([push(EMPTY, self.start)], 0)
+        for position in range(len(string)):
+            if len(stacks) == 0:
+                return False
+            stacks = closure([below[stack] for stack in stacks], position + 1)
+
+        return EMPTY in stacks
+
+    def dump(self) -> str:
+        # human-readable transition tables
+        lines = ["Symbols:"]
+        for code in range(len(self.symbols)):
+            if code == self.end:
+                lines.append(f"  {code}: $ (end of input)")
+                continue
+            kind = "terminal" if code < self.end else "non-terminal"
+            lines.append(f"  {code}: {self._name(code)!r} ({kind})")
+        lines.append(f"Start: {self.start}")
+
+        lines.append("Transitions:")
+        for nonterm in range(self.end + 1, len(self.symbols)):
+            for lookahead in range(self.end + 1):
+                column = self._column(nonterm, lookahead)
+                bodies = [
+                    self._body_to_string(self.entries[entry])
+                    for entry in range(self.table[column], self.table[column + 1])
+                ]
+                if len(bodies) == 0:
+                    continue
+                read = "$" if lookahead == self.end else repr(self._name(lookahead))
+                lines.append(
+                    f"  {self._name(nonterm)}, {read} -> " + " | ".join(bodies)
+                )
+
+        lines.append(
+            f"Tables: {len(self.table)} table offsets, {len(self.entries)} entries, "
+            f"{len(self.body_offsets) - 1} alternatives, {len(self.bodies)} symbols "
+            "in bodies"
+        )
+        return "\n".join(lines)
+
+    def _body_to_string(self, alternative: int) -> str:
+        codes = self.bodies[
+            self.body_offsets[alternative] : self.body_offsets[alternative + 1]
+        ]
+        if len(codes) == 0:
+            return "ε"
+        return " ".join(
+            repr(self._name(code)) if code < self.end else self._name(code)
+            for code in reversed(codes)
+        )
+
+    def _name(self, code: int) -> str:
+        return self.symbols.symbol(code).value
+
+    def _column(self, nonterm: int, lookahead: int) -> int:
+        # offset of the alternatives of the non-terminal for the lookahead in `table`
+        return (nonterm - self.end - 1) * (self.end + 1) + lookahead
+
+    def _first_sets(
+        self, alternatives: Dict[int, List[List[int]]]
+    ) -> Tuple[Dict[int, Set[int]], Set[int]]:
+        # characters that strings derived from every non-terminal start with, and
+        # the set of non-terminals that derive the empty string
+        first: Dict[int, Set[int]] = {nonterm: set() for nonterm in alternatives}
+        nullable: Set[int] = set()
+
+        changed = True
+        while changed:
+            changed = False
+            for (nonterm, bodies) in alternatives.items():
+                for body in bodies:
+                    (starts, is_nullable) = self._first_of(body, first, nullable)
+                    if not starts <= first[nonterm]:
+                        first[nonterm] |= starts
+                        changed = True
+                    if is_nullable and nonterm not in nullable:
+                        nullable.add(nonterm)
+                        changed = True
+
+        return (first, nullable)
+
+    def _first_of(
+        self, body: List[int], first: Dict[int, Set[int]], nullable: Set[int]
+    ) -> Tuple[Set[int], bool]:
+        starts: Set[int] = set()
+        for code in body:
+            if code < self.end:
+                starts.add(code)
+                return (starts, False)
+            starts |= first[code]
+            if code not in nullable:
+                return (starts, False)
+        return (starts, True)
+
+
+def main():
+    from interpreter import messages_to_stderr, read_grammar
+
+    arguments = argparse.ArgumentParser(
+        description="Prints transition tables of the pushdown automaton of the grammar "
+        "and recognizes strings with it."
+    )
+    arguments.add_argument("grammar", help="path to file with grammar")
+    arguments.add_argument("strings", nargs="*", help="strings to recognize")
+    args = arguments.parse_args()
+
+    with messages_to_stderr():
+        grammar = Transformer().to_greibah_weak_form(read_grammar(args.grammar))
+
+    automaton = PushdownAutomaton(grammar)
+    print(automaton.dump())
+    for string in args.strings:
+        print(f"{string!r}: {automaton.recognize(string)}")
+
+
+if __name__ == "__main__":
+    main()
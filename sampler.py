@@ -0,0 +1,267 @@
+import argparse
+import bisect
+import contextlib
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from parser import Grammar, NonTerminal, Terminal
+from transformer import Transformer
+from cyk import CYKRecognizer
+from earley import EarleyRecognizer
+from sppf import ParseForest
+
+# choice of a derivation step: `{ rule index, split }`, where the split is the length
+# of the part derived from the left non-terminal of a binary rule (0 for terminals)
+Choice = Tuple[int, int]
+
+
+class UniformSampler:
+    # strings of a given length drawn uniformly over derivations of the grammar in
+    # Chomsky normal form, `counts[A, n]` is the number of derivations of `n` characters
+    # from `A`; `correct_ambiguity` makes it uniform over strings
+
+    nonterminals: List[str]
+    counts: np.ndarray
+
+    def __init__(self, grammar: Grammar, correct_ambiguity: bool = False):
+        tr = Transformer()
+        self.grammar = tr.to_chomsky_normal_form(grammar)
+        self.correct_ambiguity = correct_ambiguity
+
+        self.nonterminals = sorted(self.grammar.non_terminals)
+        index = {nonterm: i for (i, nonterm) in enumerate(self.nonterminals)}
+        self.start = index[self.grammar.ast.start.variable.value]
+        self.alphabet = sorted(set("".join(self.grammar.terminals)))
+
+        # rules are `{ head, left, right }` for binary ones and `{ head, terminal }`
+        # for terminal ones
+        self.binary_rules: List[Tuple[int, int, int]] = []
+        self.terminal_rules: List[Tuple[int, str]] = []
+        self.accepts_empty = False
+
+        for rule in self.grammar.ast.ruleset.rules:
+            head = index[rule.variable.value]
+            for multiple in rule.values:
+                objects = [single.object for single in multiple.values]
+
+                if len(objects) == 2:
+                    self.binary_rules.append(
+                        (head, index[objects[0].value], index[objects[1].value])
+                    )
+                elif isinstance(objects[0], Terminal):
+                    self.terminal_rules.append((head, objects[0].value))
+                elif not isinstance(objects[0], NonTerminal):
+                    self.accepts_empty = True
+
+        self.counts = np.zeros((len(self.nonterminals), 1), dtype=object)
+        self._choices: Dict[Tuple[int, int], Tuple[List[float], List[Choice]]] = {}
+        self._recognizer: Optional[CYKRecognizer] = None
+        self._earley: Optional[EarleyRecognizer] = None
+
+    def count(self, length: int) -> int:
+        # number of derivations of strings of `length` characters
+        if length == 0:
+            return int(self.accepts_empty)
+        self._extend(length)
+        return self.counts[self.start, length]
+
+    def sample(self, length: int, rng: Optional[random.Random] = None) -> Optional[str]:
+        # `None` if the language has no strings of this length
+        rng = rng if rng is not None else random.Random()
+        if self.count(length) == 0:
+            return None
+        if length == 0:
+            return ""
+
+        while True:
+            string = self._derive(length, rng)
+            if not self.correct_ambiguity:
+                return string
+            if rng.random() * self._derivations(string) < 1:
+                return string
+
+    def sample_many(
+        self, length: int, count: int, seed: Optional[int] = None
+    ) -> Iterator[str]:
+        rng = random.Random(seed)
+        for _ in range(count):
+            string = self.sample(length, rng)
+            if string is None:
+                return
+            yield string
+
+    def near_misses(
+        self, length: int, count: int, seed: Optional[int] = None
+    ) -> Iterator[str]:
+        # Strings that are not in the language, each obtained from a uniformly drawn
+        # member of `length` characters by a single random edit (insertion, deletion,
+        # substitution or swap of adjacent characters). Gives up after `100 * count`
+        # failed attempts, e.g. if every edit keeps strings in the language.
+        rng = random.Random(seed)
+        if self._recognizer is None:
+            self._recognizer = CYKRecognizer(self.grammar)
+
+        produced = 0
+        attempts = 0
+        while produced < count and attempts < 100 * count:
+            batch = []
+            for _ in range(min(count - produced, 1024)):
+                string = self.sample(length, rng)
+                if string is None:
+                    return
+                batch.append(self._mutate(string, rng))
+            attempts += len(batch)
+
+            for (string, accepted) in zip(
+                batch, self._recognizer.recognize_many(batch)
+            ):
+                if not accepted and produced < count:
+                    produced += 1
+                    yield string
+
+    def _derive(self, length: int, rng: random.Random) -> str:
+        result: List[str] = []
+        pending = [(self.start, length)]
+
+        while len(pending):
+            (nonterm, span) = pending.pop()
+            (cumulative, choices) = self._choices_of(nonterm, span)
+            (rule, split) = choices[bisect.bisect_right(cumulative, rng.random())]
+
+            if split == 0:
+                result.append(self.terminal_rules[rule][1])
+            else:
+                (_, left, right) = self.binary_rules[rule]
+                pending.append((right, span - split))
+                pending.append((left, split))
+
+        return "".join(result)
+
+    def _choices_of(
+        self, nonterm: int, length: int
+    ) -> Tuple[List[float], List[Choice]]:
+        # cumulative probabilities of derivation steps from `nonterm` over `length`
+        key = (nonterm, length)
+        if key in self._choices:
+            return self._choices[key]
+
+        weights: List[int] = []
+        choices: List[Choice] = []
+        for (rule, (head, terminal)) in enumerate(self.terminal_rules):
+            if head == nonterm and len(terminal) == length:
+                weights.append(1)
+                choices.append((rule, 0))
+        for (rule, (head, left, right)) in enumerate(self.binary_rules):
+            if head != nonterm:
+                continue
+            for split in range(1, length):
+                weight = self.counts[left, split] * self.counts[right, length - split]
+                if weight:
+                    weights.append(weight)
+                    choices.append((rule, split))
+
+        total = sum(weights)
+        cumulative: List[float] = []
+        running = 0
+        for weight in weights[:-1]:
+            running += weight
+            cumulative.append(running / total)
+
+        self._choices[key] = (cumulative, choices)
+        return self._choices[key]
+
+    def _extend(self, length: int) -> None:
+        known = self.counts.shape[1] - 1
+        if length <= known:
+            return
+
+        counts = np.zeros((len(self.nonterminals), length + 1), dtype=object)
+        counts[:, : known + 1] = self.counts
+
+        for span in range(known + 1, length + 1):
+            for (head, terminal) in self.terminal_rules:
+                if len(terminal) == span:
+                    counts[head, span] += 1
+            # non-terminals other than the start do not derive the empty string
+            for (head, left, right) in self.binary_rules:
+                counts[head, span] += np.dot(
+                    counts[left, 1:span], counts[right, span - 1 : 0 : -1]
+                )
+
+        self.counts = counts
+
+    def _derivations(self, string: str) -> int:
+        if self._earley is None:
+            self._earley = EarleyRecognizer(self.grammar)
+        return ParseForest(self._earley.chart(string)).count()
+
+    def _mutate(self, string: str, rng: random.Random) -> str:
+        operation = rng.randrange(4) if len(string) > 1 else rng.randrange(3)
+        if len(string) == 0:
+            operation = 0
+
+        if operation == 0:
+            position = rng.randrange(len(string) + 1)
+            return string[:position] + rng.choice(self.alphabet) + string[position:]
+        if operation == 3:
+            position = rng.randrange(len(string) - 1)
+            return (
+                string[:position]
+                + string[position + 1]
+                + string[position]
+                + string[position + 2 :]
+            )
+
+        position = rng.randrange(len(string))
+        replacement = rng.choice(self.alphabet) if operation == 2 else ""
+        return string[:position] + replacement + string[position + 1 :]
+
+
+def main():
+    from interpreter import messages_to_stderr, read_grammar
+
+    arguments = argparse.ArgumentParser(
+        description="Prints random strings of the given length drawn uniformly from "
+        "the language of the grammar, one per line."
+    )
+    arguments.add_argument("grammar", help="path to file with grammar")
+    arguments.add_argument("length", type=int, help="length of strings")
+    arguments.add_argument("count", type=int, help="number of strings")
+    arguments.add_argument(
+        "--near-miss",
+        action="store_true",
+        help="print strings that are not in the language, each one a single edit "
+        "away from a random string of the language",
+    )
+    arguments.add_argument(
+        "--correct-ambiguity",
+        action="store_true",
+        help="draw uniformly over strings rather than derivations for ambiguous "
+        "grammars (slower)",
+    )
+    arguments.add_argument("--seed", type=int, help="seed of the random generator")
+    arguments.add_argument(
+        "-o", "--output", help="file to write strings into (default: stdout)"
+    )
+    args = arguments.parse_args()
+
+    with messages_to_stderr():
+        sampler = UniformSampler(read_grammar(args.grammar), args.correct_ambiguity)
+
+    if args.near_miss:
+        strings = sampler.near_misses(args.length, args.count, args.seed)
+    else:
+        strings = sampler.sample_many(args.length, args.count, args.seed)
+
+    with (
+        open(args.output, "w", encoding="utf-8")
+        if args.output is not None
+        else contextlib.nullcontext(sys.stdout)
+    ) as output:
+        for string in strings:
+            print(string, file=output)
+
+
+if __name__ == "__main__":
+    main()
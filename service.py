@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, Optional, Tuple
+from interpreter import ENGINES, Interpreter, LimitExceeded, read_grammar
+
+# number of the most recent latencies percentiles are computed from
+LATENCY_WINDOW = 10_000
+
+# default limit of the length of a request line, in bytes
+MAX_LINE = 16 * 1024 * 1024
+
+
+class LatencyMetrics:
+    # latencies of the requests to a single grammar, in milliseconds
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.requests = 0
+        self.accepted = 0
+        self.errors = 0
+        self.limited = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(
+        self, latency: float, accepted: Optional[bool], limited: bool = False
+    ) -> None:
+        # `accepted` is `None` for failed requests and those stopped by a limit
+        self.requests += 1
+        if limited:
+            self.limited += 1
+        elif accepted is None:
+            self.errors += 1
+        elif accepted:
+            self.accepted += 1
+
+        self.total += latency
+        self.max = max(self.max, latency)
+        self._recent.append(latency)
+
+    def percentile(self, fraction: float) -> float:
+        if len(self._recent) == 0:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "errors": self.errors,
+            "limited": self.limited,
+            "mean_ms": self.total / self.requests if self.requests else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max,
+        }
+
+
+# interpreters of a worker process of `GrammarService`
+_worker_interpreters: Dict[str, Interpreter] = {}
+
+
+def _init_worker(interpreters: Dict[str, Interpreter]) -> None:
+    global _worker_interpreters
+    _worker_interpreters = interpreters
+
+
+def _evaluate(
+    name: str, string: str, max_steps: Optional[int], timeout: Optional[float]
+) -> Tuple[Optional[bool], Optional[Dict[str, Any]]]:
+    # `{ accepted, limit }`, `limit` describes the limit that stopped the search
+    deadline = None if timeout is None else time.monotonic() + timeout
+    (accepted, details) = _worker_interpreters[name].evaluate(
+        string, False, max_steps, deadline
+    )
+    if isinstance(details, LimitExceeded):
+        return (
+            None,
+            {
+                "reason": details.reason,
+                "steps": details.steps,
+                "position": details.position,
+            },
+        )
+    return (accepted, None)
+
+
+class GrammarService:
+    # recognition service over newline-delimited JSON, see README; requests of a
+    # connection are served concurrently, at most `max_pending` of them in flight, and
+    # evaluated in a pool of `jobs` worker processes
+
+    interpreters: Dict[str, Interpreter]
+    metrics: Dict[str, LatencyMetrics]
+
+    def __init__(
+        self,
+        interpreters: Dict[str, Interpreter],
+        jobs: int = 1,
+        max_pending: int = 0,
+        max_line: int = MAX_LINE,
+    ):
+        self.interpreters = interpreters
+        self.metrics = {name: LatencyMetrics() for name in interpreters}
+        self.jobs = jobs
+        self.max_pending = max_pending if max_pending > 0 else 4 * jobs
+        self.max_line = max_line
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._start_pool()
+        return await asyncio.start_server(
+            self._serve, host, port, limit=self.max_line
+        )
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        self._start_pool()
+        return await asyncio.start_unix_server(
+            self._serve, path, limit=self.max_line
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def handle(self, line: str) -> Dict[str, Any]:
+        # response to a single request line
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as error:
+            return {"id": None, "error": f"Malformed JSON: {error}"}
+        if not isinstance(request, dict):
+            return {"id": None, "error": "Request must be a JSON object"}
+
+        response: Dict[str, Any] = {"id": request.get("id")}
+        op = request.get("op", "evaluate")
+
+        if op == "grammars":
+            response["grammars"] = sorted(self.interpreters)
+        elif op == "metrics":
+            response["metrics"] = {
+                name: metrics.to_dict() for (name, metrics) in self.metrics.items()
+            }
+        elif op == "evaluate":
+            response.update(await self._evaluate(request))
+        else:
+            response["error"] = f"Unknown op '{op}'"
+        return response
+
+    async def _evaluate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        name = request.get("grammar")
+        string = request.get("string")
+
+        if name not in self.interpreters:
+            return {"error": f"Unknown grammar '{name}'"}
+        if not isinstance(string, str):
+            return {"grammar": name, "error": "'string' must be a string"}
+
+        max_steps = request.get("max_steps")
+        timeout_ms = request.get("timeout_ms")
+        for (field, value) in [("max_steps", max_steps), ("timeout_ms", timeout_ms)]:
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                return {"grammar": name, "error": f"'{field}' must be a number"}
+        timeout = None if timeout_ms is None else timeout_ms / 1000
+
+        # the pool is started by the servers, or here if requests are handled directly
+        self._start_pool()
+        started = time.perf_counter()
+        try:
+            async with self._slots:
+                (result, limit) = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, _evaluate, name, string, max_steps, timeout
+                )
+        except Exception as error:
+            self.metrics[name].record(_milliseconds_since(started), None)
+            return {"grammar": name, "error": f"Evaluation failed: {error!r}"}
+
+        latency = _milliseconds_since(started)
+        self.metrics[name].record(latency, result, limit is not None)
+        response = {"grammar": name, "result": result, "latency_ms": latency}
+        if limit is not None:
+            response["limit"] = limit
+        return response
+
+    def _start_pool(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.jobs, initializer=_init_worker, initargs=(self.interpreters,)
+            )
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        tasks = set()
+        # requests of this connection that are not answered yet
+        in_flight = asyncio.Semaphore(self.max_pending)
+
+        async def respond(line: Optional[bytes]) -> None:
+            try:
+                if line is None:
+                    response = {
+                        "id": None,
+                        "error": f"Request is longer than {self.max_line} bytes",
+                    }
+                else:
+                    response = await self.handle(line.decode("utf-8", "replace"))
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                await in_flight.acquire()
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    # the last line may have no line break
+                    line = error.partial
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    line = None
+
+                if line == b"":
+                    in_flight.release()
+                    break
+                if line is not None and line.strip() == b"":
+                    in_flight.release()
+                    continue
+
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if len(tasks):
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _skip_line(reader: asyncio.StreamReader) -> None:
+    # drops the rest of a line longer than the limit of the reader
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as error:
+            await reader.readexactly(error.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+def _milliseconds_since(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    arguments = argparse.ArgumentParser(
+        description="Serves recognition requests for the grammars loaded at startup "
+        "over newline-delimited JSON."
+    )
+    arguments.add_argument(
+        "grammars",
+        nargs="+",
+        metavar="NAME=PATH",
+        help="name of the grammar in requests and path to file with it",
+    )
+    address = arguments.add_mutually_exclusive_group(required=True)
+    address.add_argument("--tcp", metavar="HOST:PORT", help="listen on TCP address")
+    address.add_argument("--unix", metavar="PATH", help="listen on Unix socket")
+    arguments.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="gwf",
+        help="recognition algorithm (default: gwf)",
+    )
+    arguments.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
+    arguments.add_argument(
+        "--max-pending",
+        type=int,
+        default=0,
+        help="maximal number of evaluations submitted to workers at once, and of "
+        "requests in flight per connection (default: 4 per worker)",
+    )
+    arguments.add_argument(
+        "--max-line",
+        type=int,
+        default=MAX_LINE,
+        help=f"maximal length of a request line in bytes (default: {MAX_LINE})",
+    )
+    args = arguments.parse_args()
+
+    interpreters: Dict[str, Interpreter] = {}
+    for argument in args.grammars:
+        (name, separator, filepath) = argument.partition("=")
+        if separator == "":
+            arguments.error(f"Grammar '{argument}' is not in NAME=PATH form")
+
+        interpreters[name] = Interpreter(engine=args.engine)
+        interpreters[name].set_grammar(read_grammar(filepath))
+
+    service = GrammarService(interpreters, args.jobs, args.max_pending, args.max_line)
+
+    async def serve() -> None:
+        if args.tcp is not None:
+            (host, _, port) = args.tcp.rpartition(":")
+            server = await service.start_tcp(host or None, int(port))
+        else:
+            server = await service.start_unix(args.unix)
+
+        addresses = ", ".join(str(socket.getsockname()) for socket in server.sockets)
+        print(f"Serving grammars {sorted(interpreters)} on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
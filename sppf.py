@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union
+from parser import NonTerminal, Terminal
+from earley import EarleyChart
+
+# parse tree: `{ non-terminal, children }`, terminals are leaves
+Tree = Tuple[str, Tuple[Union["Tree", str], ...]]
+
+
+class SymbolNode:
+    # all derivations of `string[start:end]` from `nonterminal`
+
+    __slots__ = ("nonterminal", "start", "end", "families")
+
+    def __init__(self, nonterminal: str, start: int, end: int):
+        self.nonterminal = nonterminal
+        self.start = start
+        self.end = end
+        self.families: List[PackedNode] = []
+
+    def __repr__(self) -> str:
+        return f"SymbolNode({self.nonterminal!r}, {self.start}, {self.end})"
+
+
+class IntermediateNode:
+    # all derivations of `string[start:end]` from the first `dot` singles of a rule
+
+    __slots__ = ("rule", "dot", "start", "end", "families")
+
+    def __init__(self, rule: int, dot: int, start: int, end: int):
+        self.rule = rule
+        self.dot = dot
+        self.start = start
+        self.end = end
+        self.families: List[PackedNode] = []
+
+    def __repr__(self) -> str:
+        return f"IntermediateNode({self.rule}, {self.dot}, {self.start}, {self.end})"
+
+
+class TerminalNode:
+    __slots__ = ("terminal", "start", "end")
+
+    def __init__(self, terminal: str, start: int, end: int):
+        self.terminal = terminal
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"TerminalNode({self.terminal!r}, {self.start}, {self.end})"
+
+
+class PackedNode:
+    # One way to derive the span of its parent with the first `dot` singles of `rule`:
+    # `left` covers the first `dot - 1` singles up to `pivot` (it is `None` if
+    # `dot <= 1`), `right` covers the last one from `pivot` (`None` if `dot == 0`).
+
+    __slots__ = ("rule", "dot", "pivot", "left", "right")
+
+    def __init__(
+        self,
+        rule: int,
+        dot: int,
+        pivot: int,
+        left: Optional[IntermediateNode],
+        right: Union[SymbolNode, TerminalNode, None],
+    ):
+        self.rule = rule
+        self.dot = dot
+        self.pivot = pivot
+        self.left = left
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"PackedNode({self.rule}, {self.dot}, {self.pivot})"
+
+
+Node = Union[SymbolNode, IntermediateNode, TerminalNode]
+
+INFINITY = float("inf")
+
+
+def tree_to_string(tree: Tree) -> str:
+    (nonterminal, children) = tree
+    return (
+        f"{nonterminal}("
+        + " ".join(
+            f"'{child}'" if isinstance(child, str) else tree_to_string(child)
+            for child in children
+        )
+        + ")"
+    )
+
+
+class ParseForest:
+    # shared packed parse forest of a string from its Earley chart, one node per symbol
+    # or rule prefix and span, so O(n³) nodes; cyclic grammars give cyclic forests;
+    # `root` is `None` if the string is not recognized
+
+    root: Optional[SymbolNode]
+    # `{ non-terminal, singles without epsilons }` of the recognizer
+    rules: List[Tuple[str, tuple]]
+
+    def __init__(self, chart: EarleyChart):
+        recognizer = chart.recognizer
+        self.string = chart.string
+        self.rules = recognizer.rules
+        self.nodes: Dict[Hashable, Node] = {}
+
+        self._chart = chart
+        self._rules_by_nonterminal = recognizer.rules_by_nonterminal
+        # `{ non-terminal, origin }` pairs of completed items of every Earley set
+        self._completed: List[Set[Tuple[str, int]]] = [
+            {
+                (self.rules[rule][0], origin)
+                for (rule, dot, origin) in items
+                if dot == len(self.rules[rule][1])
+            }
+            for items in chart.sets
+        ]
+        self._pending: List[Union[SymbolNode, IntermediateNode]] = []
+
+        self.root = None
+        if chart.is_accepted():
+            self.root = self._symbol(recognizer.start, 0, len(self.string))
+            while len(self._pending):
+                self._expand(self._pending.pop())
+
+    def __len__(self) -> int:
+        # number of symbol, intermediate and terminal nodes
+        return len(self.nodes)
+
+    def packed_nodes(self) -> int:
+        return sum(
+            len(node.families)
+            for node in self.nodes.values()
+            if not isinstance(node, TerminalNode)
+        )
+
+    def is_ambiguous(self) -> bool:
+        return any(
+            len(node.families) > 1
+            for node in self.nodes.values()
+            if not isinstance(node, TerminalNode)
+        )
+
+    def ambiguous_nonterminals(self) -> Set[str]:
+        # non-terminals with a span derived in several ways, either by different
+        # alternatives or by different splits of the same alternative
+        return {
+            node.nonterminal
+            if isinstance(node, SymbolNode)
+            else self.rules[node.rule][0]
+            for node in self.nodes.values()
+            if not isinstance(node, TerminalNode) and len(node.families) > 1
+        }
+
+    def count(self, modulus: Optional[int] = None) -> Union[int, float]:
+        # number of parse trees (modulo `modulus` if it is set); infinite if the
+        # string has a derivation through a cycle `A ⇒+ A`
+        if self.root is None:
+            return 0
+        return self._counts(modulus)[id(self.root)]
+
+    def _counts(self, modulus: Optional[int]) -> Dict[int, Union[int, float]]:
+        # Number of derivations of every node by `id`. Strongly connected components
+        # of the forest (Tarjan's algorithm, iterative) come children first; nodes of
+        # components with a cycle have infinitely many derivations, since every node
+        # of the forest has at least one finite derivation.
+        counts: Dict[int, Union[int, float]] = {}
+        index: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        component: List[Node] = []
+        on_component: Set[int] = set()
+
+        def children(node: Node) -> List[Node]:
+            if isinstance(node, TerminalNode):
+                return []
+            return [
+                child
+                for family in node.families
+                for child in (family.left, family.right)
+                if child is not None
+            ]
+
+        def count(node: Node) -> Union[int, float]:
+            if isinstance(node, TerminalNode):
+                return 1
+            total: Union[int, float] = 0
+            for family in node.families:
+                product: Union[int, float] = 1
+                for child in (family.left, family.right):
+                    if child is not None:
+                        product *= counts[id(child)]
+                total += product
+            if modulus is not None and total != INFINITY:
+                total %= modulus
+            return total
+
+        for root in self.nodes.values():
+            if id(root) in index:
+                continue
+
+            work: List[Tuple[Node, Iterator[Node]]] = [(root, iter(children(root)))]
+            index[id(root)] = lowlink[id(root)] = len(index)
+            component.append(root)
+            on_component.add(id(root))
+
+            while len(work):
+                (node, successors) = work[-1]
+                child = next(successors, None)
+
+                if child is not None:
+                    if id(child) not in index:
+                        index[id(child)] = lowlink[id(child)] = len(index)
+                        component.append(child)
+                        on_component.add(id(child))
+                        work.append((child, iter(children(child))))
+                    elif id(child) in on_component:
+                        lowlink[id(node)] = min(lowlink[id(node)], index[id(child)])
+                    continue
+
+                work.pop()
+                if len(work):
+                    parent = work[-1][0]
+                    lowlink[id(parent)] = min(lowlink[id(parent)], lowlink[id(node)])
+                if lowlink[id(node)] != index[id(node)]:
+                    continue
+
+                members: List[Node] = []
+                while True:
+                    member = component.pop()
+                    on_component.discard(id(member))
+                    members.append(member)
+                    if member is node:
+                        break
+
+                cyclic = len(members) > 1 or any(
+                    child is node for child in children(node)
+                )
+                for member in members:
+                    counts[id(member)] = INFINITY if cyclic else count(member)
+
+        return counts
+
+    def trees(self) -> Iterator[Tree]:
+        # Lazily yields parse trees one by one. Derivations through cycles
+        # (`A ⇒+ A` over the same span) are infinitely many, only those that do not
+        # repeat a symbol node on the path from the root are yielded.
+        if self.root is not None:
+            yield from self._trees(self.root, frozenset())
+
+    def _trees(self, node: SymbolNode, path: frozenset) -> Iterator[Tree]:
+        path = path | {id(node)}
+        for family in node.families:
+            for children in self._children(family, path):
+                yield (node.nonterminal, children)
+
+    def _children(
+        self, family: PackedNode, path: frozenset
+    ) -> Iterator[Tuple[Union[Tree, str], ...]]:
+        if family.right is None:
+            yield ()
+            return
+
+        lefts: Iterator[Tuple[Union[Tree, str], ...]]
+        if family.left is None:
+            lefts = iter([()])
+        else:
+            lefts = (
+                children
+                for left_family in family.left.families
+                for children in self._children(left_family, path)
+            )
+
+        for left in lefts:
+            right = family.right
+            if isinstance(right, TerminalNode):
+                yield left + (right.terminal,)
+            elif id(right) not in path:
+                for tree in self._trees(right, path):
+                    yield left + (tree,)
+
+    def _symbol(self, nonterminal: str, start: int, end: int) -> SymbolNode:
+        key = ("symbol", nonterminal, start, end)
+        node = self.nodes.get(key)
+        if node is None:
+            node = SymbolNode(nonterminal, start, end)
+            self.nodes[key] = node
+            self._pending.append(node)
+        return node
+
+    def _intermediate(
+        self, rule: int, dot: int, start: int, end: int
+    ) -> IntermediateNode:
+        key = ("intermediate", rule, dot, start, end)
+        node = self.nodes.get(key)
+        if node is None:
+            node = IntermediateNode(rule, dot, start, end)
+            self.nodes[key] = node
+            self._pending.append(node)
+        return node
+
+    def _terminal(self, terminal: str, start: int, end: int) -> TerminalNode:
+        key = ("terminal", terminal, start, end)
+        node = self.nodes.get(key)
+        if node is None:
+            node = TerminalNode(terminal, start, end)
+            self.nodes[key] = node
+        return node
+
+    def _expand(self, node: Union[SymbolNode, IntermediateNode]) -> None:
+        if isinstance(node, IntermediateNode):
+            node.families = self._families(node.rule, node.dot, node.start, node.end)
+            return
+
+        for rule in self._rules_by_nonterminal.get(node.nonterminal, ()):
+            length = len(self.rules[rule][1])
+            if (node.end, (rule, length, node.start)) not in self._chart:
+                continue
+            if length == 0:
+                node.families.append(PackedNode(rule, 0, node.start, None, None))
+            else:
+                node.families += self._families(rule, length, node.start, node.end)
+
+    def _families(self, rule: int, dot: int, start: int, end: int) -> List[PackedNode]:
+        # packed nodes of the first `dot >= 1` singles of `rule` over `start..end`:
+        # one per pivot where the prefix of `dot - 1` singles ends and the last starts
+        obj = self.rules[rule][1][dot - 1].object
+        result: List[PackedNode] = []
+
+        if isinstance(obj, Terminal):
+            pivots = [end - len(obj.value)]
+            if pivots[0] < start or not self.string.startswith(obj.value, pivots[0]):
+                return result
+        else:
+            pivots = [
+                pivot
+                for pivot in range(start, end + 1)
+                if (obj.value, pivot) in self._completed[end]
+            ]
+
+        for pivot in pivots:
+            if dot == 1:
+                if pivot != start:
+                    continue
+                left = None
+            else:
+                if (pivot, (rule, dot - 1, start)) not in self._chart:
+                    continue
+                left = self._intermediate(rule, dot - 1, start, pivot)
+
+            right: Union[SymbolNode, TerminalNode]
+            if isinstance(obj, NonTerminal):
+                right = self._symbol(obj.value, pivot, end)
+            else:
+                right = self._terminal(obj.value, pivot, end)
+            result.append(PackedNode(rule, dot, pivot, left, right))
+
+        return result
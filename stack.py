@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Hashable, Iterator, List, Optional, Sequence, Tuple
+from parser import Single
+
+# unknown bounds of the length of a string derived from a symbol
+UNBOUNDED = (0, float("inf"))
+
+
+class Stack:
+    # persistent stack of singles: a push shares the stack below, so snapshots are O(1);
+    # every cell caches the length, the hash and the yield bounds of its whole stack
+
+    __slots__ = ("top", "below", "length", "min_yield", "max_yield", "_key", "_hash")
+
+    top: Optional[Single]
+    below: Optional[Stack]
+    length: int
+    min_yield: float
+    max_yield: float
+
+    def __init__(
+        self,
+        top: Optional[Single] = None,
+        below: Optional[Stack] = None,
+        bounds: Tuple[float, float] = UNBOUNDED,
+    ):
+        self.top = top
+        self.below = below
+
+        if below is None:
+            self.length = 0
+            self.min_yield = 0
+            self.max_yield = 0
+            self._key: Hashable = None
+            self._hash = hash(None)
+        else:
+            self.length = below.length + 1
+            self.min_yield = below.min_yield + bounds[0]
+            self.max_yield = below.max_yield + bounds[1]
+            self._key = (type(top.object), top.object.value)
+            self._hash = hash((self._key, below._hash))
+
+    def push(self, single: Single, bounds: Tuple[float, float] = UNBOUNDED) -> Stack:
+        return Stack(single, self, bounds)
+
+    def push_sequence(
+        self,
+        values: Sequence[Single],
+        bounds: Optional[Sequence[Tuple[float, float]]] = None,
+    ) -> Stack:
+        # first value ends up on the top of the stack
+        stack = self
+        for index in range(len(values) - 1, -1, -1):
+            stack = Stack(
+                values[index], stack, UNBOUNDED if bounds is None else bounds[index]
+            )
+        return stack
+
+    def pop(self) -> Tuple[Single, Stack]:
+        if self.below is None:
+            raise IndexError("pop from empty stack")
+        return (self.top, self.below)
+
+    def to_list(self) -> List[Single]:
+        # bottom of the stack goes first
+        result: List[Single] = []
+        stack = self
+        while stack.below is not None:
+            result.append(stack.top)
+            stack = stack.below
+        result.reverse()
+        return result
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[Single]:
+        return iter(self.to_list())
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Stack):
+            return NotImplemented
+
+        left: Stack = self
+        right: Stack = other
+        while left is not right:
+            if (
+                left.length != right.length
+                or left._hash != right._hash
+                or left._key != right._key
+            ):
+                return False
+            left = left.below
+            right = right.below
+        return True
+
+    def __repr__(self) -> str:
+        return f"Stack({self.to_list()!r})"
+
+
+EMPTY_STACK = Stack()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from ambiguity import find_ambiguous_nonterminals, random_string
+from compiled_grammar import CompiledGrammar
+from earley import EarleyRecognizer
+from fixtures import BRACKETS, PALINDROMES, build_grammar, build_interpreter
+
+MIXED = """start=🤯S🤯
+🤯S🤯 👉 🤯P🤯 🥵;🥵 🤯E🤯 🗿
+🤯P🤯 👉 🥵a🥵 🤯P🤯 🥵a🥵 🤌 😵 🗿
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🗿"""
+
+
+class Test_RandomString(unittest.TestCase):
+    def test_strings_are_recognized(self):
+        grammar = build_grammar(BRACKETS)
+        compiled = CompiledGrammar(grammar)
+        recognizer = EarleyRecognizer(grammar)
+        rng = random.Random(1)
+
+        for _ in range(50):
+            string = random_string(compiled, rng, 10)
+
+            self.assertEqual(recognizer.recognize(string), True, string)
+            self.assertLessEqual(len(string), 10)
+
+    def test_empty_language(self):
+        compiled = CompiledGrammar(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯S🤯 🗿"""
+            )
+        )
+
+        self.assertIsNone(random_string(compiled, random.Random(1), 10))
+
+    def test_unit_cycle(self):
+        compiled = CompiledGrammar(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🗿
+🤯A🤯 👉 🤯B🤯 🗿
+🤯B🤯 👉 🤯A🤯 🤌 🥵aaa🥵 🗿"""
+            )
+        )
+        rng = random.Random(1)
+
+        self.assertIsNone(random_string(compiled, rng, 2))
+        self.assertEqual(random_string(compiled, rng, 5), "aaa")
+
+
+class Test_FindAmbiguousNonterminals(unittest.TestCase):
+    def test_ambiguous_nonterminal_is_found(self):
+        witnesses = find_ambiguous_nonterminals(build_grammar(MIXED), seed=1)
+
+        self.assertEqual(list(witnesses), ["E"])
+        self.assertGreaterEqual(witnesses["E"].count("+"), 2)
+
+    def test_unambiguous_grammar(self):
+        interpreter = build_interpreter(PALINDROMES)
+
+        self.assertEqual(interpreter.ambiguous_nonterminals(seed=1), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from cyk import CYKRecognizer
+from earley import EarleyRecognizer
+from fixtures import ARITHMETICS, BRACKETS, PALINDROMES, build_grammar
+
+
+class Test_CYKRecognizer(unittest.TestCase):
+    def test_same_answers_as_earley(self):
+        for (description, strings) in [
+            (BRACKETS, ["", "()", "(()())", "())", "(()", ")("]),
+            (PALINDROMES, ["", "a", "aba", "abab", "abba", "bb", "c"]),
+            (ARITHMETICS, ["1", "(1+2)*3", "1+", "(1", "3/2-1*0", "+"]),
+        ]:
+            grammar = build_grammar(description)
+            cyk = CYKRecognizer(grammar)
+            earley = EarleyRecognizer(grammar)
+
+            for string in strings:
+                self.assertEqual(
+                    cyk.recognize(string), earley.recognize(string), string
+                )
+
+    def test_batch_of_mixed_lengths(self):
+        cyk = CYKRecognizer(build_grammar(BRACKETS))
+
+        result = cyk.recognize_many(["()", "(())", "))", "", "()()", "(()", ")()("])
+
+        self.assertEqual(result, [True, True, False, True, True, False, False])
+
+    def test_multi_character_terminals(self):
+        cyk = CYKRecognizer(
+            build_grammar(
+                """start=🤯str🤯
+🤯str🤯 👉 🥵lb🥵 🤯str🤯 🥵rb🥵 🤌 🥵lb🥵 🤯str🤯 🥵rb🥵 🤯str🤯 🤌 😵 🗿"""
+            )
+        )
+
+        self.assertEqual(
+            cyk.recognize_many(["lblbrbrblbrb", "lblbrb", "lbr", "lbrb"]),
+            [True, False, False, True],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from earley import EarleyRecognizer
+from interpreter import Interpreter
+from fixtures import ARITHMETICS, BRACKETS, PALINDROMES, build_grammar
+
+
+class Test_EarleyRecognizer(unittest.TestCase):
+    def test_left_recursive_grammar(self):
+        recognizer = EarleyRecognizer(build_grammar(ARITHMETICS))
+
+        self.assertEqual(recognizer.recognize("(1+2)*3-0/1"), True)
+        self.assertEqual(recognizer.recognize("1+"), False)
+        self.assertEqual(recognizer.recognize(""), False)
+
+    def test_epsilon_rules(self):
+        recognizer = EarleyRecognizer(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🤯B🤯 🤯A🤯 🗿
+🤯A🤯 👉 😵 🤌 🥵a🥵 🗿
+🤯B🤯 👉 🤯A🤯 🤯A🤯 🤌 🥵b🥵 🗿"""
+            )
+        )
+
+        for string in ["", "a", "aa", "aaa", "aaaa", "b", "ab", "aba", "ba"]:
+            self.assertEqual(recognizer.recognize(string), True, string)
+        for string in ["aaaaa", "bb", "abab", "c"]:
+            self.assertEqual(recognizer.recognize(string), False, string)
+
+    def test_multi_character_terminals(self):
+        recognizer = EarleyRecognizer(
+            build_grammar(
+                """start=🤯str🤯
+🤯str🤯 👉 🥵lb🥵 🤯str🤯 🥵rb🥵 🤌 🥵lb🥵 🤯str🤯 🥵rb🥵 🤯str🤯 🤌 😵 🗿"""
+            )
+        )
+
+        self.assertEqual(recognizer.recognize("lblbrbrblbrb"), True)
+        self.assertEqual(recognizer.recognize("lblbrb"), False)
+        self.assertEqual(recognizer.recognize("lbr"), False)
+
+    def test_same_answers_as_interpreter(self):
+        for description in [BRACKETS, PALINDROMES]:
+            grammar = build_grammar(description)
+            interpreter = Interpreter()
+            interpreter.set_grammar(grammar)
+            earley = Interpreter(engine="earley")
+            earley.set_grammar(grammar)
+
+            for string in ["", "()", "(()())", "())", "a", "aba", "abab", "abba"]:
+                self.assertEqual(
+                    earley.evaluate(string),
+                    (interpreter.evaluate(string)[0], None),
+                    string,
+                )
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, Interpreter, engine="unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
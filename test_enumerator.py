@@ -0,0 +1,85 @@
+import itertools
+import unittest
+from earley import EarleyRecognizer
+from enumerator import enumerate_language
+from fixtures import BRACKETS, PALINDROMES, build_grammar, build_interpreter
+
+
+class Test_EnumerateLanguage(unittest.TestCase):
+    def test_strings_in_length_order(self):
+        interpreter = build_interpreter(BRACKETS)
+
+        self.assertEqual(
+            list(interpreter.enumerate_language(6)),
+            [
+                "",
+                "()",
+                "(())",
+                "()()",
+                "((()))",
+                "(()())",
+                "(())()",
+                "()(())",
+                "()()()",
+            ],
+        )
+
+    def test_same_strings_as_recognizer(self):
+        for description in [BRACKETS, PALINDROMES]:
+            grammar = build_grammar(description)
+            recognizer = EarleyRecognizer(grammar)
+            alphabet = sorted(set("".join(grammar.terminals)))
+
+            expected = [
+                "".join(chars)
+                for length in range(9)
+                for chars in itertools.product(alphabet, repeat=length)
+                if recognizer.recognize("".join(chars))
+            ]
+
+            self.assertEqual(list(enumerate_language(recognizer, 8)), expected)
+
+    def test_ambiguous_grammar_without_duplicates(self):
+        interpreter = build_interpreter(
+            """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🤌 🥵11🥵 🗿"""
+        )
+
+        self.assertEqual(
+            list(interpreter.enumerate_language(5, min_length=3)),
+            ["1+1", "1+11", "11+1", "1+1+1", "11+11"],
+        )
+
+    def test_long_strings_of_ambiguous_grammar(self):
+        interpreter = build_interpreter(
+            """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🤌 🥵(🥵 🤯E🤯 🥵)🥵 🗿"""
+        )
+        strings = interpreter.enumerate_language(61, min_length=61)
+
+        self.assertEqual(next(strings), "(" * 30 + "1" + ")" * 30)
+        self.assertEqual(next(strings), "(" * 29 + "1" + ")" * 29 + "+1")
+
+    def test_number_of_strings(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        # Catalan numbers
+        self.assertEqual(
+            [
+                len(list(interpreter.enumerate_language(length, min_length=length)))
+                for length in range(0, 17, 2)
+            ],
+            [1, 1, 2, 5, 14, 42, 132, 429, 1430],
+        )
+
+    def test_empty_language(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯S🤯 🗿"""
+        )
+
+        self.assertEqual(list(interpreter.enumerate_language(10)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,544 @@
+import os
+import pickle
+import subprocess
+import sys
+import time
+import unittest
+from typing import List
+from interpreter import (
+    CancellationToken,
+    LimitExceeded,
+    MAX_STEPS,
+    DEADLINE,
+    CANCELLED,
+)
+from stack import Stack, EMPTY_STACK
+from compiled_grammar import CompiledGrammar, TerminalTrie
+from parser import Empty, NonTerminal, Terminal, Single
+from fixtures import BRACKETS, PALINDROMES, build_grammar, build_interpreter
+
+
+class Test_InterpreterFailureMemo(unittest.TestCase):
+    def test_results_are_not_changed(self):
+        interpreter = build_interpreter(PALINDROMES)
+
+        self.assertEqual(interpreter.evaluate("abba")[0], True)
+        self.assertEqual(interpreter.evaluate("ababa")[0], True)
+        self.assertEqual(interpreter.evaluate("abab")[0], False)
+        self.assertEqual(interpreter.evaluate("")[0], True)
+
+    def test_memo_is_hit_on_rejected_string(self):
+        # different derivations of an ambiguous grammar reach the same configurations
+        interpreter = build_interpreter(
+            """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🗿""",
+            predictive=False,
+        )
+
+        (result, trace) = interpreter.evaluate("1+1+1+1+")
+
+        self.assertEqual(result, False)
+        self.assertEqual(trace, [])
+        self.assertGreater(interpreter.memo.hits, 0)
+
+    def test_memo_is_not_hit_on_brackets(self):
+        # derivations of the brackets grammar never reach equal stacks
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        self.assertEqual(interpreter.evaluate("(" * 10 + ")" * 9)[0], False)
+        self.assertEqual(interpreter.memo.hits, 0)
+        self.assertGreater(len(interpreter.memo), 0)
+
+    def test_memo_is_bounded(self):
+        interpreter = build_interpreter(BRACKETS, memo_size=4, predictive=False)
+
+        interpreter.evaluate("(((((()))))")
+
+        self.assertLessEqual(len(interpreter.memo), 4)
+
+    def test_shared_memo_survives_evaluations(self):
+        interpreter = build_interpreter(BRACKETS, share_memo=True, predictive=False)
+
+        interpreter.evaluate("(((()))")
+        size = len(interpreter.memo)
+        interpreter.evaluate("(((()))")
+
+        self.assertGreater(size, 0)
+        self.assertEqual(len(interpreter.memo), size)
+        self.assertGreater(interpreter.memo.hits, 0)
+
+    def test_shared_memo_is_keyed_by_input(self):
+        interpreter = build_interpreter(BRACKETS, share_memo=True, predictive=False)
+
+        self.assertEqual(interpreter.evaluate("(((()))")[0], False)
+        self.assertEqual(interpreter.evaluate("((()))")[0], True)
+        self.assertEqual(interpreter.evaluate("()(((()))")[0], False)
+
+
+class Test_InterpreterIterativeEvaluation(unittest.TestCase):
+    def test_input_longer_than_recursion_limit(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+        string = "()" * (sys.getrecursionlimit() // 2 + 100)
+
+        (result, trace) = interpreter.evaluate(string)
+
+        self.assertEqual(result, True)
+        self.assertEqual(trace[0][0], 0)
+        self.assertEqual(trace[-1], (len(string), EMPTY_STACK))
+
+    def test_empty_string_through_unit_rules(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🤯B🤯 🗿
+🤯B🤯 👉 🤯A🤯 🗿
+🤯A🤯 👉 😵 🗿""",
+            predictive=False,
+        )
+
+        self.assertEqual(interpreter.evaluate("")[0], True)
+
+    def test_rejected_string_has_no_trace(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        (result, trace) = interpreter.evaluate("()" * 50 + ")")
+
+        self.assertEqual(result, False)
+        self.assertEqual(trace, [])
+
+
+class Test_InterpreterInputOffsets(unittest.TestCase):
+    def test_trace_records_offsets(self):
+        interpreter = build_interpreter(PALINDROMES)
+
+        (result, trace) = interpreter.evaluate("aba")
+        offsets = [offset for (offset, _) in trace]
+
+        self.assertEqual(result, True)
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[-1], 3)
+
+    def test_multi_character_terminals(self):
+        interpreter = build_interpreter(
+            """start=🤯str🤯
+🤯str🤯 👉 🥵lb🥵 🤯str🤯 🥵rb🥵 🤌 🥵lb🥵 🤯str🤯 🥵rb🥵 🤯str🤯 🤌 😵 🗿"""
+        )
+
+        self.assertEqual(interpreter.evaluate("lblbrbrblbrb")[0], True)
+        self.assertEqual(interpreter.evaluate("lblbrb")[0], False)
+        self.assertEqual(interpreter.evaluate("lbr")[0], False)
+
+    def test_epsilons_left_at_end_of_input(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 😵 🗿""",
+            predictive=False,
+        )
+
+        (result, trace) = interpreter.evaluate("a")
+
+        self.assertEqual(result, True)
+        self.assertEqual(trace[-1], (1, EMPTY_STACK))
+
+
+class Test_InterpreterLazyTrace(unittest.TestCase):
+    def test_evaluation_without_trace(self):
+        interpreter = build_interpreter(PALINDROMES)
+
+        self.assertEqual(interpreter.evaluate("abba", trace=False), (True, None))
+        self.assertEqual(interpreter.evaluate("abab", trace=False), (False, None))
+
+    def test_trace_is_restored_from_accepting_configuration(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        (result, trace) = interpreter.evaluate("(())()")
+
+        self.assertEqual(result, True)
+        self.assertEqual(trace[0], (0, EMPTY_STACK.push(Single(NonTerminal("S'")))))
+        self.assertEqual(trace[-1], (6, EMPTY_STACK))
+        for ((position, _), (next_position, _)) in zip(trace, trace[1:]):
+            self.assertLessEqual(position, next_position)
+
+
+class Test_CompiledGrammar(unittest.TestCase):
+    def test_tables(self):
+        compiled = CompiledGrammar(build_grammar(PALINDROMES))
+        a = Single(Terminal("a"))
+        str_ = Single(NonTerminal("str"))
+
+        self.assertEqual(compiled.start, str_)
+        self.assertEqual(len(compiled.alternatives["str"]), 5)
+        self.assertEqual(compiled.alternatives["str"][0], (a, str_, a))
+        self.assertEqual(compiled.nullable, frozenset(["str"]))
+
+    def test_nullable_closure(self):
+        compiled = CompiledGrammar(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯A🤯 🗿
+🤯A🤯 👉 🤯B🤯 🤯B🤯 🤌 🥵b🥵 🗿
+🤯B🤯 👉 😵 🤌 🥵c🥵 🗿"""
+            )
+        )
+
+        self.assertEqual(compiled.nullable, frozenset(["A", "B"]))
+
+    def test_tables_are_read_only(self):
+        compiled = CompiledGrammar(build_grammar(PALINDROMES))
+
+        with self.assertRaises(TypeError):
+            compiled.alternatives["str"] = ()
+
+    def test_pickled_tables(self):
+        compiled = CompiledGrammar(build_grammar(PALINDROMES))
+        compiled = pickle.loads(pickle.dumps(compiled))
+
+        self.assertEqual(len(compiled.alternatives["str"]), 5)
+        self.assertEqual(len(compiled.alternatives_at("str", "bab", 0)), 3)
+        with self.assertRaises(TypeError):
+            compiled.alternatives["str"] = ()
+
+    def test_alternatives_are_dispatched_by_leading_terminal(self):
+        compiled = CompiledGrammar(build_grammar(PALINDROMES))
+        b = Single(Terminal("b"))
+        str_ = Single(NonTerminal("str"))
+        eps = Single(Empty())
+
+        self.assertEqual(
+            compiled.alternatives_at("str", "bab", 0), [(b, str_, b), (b,), (eps,)]
+        )
+        self.assertEqual(compiled.alternatives_at("str", "cab", 0), [(eps,)])
+        self.assertEqual(compiled.alternatives_at("undefined", "bab", 0), [])
+
+    def test_yield_bounds(self):
+        compiled = CompiledGrammar(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯A🤯 🤌 🤯B🤯 🗿
+🤯A🤯 👉 🥵bc🥵 🤯C🤯 🤌 😵 🗿
+🤯C🤯 👉 🥵d🥵 🤌 🥵d🥵 🤯C🤯 🗿
+🤯B🤯 👉 🤯B🤯 🥵x🥵 🗿"""
+            )
+        )
+
+        self.assertEqual(compiled.yield_bounds["S"], (1, float("inf")))
+        self.assertEqual(compiled.yield_bounds["A"], (0, float("inf")))
+        self.assertEqual(compiled.yield_bounds["C"], (1, float("inf")))
+        self.assertEqual(compiled.yield_bounds["B"], (float("inf"), float("inf")))
+        self.assertEqual(compiled.bounds(Single(Terminal("bc"))), (2, 2))
+        self.assertEqual(compiled.bounds(Single(Empty())), (0, 0))
+
+    def test_finite_yield_bounds(self):
+        compiled = CompiledGrammar(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯A🤯 🤯A🤯 🤌 🤯A🤯 🗿
+🤯A🤯 👉 🥵bc🥵 🤌 😵 🤌 🤯A🤯 🗿"""
+            )
+        )
+
+        self.assertEqual(compiled.yield_bounds["S"], (0, 5))
+        self.assertEqual(compiled.yield_bounds["A"], (0, 2))
+
+    def test_duplicate_alternatives_are_compiled_once(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯S🤯 🤌 🥵b🥵 🤌 🥵a🥵 🤯S🤯 🗿"""
+        )
+
+        self.assertEqual(len(interpreter.compiled.alternatives["S"]), 2)
+
+
+class Test_InterpreterBatchEvaluation(unittest.TestCase):
+    STRINGS = ["", "a", "ab", "aba", "abab", "abba", "c", "bbabb", "aabbaa", "aabba"]
+
+    def test_same_results_as_evaluate(self):
+        interpreter = build_interpreter(PALINDROMES)
+        expected = [interpreter.evaluate(string) for string in self.STRINGS]
+
+        self.assertEqual(
+            list(interpreter.evaluate_many(self.STRINGS, trace=True)),
+            list(enumerate(expected)),
+        )
+
+    def test_worker_processes(self):
+        interpreter = build_interpreter(PALINDROMES)
+        expected = [
+            (index, interpreter.evaluate(string, trace=False))
+            for (index, string) in enumerate(self.STRINGS)
+        ]
+
+        self.assertEqual(
+            list(interpreter.evaluate_many(iter(self.STRINGS), jobs=2, chunksize=3)),
+            expected,
+        )
+        self.assertEqual(
+            sorted(
+                interpreter.evaluate_many(
+                    self.STRINGS, jobs=2, chunksize=3, ordered=False
+                )
+            ),
+            expected,
+        )
+
+
+class Test_InterpreterEvaluationLimits(unittest.TestCase):
+    def test_max_steps(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        (result, limit) = interpreter.evaluate("((((((((()))))))", max_steps=10)
+
+        self.assertEqual(result, None)
+        self.assertEqual(limit.reason, MAX_STEPS)
+        self.assertEqual(limit.steps, 10)
+        self.assertGreater(limit.position, 0)
+        self.assertEqual(
+            interpreter.evaluate("((((((((()))))))", max_steps=10_000), (False, [])
+        )
+
+    def test_aborted_configurations_are_not_remembered(self):
+        interpreter = build_interpreter(BRACKETS, share_memo=True, predictive=False)
+
+        for max_steps in range(1, 40):
+            self.assertIn(
+                interpreter.evaluate("(()(()))", max_steps=max_steps)[0], [True, None]
+            )
+        self.assertEqual(interpreter.evaluate("(()(()))")[0], True)
+
+    def test_deadline(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        self.assertEqual(
+            interpreter.evaluate("(())", deadline=time.monotonic() - 1),
+            (None, LimitExceeded(DEADLINE, 0, 0)),
+        )
+        self.assertEqual(
+            interpreter.evaluate("(())", deadline=time.monotonic() + 60)[0], True
+        )
+
+    def test_cancellation(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+        token = CancellationToken()
+
+        self.assertEqual(interpreter.evaluate("(())", cancel=token)[0], True)
+        token.cancel()
+        self.assertEqual(
+            interpreter.evaluate("(())", cancel=token),
+            (None, LimitExceeded(CANCELLED, 0, 0)),
+        )
+
+    def test_batch_evaluation(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        results = [
+            result[0]
+            for (_, result) in interpreter.evaluate_many(
+                ["()", "((((((((()))))))"], max_steps=20
+            )
+        ]
+
+        self.assertEqual(results, [True, None])
+
+
+class Test_IncrementalRecognizer(unittest.TestCase):
+    def test_same_results_as_evaluate(self):
+        for description in [BRACKETS, PALINDROMES]:
+            interpreter = build_interpreter(description, predictive=False)
+
+            for string in ["", "()", "(()())", "())", "a", "aba", "abab", "abba"]:
+                recognizer = interpreter.incremental()
+                for char in string:
+                    recognizer.feed(char)
+
+                self.assertEqual(
+                    recognizer.finish(), interpreter.evaluate(string)[0], string
+                )
+
+    def test_viable_prefix(self):
+        interpreter = build_interpreter(BRACKETS)
+        recognizer = interpreter.incremental()
+
+        self.assertEqual(recognizer.feed("(()"), True)
+        self.assertEqual(recognizer.finish(), False)
+        self.assertEqual(recognizer.feed(")"), True)
+        self.assertEqual(recognizer.finish(), True)
+        self.assertEqual(recognizer.feed("))(("), False)
+        self.assertEqual(recognizer.position, 5)
+        self.assertEqual(recognizer.finish(), False)
+
+    def test_multi_character_terminals(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵lb🥵 🤯S🤯 🥵rb🥵 🤌 😵 🗿""",
+            predictive=False,
+        )
+        recognizer = interpreter.incremental()
+
+        self.assertEqual(recognizer.feed("lblbr"), True)
+        self.assertEqual(recognizer.feed("brb"), True)
+        self.assertEqual(recognizer.finish(), True)
+        self.assertEqual(recognizer.feed("l"), False)
+
+    def test_long_input(self):
+        recognizer = build_interpreter(BRACKETS).incremental()
+
+        for _ in range(1000):
+            recognizer.feed("(()" * 10)
+        self.assertEqual(recognizer.feed(")" * 9999), True)
+        self.assertLessEqual(max(len(items) for items in recognizer.sets), 9)
+        self.assertEqual(recognizer.feed(")"), True)
+        self.assertEqual(recognizer.finish(), True)
+
+    def test_ambiguous_grammar(self):
+        recognizer = build_interpreter(
+            """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🗿"""
+        ).incremental()
+
+        self.assertEqual(recognizer.feed("1+" * 150), True)
+        self.assertEqual(recognizer.finish(), False)
+        self.assertEqual(recognizer.feed("1"), True)
+        self.assertEqual(recognizer.finish(), True)
+        self.assertLessEqual(len(recognizer.sets[-1]), 2 * recognizer.position)
+
+    def test_nonproductive_rules(self):
+        recognizer = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯B🤯 🤌 🥵a🥵 🥵c🥵 🗿
+🤯B🤯 👉 🥵b🥵 🤯B🤯 🗿""",
+            engine="earley",
+        ).incremental()
+
+        self.assertEqual(recognizer.feed("a"), True)
+        self.assertEqual(recognizer.next_chars(), ["c"])
+        self.assertEqual(recognizer.feed("b"), False)
+
+
+class Test_InterpreterCommandLine(unittest.TestCase):
+    def run_interpreter(self, options: List[str], string: str) -> List[str]:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run(
+            [
+                sys.executable,
+                os.path.join(directory, "interpreter.py"),
+                os.path.join(directory, "examples", "interpreter", "brackets.in"),
+            ]
+            + options,
+            input=string,
+            capture_output=True,
+            text=True,
+            cwd=directory,
+        )
+        return result.stdout.splitlines()
+
+    def stream(self, string: str) -> str:
+        return self.run_interpreter(["--stream"], string)[-1]
+
+    def test_line_terminated_input(self):
+        self.assertEqual(self.stream("(())\n"), "Grammar contains the input: True")
+        self.assertEqual(self.stream("(())"), "Grammar contains the input: True")
+        self.assertEqual(
+            self.stream("(())\n\n"),
+            "Grammar contains the input: False (no string starts with its first 5 "
+            "characters)",
+        )
+
+    def test_batch_from_stdin(self):
+        strings = ["()", "(()", "(())", ""] * 100
+        lines = self.run_interpreter(
+            ["--batch", "-", "--jobs", "2"], "".join(f"{s}\n" for s in strings)
+        )
+
+        expected = [string.count("(") == string.count(")") for string in strings]
+        self.assertEqual(
+            lines[-len(strings) :],
+            [f"{result}\t{string}" for (result, string) in zip(expected, strings)],
+        )
+
+
+class Test_InterpreterLengthPruning(unittest.TestCase):
+    def test_long_rejected_string(self):
+        interpreter = build_interpreter(BRACKETS, predictive=False)
+
+        self.assertEqual(interpreter.evaluate("(" * 20 + ")" * 19)[0], False)
+        self.assertEqual(interpreter.evaluate("(" * 20 + ")" * 20)[0], True)
+
+    def test_finite_language(self):
+        interpreter = build_interpreter(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯A🤯 🤯A🤯 🗿
+🤯A🤯 👉 🥵bc🥵 🤌 😵 🗿""",
+            predictive=False,
+        )
+
+        self.assertEqual(interpreter.evaluate("abcbc")[0], True)
+        self.assertEqual(interpreter.evaluate("abcbcbc")[0], False)
+        self.assertEqual(interpreter.memo.misses, 0)
+
+
+class Test_TerminalTrie(unittest.TestCase):
+    def test_matches(self):
+        trie = TerminalTrie()
+        for terminal in ["l", "lb", "lbl", "rb"]:
+            trie.add(terminal)
+
+        self.assertEqual(list(trie.matches("xlbrb", 1)), ["l", "lb"])
+        self.assertEqual(list(trie.matches("xlbrb", 3)), ["rb"])
+        self.assertEqual(list(trie.matches("xlbrb", 5)), [])
+        self.assertEqual(list(trie.matches("b", 0)), [])
+
+    def test_token(self):
+        trie = TerminalTrie()
+        for terminal in ["lb", "rb"]:
+            trie.add(terminal)
+
+        self.assertEqual(trie.token("lbrb", 2), "rb")
+        self.assertEqual(trie.token("lbrb", 1), None)
+        self.assertEqual(trie.token("lbrb", 4), None)
+
+
+class Test_Stack(unittest.TestCase):
+    def test_push_and_pop(self):
+        S = Single(NonTerminal("S"))
+        a = Single(Terminal("a"))
+
+        stack = EMPTY_STACK.push(S).push_sequence([a, S])
+
+        self.assertEqual(len(stack), 3)
+        self.assertEqual(stack.to_list(), [S, S, a])
+        self.assertEqual(stack.min_yield, 0)
+        self.assertEqual(stack.max_yield, float("inf"))
+        self.assertEqual(stack.pop(), (a, EMPTY_STACK.push(S).push(S)))
+        self.assertRaises(IndexError, EMPTY_STACK.pop)
+
+    def test_yield_bounds_are_accumulated(self):
+        S = Single(NonTerminal("S"))
+        a = Single(Terminal("a"))
+
+        stack = EMPTY_STACK.push(S, (2, 5)).push_sequence([a, S], [(1, 1), (2, 5)])
+
+        self.assertEqual((stack.min_yield, stack.max_yield), (5, 11))
+        self.assertEqual((stack.below.min_yield, stack.below.max_yield), (4, 10))
+
+    def test_branches_share_tail(self):
+        tail = EMPTY_STACK.push(Single(NonTerminal("S")))
+
+        left = tail.push(Single(Terminal("a")))
+        right = tail.push(Single(Terminal("b")))
+
+        self.assertIs(left.below, right.below)
+        self.assertNotEqual(left, right)
+
+    def test_equal_stacks_have_equal_hashes(self):
+        values = [Single(Terminal("a")), Single(NonTerminal("a"))]
+
+        left = EMPTY_STACK.push_sequence(values)
+        right = Stack().push_sequence(values)
+
+        self.assertEqual(left, right)
+        self.assertEqual(hash(left), hash(right))
+        self.assertNotEqual(left, EMPTY_STACK.push_sequence(list(reversed(values))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import itertools
+import tempfile
+import unittest
+from lalr import LALRParser
+from earley import EarleyRecognizer
+from fixtures import ARITHMETICS, PALINDROMES, build_grammar, build_interpreter
+
+CYCLIC = """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤌 🤯S🤯 🗿"""
+
+UNDEFINED = """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯B🤯 🤌 🥵c🥵 🗿"""
+
+
+class Test_LALRParser(unittest.TestCase):
+    def test_left_recursive_grammar(self):
+        parser = LALRParser(build_grammar(ARITHMETICS), cache_dir=None)
+
+        self.assertEqual(parser.conflicts, [])
+        self.assertEqual(parser.recognize("(1+2)*3-0/1"), True)
+        self.assertEqual(parser.recognize("1+"), False)
+        self.assertEqual(parser.recognize("1+2)"), False)
+        self.assertEqual(parser.recognize(""), False)
+
+    def test_same_answers_as_earley(self):
+        grammar = build_grammar(
+            """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🥵b🥵 🤯S🤯 🤌 😵 🗿
+🤯A🤯 👉 🥵a🥵 🤯A🤯 🤌 😵 🗿"""
+        )
+        parser = LALRParser(grammar, cache_dir=None)
+        earley = EarleyRecognizer(grammar)
+
+        self.assertEqual(parser.is_lalr(), True)
+        for length in range(7):
+            for chars in itertools.product("abc", repeat=length):
+                string = "".join(chars)
+                self.assertEqual(
+                    parser.recognize(string), earley.recognize(string), string
+                )
+
+    def test_conflicts_are_reported(self):
+        parser = LALRParser(build_grammar(PALINDROMES), cache_dir=None)
+
+        self.assertEqual(parser.is_lalr(), False)
+        self.assertTrue(
+            all("shift/reduce" in conflict for conflict in parser.conflicts)
+        )
+
+        parser = LALRParser(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤌 🥵ab🥵 🗿"""
+            ),
+            cache_dir=None,
+        )
+
+        self.assertEqual(parser.conflicts, ["terminal 'a' is a prefix of 'ab'"])
+
+    def test_cyclic_grammar(self):
+        parser = LALRParser(build_grammar(CYCLIC), cache_dir=None)
+
+        self.assertEqual(parser.is_lalr(), False)
+        self.assertEqual(len(parser.conflicts), 1)
+        self.assertIn("tables cannot be generated", parser.conflicts[0])
+
+    def test_nonterminal_without_rules(self):
+        with self.assertRaisesRegex(ValueError, "'B'"):
+            LALRParser(build_grammar(UNDEFINED), cache_dir=None)
+
+    def test_tables_are_cached(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = LALRParser(build_grammar(ARITHMETICS), cache_dir)
+            second = LALRParser(build_grammar(ARITHMETICS), cache_dir)
+            other = LALRParser(build_grammar(PALINDROMES), cache_dir)
+
+            self.assertEqual(first.from_cache, False)
+            self.assertEqual(second.from_cache, True)
+            self.assertEqual(other.from_cache, False)
+            self.assertEqual(second.recognize("(1+2)*3"), True)
+            self.assertEqual(
+                LALRParser(build_grammar(PALINDROMES), cache_dir).conflicts,
+                other.conflicts,
+            )
+
+
+class Test_InterpreterLALREngine(unittest.TestCase):
+    def test_lalr_engine(self):
+        interpreter = build_interpreter(ARITHMETICS, engine="lalr")
+
+        self.assertIsNotNone(interpreter.lalr)
+        self.assertEqual(interpreter.evaluate("(1+2)*3"), (True, None))
+        self.assertEqual(interpreter.evaluate("(1+2"), (False, None))
+
+    def test_fallback_to_backtracking_search(self):
+        interpreter = build_interpreter(PALINDROMES, engine="lalr")
+
+        self.assertIsNone(interpreter.lalr)
+        self.assertEqual(interpreter.evaluate("abba")[0], True)
+        self.assertEqual(interpreter.evaluate("abab"), (False, []))
+
+    def test_fallback_on_grammar_errors(self):
+        interpreter = build_interpreter(CYCLIC, engine="lalr")
+
+        self.assertIsNone(interpreter.lalr)
+        self.assertEqual(interpreter.evaluate("a")[0], True)
+        self.assertEqual(interpreter.evaluate("aa")[0], False)
+
+        interpreter = build_interpreter(UNDEFINED, engine="lalr")
+
+        self.assertIsNone(interpreter.lalr)
+        self.assertEqual(interpreter.evaluate("c")[0], True)
+        self.assertEqual(interpreter.evaluate("a")[0], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
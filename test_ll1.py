@@ -0,0 +1,129 @@
+import pickle
+import unittest
+from ll1 import LL1Parser, END_OF_INPUT
+from transformer import Transformer
+from parser import Empty
+from stack import EMPTY_STACK
+from fixtures import (
+    ARITHMETICS,
+    BRACKETS,
+    PALINDROMES,
+    build_grammar,
+    build_interpreter,
+)
+
+
+def build_parser(description: str) -> LL1Parser:
+    tr = Transformer()
+    return LL1Parser(
+        tr.left_factor(tr.to_greibah_weak_form(build_grammar(description)))
+    )
+
+
+class Test_LL1Parser(unittest.TestCase):
+    def test_first_and_follow(self):
+        parser = LL1Parser(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🥵b🥵 🗿
+🤯A🤯 👉 🥵a🥵 🤯A🤯 🤌 😵 🗿"""
+            )
+        )
+
+        self.assertEqual(parser.first, {"S": {"a", "b"}, "A": {"a"}})
+        self.assertEqual(parser.follow["A"], {"b"})
+        self.assertEqual(parser.follow["S"], {END_OF_INPUT})
+        self.assertEqual(parser.nullable, {"A"})
+        self.assertEqual(parser.is_ll1(), True)
+
+    def test_conflicts_are_reported(self):
+        parser = build_parser(PALINDROMES)
+
+        self.assertEqual(parser.is_ll1(), False)
+        self.assertGreater(len(parser.conflicting_nonterminals()), 0)
+
+    def test_prefix_terminals_are_reported(self):
+        parser = LL1Parser(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤌 🥵ab🥵 🗿"""
+            )
+        )
+
+        self.assertEqual(parser.conflicts, {None: {"ab"}})
+
+    def test_recognize(self):
+        parser = build_parser(ARITHMETICS)
+
+        self.assertEqual(parser.is_ll1(), True)
+        self.assertEqual(parser.recognize("(1+2)*3-0/1"), (True, None))
+        self.assertEqual(parser.recognize("1+"), (False, None))
+        self.assertEqual(parser.recognize("1+2)"), (False, None))
+
+    def test_trace(self):
+        parser = build_parser(BRACKETS)
+
+        (result, trace) = parser.recognize("(())", trace=True)
+
+        self.assertEqual(result, True)
+        self.assertEqual(trace[0][0], 0)
+        self.assertEqual(trace[-1], (4, EMPTY_STACK))
+
+
+    def test_dollar_terminal(self):
+        parser = LL1Parser(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🗿
+🤯A🤯 👉 🥵$🥵 🤌 😵 🗿"""
+            )
+        )
+
+        self.assertEqual(parser.is_ll1(), True)
+        self.assertEqual(parser.recognize("$"), (True, None))
+        self.assertEqual(parser.recognize(""), (True, None))
+        self.assertEqual(parser.recognize("$$"), (False, None))
+        self.assertIs(pickle.loads(pickle.dumps(END_OF_INPUT)), END_OF_INPUT)
+
+    def test_epsilons_are_popped_in_trace(self):
+        parser = LL1Parser(
+            build_grammar(
+                """start=🤯S🤯
+🤯S🤯 👉 🥵a🥵 🤯S🤯 🤌 😵 🗿"""
+            )
+        )
+
+        (result, trace) = parser.recognize("a", trace=True)
+
+        self.assertEqual(result, True)
+        self.assertEqual([position for (position, _) in trace], [0, 0, 1, 1, 1])
+        self.assertIsInstance(trace[-2][1].top.object, Empty)
+        self.assertEqual(trace[-1], (1, EMPTY_STACK))
+
+
+class Test_InterpreterPredictiveParsing(unittest.TestCase):
+    def test_predictive_parsing_is_used_when_possible(self):
+        self.assertIsNotNone(build_interpreter(BRACKETS).ll1)
+        self.assertIsNone(build_interpreter(PALINDROMES).ll1)
+        self.assertIsNone(build_interpreter(BRACKETS, predictive=False).ll1)
+
+    def test_same_answers_as_backtracking_search(self):
+        predictive = build_interpreter(ARITHMETICS)
+        backtracking = build_interpreter(ARITHMETICS, predictive=False)
+
+        for string in ["1", "(1+2)*3", "1+", "(1", "3/2-1*0", "+", ""]:
+            self.assertEqual(
+                predictive.evaluate(string, trace=False),
+                backtracking.evaluate(string, trace=False),
+                string,
+            )
+
+    def test_long_input(self):
+        interpreter = build_interpreter(BRACKETS)
+
+        self.assertEqual(interpreter.evaluate("(" * 10000 + ")" * 10000)[0], True)
+        self.assertEqual(interpreter.evaluate("(" * 10000 + ")" * 9999)[0], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import copy
+import dataclasses
+import pickle
+import unittest
+from parser import (
+    Empty,
+    FrozenMultiple,
+    FrozenNonTerminal,
+    FrozenSingle,
+    FrozenTerminal,
+    Multiple,
+    NonTerminal,
+    Rule,
+    SYMBOLS,
+    Single,
+    SymbolTable,
+    Terminal,
+    freeze,
+    thaw,
+)
+from transformer import Transformer
+from fixtures import BRACKETS, PALINDROMES, build_grammar
+
+
+class Test_FrozenNodes(unittest.TestCase):
+    def test_round_trip(self):
+        for rule in build_grammar(PALINDROMES).ast.ruleset.rules:
+            frozen = freeze(rule)
+
+            self.assertEqual(thaw(frozen), rule)
+            self.assertEqual(frozen.to_string(), rule.to_string())
+            self.assertIsInstance(frozen.values, tuple)
+
+    def test_hashable(self):
+        multiple = Multiple([Single(Terminal("a")), Single(NonTerminal("A"))])
+
+        self.assertEqual(freeze(multiple), freeze(copy.deepcopy(multiple)))
+        self.assertEqual(len({freeze(multiple), freeze(copy.deepcopy(multiple))}), 1)
+        self.assertEqual(
+            len({freeze(Single(Terminal("a"))), freeze(Single(NonTerminal("a")))}), 2
+        )
+
+    def test_immutable(self):
+        single = FrozenSingle(FrozenTerminal("a"))
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            single.object = FrozenTerminal("b")
+        self.assertFalse(hasattr(single, "__dict__"))
+
+    def test_thawed_nodes_are_not_shared(self):
+        frozen = freeze(Rule(NonTerminal("A"), [Multiple([Single(Empty())])]))
+        (first, second) = (thaw(frozen), thaw(frozen))
+        first.values[0].append(Single(Terminal("a")))
+
+        self.assertEqual(len(second.values[0].values), 1)
+
+    def test_pickle(self):
+        frozen = FrozenMultiple(
+            (FrozenSingle(FrozenNonTerminal("A")), FrozenSingle(FrozenTerminal("a")))
+        )
+
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), frozen)
+        self.assertEqual(copy.deepcopy(frozen), frozen)
+
+
+class Test_SymbolTable(unittest.TestCase):
+    def test_symbols_are_interned(self):
+        table = SymbolTable()
+        terminal = table.terminal("a")
+
+        self.assertIs(table.terminal("a"), terminal)
+        self.assertIsNot(table.nonterminal("a"), terminal)
+        self.assertEqual(table.terminal("a"), Terminal("a"))
+        self.assertEqual(table.symbol(table.id(terminal)), terminal)
+        self.assertEqual(table.id(Terminal("a")), table.id(terminal))
+        self.assertEqual(table.id(table.nonterminal("a")), 1)
+        self.assertEqual(len(table), 2)
+        self.assertIs(copy.deepcopy(terminal), terminal)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            terminal.value = "b"
+
+    def test_grammars_share_symbols(self):
+        rules = build_grammar(BRACKETS).ast.ruleset.rules
+        other = Transformer().to_greibah_weak_form(build_grammar(BRACKETS))
+        objects = [
+            single.object
+            for rule in rules + other.ast.ruleset.rules
+            for multiple in rule.values
+            for single in multiple.values
+        ] + [rule.variable for rule in rules + other.ast.ruleset.rules]
+        objects.append(thaw(freeze(rules[0])).variable)
+
+        self.assertTrue(all(obj is SYMBOLS._intern(obj) for obj in objects))
+
+    def test_fresh_names(self):
+        fresh_names = SymbolTable().fresh_names({"S", "S'", "T"})
+
+        self.assertEqual(
+            [fresh_names.nonterminal("S").value for _ in range(3)],
+            ["S''", "S'''", "S''''"],
+        )
+        self.assertEqual(fresh_names.nonterminal("A"), NonTerminal("A"))
+        self.assertEqual(fresh_names.nonterminal("A"), NonTerminal("A'"))
+
+
+if __name__ == "__main__":
+    unittest.main()
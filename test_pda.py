@@ -0,0 +1,88 @@
+import itertools
+import unittest
+from typing import Iterable, List
+from earley import EarleyRecognizer
+from parser import SYMBOLS
+from pda import PushdownAutomaton
+from transformer import Transformer
+from fixtures import (
+    ARITHMETICS,
+    BRACKETS,
+    PALINDROMES,
+    build_grammar,
+    build_interpreter,
+)
+
+
+def build_automaton(description: str) -> PushdownAutomaton:
+    return PushdownAutomaton(
+        Transformer().to_greibah_weak_form(build_grammar(description))
+    )
+
+
+def names(automaton: PushdownAutomaton, codes: Iterable[int]) -> List[str]:
+    return [automaton.symbols.symbol(code).value for code in codes]
+
+
+class Test_PushdownAutomaton(unittest.TestCase):
+    def test_symbols(self):
+        automaton = build_automaton(BRACKETS)
+
+        self.assertEqual(names(automaton, range(automaton.end)), ["(", ")"])
+        self.assertEqual(names(automaton, [automaton.start]), ["S'"])
+        self.assertIs(automaton.symbols.symbol(automaton.end), SYMBOLS.empty)
+        self.assertEqual(automaton.table.typecode, "i")
+        # a column per character and one for the end of input
+        self.assertEqual(len(automaton.table), 1 + (len(automaton.symbols) - 3) * 3)
+
+    def test_same_answers_as_earley(self):
+        for description in [BRACKETS, PALINDROMES, ARITHMETICS]:
+            grammar = build_grammar(description)
+            automaton = PushdownAutomaton(Transformer().to_greibah_weak_form(grammar))
+            earley = EarleyRecognizer(grammar)
+            alphabet = sorted(set("".join(grammar.terminals)))[:4]
+
+            for length in range(1, 7):
+                for chars in itertools.product(alphabet, repeat=length):
+                    string = "".join(chars)
+                    self.assertEqual(
+                        automaton.recognize(string), earley.recognize(string), string
+                    )
+
+    def test_long_terminals(self):
+        automaton = build_automaton(
+            """start=🤯S🤯
+🤯S🤯 👉 🥵ab🥵 🤯S🤯 🥵ba🥵 🤌 🥵a🥵 🤌 🥵abc🥵 🗿"""
+        )
+
+        self.assertEqual(names(automaton, range(automaton.end)), ["a", "b", "c"])
+        self.assertEqual(automaton.recognize("ababcba"), True)
+        self.assertEqual(automaton.recognize("abababa"), False)
+        self.assertEqual(automaton.recognize("ababababa"), True)
+        self.assertEqual(automaton.recognize("abaa"), False)
+        self.assertEqual(automaton.recognize("abd"), False)
+
+    def test_long_input(self):
+        automaton = build_automaton(BRACKETS)
+
+        self.assertEqual(automaton.recognize("(" * 1000 + ")" * 1000), True)
+        self.assertEqual(automaton.recognize("()" * 1000 + ")"), False)
+
+    def test_dump(self):
+        dump = build_automaton(BRACKETS).dump()
+
+        self.assertIn("0: '(' (terminal)", dump)
+        self.assertIn("S, '(' -> '(' S''", dump)
+        self.assertIn("S', $ -> ε", dump)
+
+    def test_engine(self):
+        interpreter = build_interpreter(PALINDROMES, engine="pda")
+
+        self.assertIsNotNone(interpreter.pda)
+        self.assertIsNone(interpreter.ll1)
+        self.assertEqual(interpreter.evaluate("abbba"), (True, None))
+        self.assertEqual(interpreter.evaluate("abbab"), (False, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import collections
+import math
+import unittest
+from earley import EarleyRecognizer
+from sampler import UniformSampler
+from fixtures import BRACKETS, PALINDROMES, build_grammar
+
+DYCK = """start=🤯S🤯
+🤯S🤯 👉 🥵(🥵 🤯S🤯 🥵)🥵 🤯S🤯 🤌 😵 🗿"""
+
+AMBIGUOUS_SUMS = """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🤌 🥵11🥵 🗿"""
+
+
+class Test_UniformSampler(unittest.TestCase):
+    def test_count(self):
+        sampler = UniformSampler(build_grammar(DYCK))
+
+        self.assertEqual(
+            [sampler.count(length) for length in range(11)],
+            [1, 0, 1, 0, 2, 0, 5, 0, 14, 0, 42],
+        )
+        # catalan number, beyond 64-bit integers
+        self.assertEqual(sampler.count(200), math.comb(200, 100) // 101)
+
+    def test_count_derivations(self):
+        # `( S )` and `( S ) S` with an empty `S` derive the same strings
+        sampler = UniformSampler(build_grammar(BRACKETS))
+
+        self.assertEqual(
+            [sampler.count(length) for length in range(7)], [1, 0, 2, 0, 6, 0, 22]
+        )
+
+    def test_samples_in_language(self):
+        grammar = build_grammar(PALINDROMES)
+        recognizer = EarleyRecognizer(grammar)
+        sampler = UniformSampler(grammar)
+
+        for length in range(1, 12):
+            for string in sampler.sample_many(length, 20, seed=length):
+                self.assertEqual(len(string), length)
+                self.assertTrue(recognizer.recognize(string))
+
+    def test_uniform_over_strings(self):
+        sampler = UniformSampler(build_grammar(DYCK))
+        counter = collections.Counter(sampler.sample_many(8, 2800, seed=1))
+
+        self.assertEqual(len(counter), 14)
+        self.assertTrue(all(100 < count < 300 for count in counter.values()))
+
+    def test_correct_ambiguity(self):
+        sampler = UniformSampler(build_grammar(AMBIGUOUS_SUMS), correct_ambiguity=True)
+        counter = collections.Counter(sampler.sample_many(7, 800, seed=1))
+
+        self.assertEqual(sorted(counter), ["1+1+1+1", "1+11+11", "11+1+11", "11+11+1"])
+        self.assertTrue(all(150 < count < 250 for count in counter.values()))
+
+    def test_no_strings_of_length(self):
+        sampler = UniformSampler(build_grammar(BRACKETS))
+
+        self.assertIsNone(sampler.sample(7))
+        self.assertEqual(list(sampler.sample_many(7, 10)), [])
+        self.assertEqual(sampler.sample(0), "")
+
+    def test_near_misses(self):
+        grammar = build_grammar(PALINDROMES)
+        recognizer = EarleyRecognizer(grammar)
+        sampler = UniformSampler(grammar)
+        strings = list(sampler.near_misses(9, 50, seed=1))
+
+        self.assertEqual(len(strings), 50)
+        self.assertTrue(all(8 <= len(string) <= 10 for string in strings))
+        self.assertFalse(any(recognizer.recognize(string) for string in strings))
+
+    def test_seeded(self):
+        sampler = UniformSampler(build_grammar(BRACKETS))
+
+        self.assertEqual(
+            list(sampler.sample_many(12, 5, seed=7)),
+            list(sampler.sample_many(12, 5, seed=7)),
+        )
+        self.assertNotEqual(
+            list(sampler.sample_many(30, 5, seed=7)),
+            list(sampler.sample_many(30, 5, seed=8)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
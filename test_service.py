@@ -0,0 +1,145 @@
+import asyncio
+import json
+import unittest
+from service import GrammarService, LatencyMetrics
+from fixtures import BRACKETS, PALINDROMES, build_interpreter
+
+
+class Test_LatencyMetrics(unittest.TestCase):
+    def test_metrics(self):
+        metrics = LatencyMetrics()
+        for (latency, accepted) in [(1.0, True), (3.0, False), (2.0, None)]:
+            metrics.record(latency, accepted)
+
+        self.assertEqual(
+            metrics.to_dict(),
+            {
+                "requests": 3,
+                "accepted": 1,
+                "errors": 1,
+                "limited": 0,
+                "mean_ms": 2.0,
+                "p50_ms": 2.0,
+                "p99_ms": 3.0,
+                "max_ms": 3.0,
+            },
+        )
+
+
+class Test_GrammarService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = GrammarService(
+            {
+                "brackets": build_interpreter(BRACKETS),
+                "palindromes": build_interpreter(PALINDROMES),
+            },
+            jobs=2,
+            max_line=4096,
+        )
+        self.server = await self.service.start_tcp("127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        (self.reader, self.writer) = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.server.close()
+        await self.server.wait_closed()
+        self.service.close()
+
+    async def request(self, *requests):
+        for request in requests:
+            line = request if isinstance(request, str) else json.dumps(request)
+            self.writer.write((line + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+        responses = [json.loads(await self.reader.readline()) for _ in requests]
+        return sorted(responses, key=lambda response: str(response["id"]))
+
+    async def test_evaluate(self):
+        responses = await self.request(
+            {"id": 1, "grammar": "brackets", "string": "(())"},
+            {"id": 2, "grammar": "palindromes", "string": "abab"},
+            {"id": 3, "grammar": "palindromes", "string": "abba"},
+        )
+
+        self.assertEqual(
+            [(response["id"], response["result"]) for response in responses],
+            [(1, True), (2, False), (3, True)],
+        )
+        self.assertTrue(all(response["latency_ms"] >= 0 for response in responses))
+
+    async def test_limits(self):
+        (response,) = await self.request(
+            {"id": 1, "grammar": "palindromes", "string": "ab" * 20, "max_steps": 5}
+        )
+
+        self.assertEqual(response["result"], None)
+        self.assertEqual(response["limit"]["reason"], "max_steps")
+        self.assertEqual(response["limit"]["steps"], 5)
+
+    async def test_errors(self):
+        responses = await self.request(
+            "not json",
+            {"id": 1, "grammar": "unknown", "string": "()"},
+            {"id": 2, "grammar": "brackets"},
+            {"id": 3, "op": "shutdown"},
+        )
+
+        self.assertEqual([response["id"] for response in responses], [1, 2, 3, None])
+        self.assertTrue(all("error" in response for response in responses))
+
+    async def test_long_lines(self):
+        long_request = json.dumps(
+            {"id": 1, "grammar": "brackets", "string": "()" * 50_000}
+        )
+        responses = await self.request(
+            long_request, {"id": 2, "grammar": "brackets", "string": "()"}
+        )
+
+        self.assertEqual([response["id"] for response in responses], [2, None])
+        self.assertEqual(responses[0]["result"], True)
+        self.assertIn("longer than 4096 bytes", responses[1]["error"])
+
+    async def test_pipelined_requests(self):
+        requests = [
+            {"id": index, "grammar": "brackets", "string": "()" * index}
+            for index in range(50)
+        ]
+        responses = await self.request(*requests)
+
+        self.assertEqual(
+            sorted(response["id"] for response in responses), list(range(50))
+        )
+        self.assertTrue(all(response["result"] for response in responses))
+
+    async def test_grammars_and_metrics(self):
+        await self.request(
+            {"id": 1, "grammar": "brackets", "string": "()"},
+            {"id": 2, "grammar": "brackets", "string": "(("},
+        )
+        (grammars, metrics) = await self.request(
+            {"id": "grammars", "op": "grammars"}, {"id": "metrics", "op": "metrics"}
+        )
+
+        self.assertEqual(grammars["grammars"], ["brackets", "palindromes"])
+        self.assertEqual(metrics["metrics"]["brackets"]["requests"], 2)
+        self.assertEqual(metrics["metrics"]["brackets"]["accepted"], 1)
+        self.assertEqual(metrics["metrics"]["palindromes"]["requests"], 0)
+
+
+class Test_GrammarServiceWithoutServer(unittest.IsolatedAsyncioTestCase):
+    async def test_handle(self):
+        service = GrammarService({"brackets": build_interpreter(BRACKETS)})
+        try:
+            response = await service.handle(
+                json.dumps({"id": 1, "grammar": "brackets", "string": "(())"})
+            )
+        finally:
+            service.close()
+
+        self.assertEqual(response["result"], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import itertools
+import unittest
+from earley import EarleyRecognizer
+from sppf import ParseForest, tree_to_string
+from fixtures import BRACKETS, build_grammar, build_interpreter
+
+SUMS = """start=🤯E🤯
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🗿"""
+
+
+def build_forest(description: str, string: str) -> ParseForest:
+    return ParseForest(EarleyRecognizer(build_grammar(description)).chart(string))
+
+
+class Test_ParseForest(unittest.TestCase):
+    def test_all_derivations(self):
+        forest = build_forest(SUMS, "1+1+1")
+
+        self.assertEqual(
+            sorted(tree_to_string(tree) for tree in forest.trees()),
+            [
+                "E(E('1') '+' E(E('1') '+' E('1')))",
+                "E(E(E('1') '+' E('1')) '+' E('1'))",
+            ],
+        )
+        self.assertEqual(forest.is_ambiguous(), True)
+
+    def test_number_of_trees(self):
+        # Catalan numbers
+        for (operands, trees) in [(1, 1), (2, 1), (3, 2), (4, 5), (5, 14), (6, 42)]:
+            forest = build_forest(SUMS, "+".join(["1"] * operands))
+
+            self.assertEqual(len(list(forest.trees())), trees)
+
+    def test_nodes_are_shared(self):
+        forest = build_forest(SUMS, "+".join(["1"] * 30))
+
+        self.assertLess(len(forest), 2000)
+        self.assertLess(forest.packed_nodes(), 20000)
+        # the first trees of 1.0e15 are walked lazily
+        self.assertEqual(len(list(itertools.islice(forest.trees(), 3))), 3)
+
+    def test_epsilon_rules(self):
+        forest = build_forest(BRACKETS, "()()")
+
+        self.assertEqual(
+            sorted(tree_to_string(tree) for tree in forest.trees()),
+            [
+                "S('(' S() ')' S('(' S() ')' S()))",
+                "S('(' S() ')' S('(' S() ')'))",
+            ],
+        )
+
+    def test_cyclic_grammar(self):
+        forest = build_forest(
+            """start=🤯S🤯
+🤯S🤯 👉 🤯S🤯 🤌 🤯A🤯 🤌 🥵a🥵 🗿
+🤯A🤯 👉 🤯S🤯 🤌 😵 🗿""",
+            "a",
+        )
+
+        self.assertEqual(list(forest.trees()), [("S", ("a",))])
+        self.assertEqual(forest.is_ambiguous(), True)
+
+    def test_rejected_string(self):
+        forest = build_forest(SUMS, "1+")
+
+        self.assertIsNone(forest.root)
+        self.assertEqual(list(forest.trees()), [])
+
+    def test_count(self):
+        self.assertEqual(build_forest(SUMS, "+".join(["1"] * 6)).count(), 42)
+        self.assertEqual(
+            build_forest(SUMS, "+".join(["1"] * 30)).count(), 1002242216651368
+        )
+        self.assertEqual(
+            build_forest(SUMS, "+".join(["1"] * 30)).count(1_000_000_007),
+            1002242216651368 % 1_000_000_007,
+        )
+        self.assertEqual(build_forest(SUMS, "1+").count(), 0)
+
+    def test_count_matches_trees(self):
+        for string in ["", "()", "()()()", "(()())()", "((()))()"]:
+            forest = build_forest(BRACKETS, string)
+
+            self.assertEqual(forest.count(), len(list(forest.trees())), string)
+
+    def test_count_with_cycles(self):
+        description = """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🥵b🥵 🤌 🥵a🥵 🗿
+🤯A🤯 👉 🤯B🤯 🤌 🥵a🥵 🗿
+🤯B🤯 👉 🤯A🤯 🗿"""
+
+        self.assertEqual(build_forest(description, "a").count(), 1)
+        self.assertEqual(build_forest(description, "ab").count(), float("inf"))
+
+    def test_ambiguous_nonterminals(self):
+        forest = build_forest(
+            """start=🤯S🤯
+🤯S🤯 👉 🤯A🤯 🤯E🤯 🗿
+🤯A🤯 👉 🥵a🥵 🗿
+🤯E🤯 👉 🤯E🤯 🥵+🥵 🤯E🤯 🤌 🥵1🥵 🗿""",
+            "a1+1+1",
+        )
+
+        self.assertEqual(forest.ambiguous_nonterminals(), {"E"})
+
+    def test_interpreter_parse_forest(self):
+        interpreter = build_interpreter(SUMS)
+
+        self.assertEqual(len(list(interpreter.parse_forest("1+1+1+1").trees())), 5)
+        self.assertIsNone(interpreter.parse_forest("11").root)
+        self.assertEqual(interpreter.count_derivations("1+1+1+1"), 5)
+        self.assertEqual(interpreter.count_derivations("1+1+1+1", 3), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
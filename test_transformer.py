@@ -12,6 +12,7 @@ from parser import (
     Ruleset,
     Start,
     Root,
+    SYMBOLS,
     get_terminals,
     get_non_terminals,
 )
@@ -55,10 +56,44 @@ class Test_TransformerFindEpsilonGeneratingNonterminals(unittest.TestCase):
 
         grammar = Grammar(ast, get_terminals(ast), get_non_terminals(ast))
 
-        result = Transformer()._get_epsilon_generating_nonterminals(grammar)
+        result = Transformer().get_epsilon_generating_nonterminals(grammar)
 
         self.assertEqual(["A", "B", "C", "S"], result)
 
+    def test_rules_with_terminals(self):
+        # S → aA
+        # S → AB
+        # A → ε
+        # A → ε
+        # B → b
+
+        ANonTerm = NonTerminal("A")
+        BNonTerm = NonTerminal("B")
+        SNonTerm = NonTerminal("S")
+
+        A = Single(ANonTerm)
+        B = Single(BNonTerm)
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+        eps = Single(Empty())
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([a, A]), Multiple([A, B])]),
+                    Rule(ANonTerm, [Multiple([eps]), Multiple([eps])]),
+                    Rule(BNonTerm, [Multiple([b])]),
+                ]
+            ),
+        )
+
+        grammar = Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+
+        result = Transformer().get_epsilon_generating_nonterminals(grammar)
+
+        self.assertEqual(["A"], result)
+
     def test_right_bracket_sequence(self):
         # S → ASBS
         # S → ε
@@ -90,7 +125,7 @@ class Test_TransformerFindEpsilonGeneratingNonterminals(unittest.TestCase):
 
         grammar = Grammar(ast, get_terminals(ast), get_non_terminals(ast))
 
-        result = Transformer()._get_epsilon_generating_nonterminals(grammar)
+        result = Transformer().get_epsilon_generating_nonterminals(grammar)
 
         self.assertEqual(["S"], result)
 
@@ -322,6 +357,40 @@ class Test_TransformerRemoveEpsilonGeneratingRules(unittest.TestCase):
         self.assertEqual(result_grammar.ast.ruleset, grammar.ast.ruleset)
         self.assertEqual(result_grammar.ast.start.variable.value, S__NonTerm.value)
 
+    def test_start_generates_epsilon_through_unit_rules(self):
+        # S → B
+        # B → A
+        # A → ε
+
+        SNonTerm = NonTerminal("S")
+        BNonTerm = NonTerminal("B")
+        ANonTerm = NonTerminal("A")
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([Single(BNonTerm)])]),
+                    Rule(BNonTerm, [Multiple([Single(ANonTerm)])]),
+                    Rule(ANonTerm, [Multiple([Single(Empty())])]),
+                ]
+            ),
+        )
+
+        grammar = Transformer()._remove_epsilon_rules(
+            Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+        )
+
+        # S' → ε | S
+        self.assertEqual(grammar.ast.start.variable, NonTerminal("S'"))
+        self.assertIn(
+            Rule(
+                NonTerminal("S'"),
+                [Multiple([Single(Empty())]), Multiple([Single(SNonTerm)])],
+            ),
+            grammar.ast.ruleset.rules,
+        )
+
 
 class Test_TransformerRemoveImmidiateLeftRecursion(unittest.TestCase):
     def test_nothing_to_remove(self):
@@ -579,6 +648,31 @@ class Test_TransformerRemoveImmidiateLeftRecursion(unittest.TestCase):
 
         self.assertEqual(result_grammar.ast.ruleset, grammar.ast.ruleset)
 
+    def test_shared_fresh_names(self):
+        # A → A a ∣ b, twice with the same fresh names: A' and then A''
+        ANonTerm = NonTerminal("A")
+        A = Single(ANonTerm)
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+
+        ast = Root(
+            start=Start(ANonTerm),
+            ruleset=Ruleset([Rule(ANonTerm, [Multiple([A, a]), Multiple([b])])]),
+        )
+        grammar = Grammar(
+            ast=ast, terminals=get_terminals(ast), non_terminals=get_non_terminals(ast)
+        )
+
+        tr = Transformer()
+        fresh_names = SYMBOLS.fresh_names(grammar.non_terminals | grammar.terminals)
+        names = [
+            tr._remove_immediate_left_recursion(
+                grammar, ANonTerm, fresh_names
+            ).non_terminals
+            for _ in range(2)
+        ]
+        self.assertEqual(names, [{"A", "A'"}, {"A", "A''"}])
+
 
 class Test_TransformerRemoveLeftRecursion(unittest.TestCase):
     def test_simple_grammar(self):
@@ -941,6 +1035,60 @@ class Test_TransformerRemoveIsolatedRules(unittest.TestCase):
         self.assertEqual(expected_grammar, result_grammar)
 
 
+class Test_TransformerRemoveDuplicateAlternatives(unittest.TestCase):
+    def test_duplicates_across_rules(self):
+        # S → aS | b | aS
+        # S → b
+        # A → a
+
+        SNonTerm = NonTerminal("S")
+        ANonTerm = NonTerminal("A")
+
+        S = Single(SNonTerm)
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+
+        unchanged = Rule(ANonTerm, [Multiple([a])])
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([a, S]), Multiple([b]), Multiple([a, S])]),
+                    Rule(SNonTerm, [Multiple([b])]),
+                    unchanged,
+                ]
+            ),
+        )
+
+        expected_ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([a, S]), Multiple([b])]),
+                    Rule(ANonTerm, [Multiple([a])]),
+                ]
+            ),
+        )
+
+        result_grammar = Transformer()._remove_duplicate_alternatives(
+            Grammar(
+                ast=ast,
+                non_terminals=get_non_terminals(ast),
+                terminals=get_terminals(ast),
+            )
+        )
+
+        self.assertEqual(
+            Grammar(
+                ast=expected_ast,
+                non_terminals=get_non_terminals(expected_ast),
+                terminals=get_terminals(expected_ast),
+            ),
+            result_grammar,
+        )
+        self.assertIs(result_grammar.ast.ruleset.rules[1], unchanged)
+
+
 class Test_TransformerApplyGreibahForm(unittest.TestCase):
     def test_to_greibah_form(self):
         # S → XA | BB
@@ -1050,5 +1198,195 @@ class Test_TransformerApplyGreibahForm(unittest.TestCase):
         self.assertEqual(tr._is_greibah_weak_form(grammar), True)
 
 
+class Test_TransformerApplyChomskyForm(unittest.TestCase):
+    def test_convert_simple_grammar_to_chomsky_form(self):
+        # S → ASBS | ε
+        # A → (
+        # B → )
+
+        SNonTerm = NonTerminal("S")
+        ANonTerm = NonTerminal("A")
+        BNonTerm = NonTerminal("B")
+
+        S = Single(SNonTerm)
+        A = Single(ANonTerm)
+        B = Single(BNonTerm)
+
+        lb = Single(Terminal("("))
+        rb = Single(Terminal(")"))
+        eps = Single(Empty())
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([A, S, B, S]), Multiple([eps])]),
+                    Rule(ANonTerm, [Multiple([lb])]),
+                    Rule(BNonTerm, [Multiple([rb])]),
+                ]
+            ),
+        )
+
+        tr = Transformer()
+
+        grammar = tr.to_chomsky_normal_form(
+            Grammar(
+                ast=ast,
+                terminals=get_terminals(ast),
+                non_terminals=get_non_terminals(ast),
+            )
+        )
+
+        self.assertEqual(tr._is_chomsky_normal_form(grammar), True)
+        self.assertEqual(grammar.ast.start.variable, NonTerminal("S'"))
+        self.assertIn(
+            Rule(NonTerminal("S'"), [Multiple([eps])]), grammar.ast.ruleset.rules
+        )
+
+    def test_unit_and_long_rules(self):
+        # S → A | a b c
+        # A → B
+        # B → b
+
+        SNonTerm = NonTerminal("S")
+        ANonTerm = NonTerminal("A")
+        BNonTerm = NonTerminal("B")
+
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+        c = Single(Terminal("c"))
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([Single(ANonTerm)]), Multiple([a, b, c])]),
+                    Rule(ANonTerm, [Multiple([Single(BNonTerm)])]),
+                    Rule(BNonTerm, [Multiple([b])]),
+                ]
+            ),
+        )
+
+        tr = Transformer()
+
+        grammar = tr.to_chomsky_normal_form(
+            Grammar(
+                ast=ast,
+                terminals=get_terminals(ast),
+                non_terminals=get_non_terminals(ast),
+            )
+        )
+
+        self.assertEqual(tr._is_chomsky_normal_form(grammar), True)
+        start_rules = [
+            rule.values[0].to_string()
+            for rule in grammar.flatten().ast.ruleset.rules
+            if rule.variable == grammar.ast.start.variable
+        ]
+        self.assertIn("'b'", start_rules)
+        self.assertEqual(len(start_rules), 2)
+
+
+class Test_TransformerLeftFactor(unittest.TestCase):
+    def test_left_factor_common_prefix(self):
+        # S → aSb | aSc | d
+        SNonTerm = NonTerminal("S")
+
+        S = Single(SNonTerm)
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+        c = Single(Terminal("c"))
+        d = Single(Terminal("d"))
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(
+                        SNonTerm,
+                        [Multiple([a, S, b]), Multiple([a, S, c]), Multiple([d])],
+                    ),
+                ]
+            ),
+        )
+
+        tr = Transformer()
+
+        grammar = tr.left_factor(
+            Grammar(
+                ast=ast,
+                terminals=get_terminals(ast),
+                non_terminals=get_non_terminals(ast),
+            )
+        )
+
+        factored = Single(NonTerminal("S'"))
+        self.assertEqual(
+            grammar.ast.ruleset.rules,
+            [
+                Rule(SNonTerm, [Multiple([a, S, factored]), Multiple([d])]),
+                Rule(NonTerminal("S'"), [Multiple([b]), Multiple([c])]),
+            ],
+        )
+
+
+class Test_TransformerStructuralSharing(unittest.TestCase):
+    def build_grammar(self) -> Grammar:
+        # S → XA | BB
+        # B → b | SB
+        # X → b
+        # A → a | ε
+
+        SNonTerm = NonTerminal("S")
+        XNonTerm = NonTerminal("X")
+        BNonTerm = NonTerminal("B")
+        ANonTerm = NonTerminal("A")
+
+        S = Single(SNonTerm)
+        X = Single(XNonTerm)
+        B = Single(BNonTerm)
+        A = Single(ANonTerm)
+
+        a = Single(Terminal("a"))
+        b = Single(Terminal("b"))
+
+        ast = Root(
+            start=Start(SNonTerm),
+            ruleset=Ruleset(
+                [
+                    Rule(SNonTerm, [Multiple([X, A]), Multiple([B, B])]),
+                    Rule(BNonTerm, [Multiple([b]), Multiple([S, B])]),
+                    Rule(XNonTerm, [Multiple([b])]),
+                    Rule(ANonTerm, [Multiple([a]), Multiple([Single(Empty())])]),
+                ]
+            ),
+        )
+        return Grammar(
+            ast=ast, terminals=get_terminals(ast), non_terminals=get_non_terminals(ast)
+        )
+
+    def test_input_grammar_is_not_modified(self):
+        grammar = self.build_grammar()
+        expected = copy.deepcopy(grammar)
+        tr = Transformer()
+
+        tr.to_greibah_weak_form(grammar).ast.ruleset.sort()
+        tr.to_chomsky_normal_form(grammar).ast.ruleset.sort()
+        tr.left_factor(grammar).ast.ruleset.sort()
+        tr._remove_start_non_terminal_from_right_part(grammar).ast.ruleset.sort()
+
+        self.assertEqual(grammar, expected)
+
+    def test_unchanged_rules_are_shared(self):
+        grammar = self.build_grammar().flatten()
+
+        (changed, result) = Transformer()._greibah_iteration(grammar)
+
+        self.assertTrue(changed)
+        for rule in grammar.ast.ruleset.rules:
+            if isinstance(rule.values[0].values[0].object, Terminal):
+                self.assertTrue(any(rule is new for new in result.ast.ruleset.rules))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,10 @@
-import copy
 from queue import Queue
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 from parser import (
     Empty,
+    FreshNames,
+    FrozenMultiple,
+    FrozenSingle,
     Grammar,
     Multiple,
     NonTerminal,
@@ -10,23 +12,28 @@ from parser import (
     Rule,
     Root,
     Ruleset,
+    SYMBOLS,
     Single,
     Start,
+    freeze,
     get_non_terminals,
     get_terminals,
 )
 
 
 class Transformer:
+    # conversions into normal forms; passes never change the grammar they are given,
+    # they share its unchanged rules and create the ones they change
+
     def _greibah_iteration(self, grammar: Grammar) -> Tuple[bool, Grammar]:
-        grammar = copy.deepcopy(grammar)
         nonterminals_rules: dict[str, List[Rule]] = self.get_rules_by_nonterminal(
             grammar
         )
         non_terminals_list = sorted(list(grammar.non_terminals))
 
         n = len(grammar.non_terminals)
-        grammar_changed = False
+        removed_rules: Set[int] = set()
+        new_rules: List[Rule] = []
 
         for i in range(n - 1, -1, -1):
             for j in range(n - 1, -1, -1):
@@ -38,36 +45,47 @@ class Transformer:
                 Ai = non_terminals_list[i]
                 Aj = non_terminals_list[j]
 
-                for rule in nonterminals_rules[Ai]:
+                for rule in nonterminals_rules.get(Ai, []):
                     # since grammar is flattened
                     assert (
                         len(rule.values) == 1
                     ), f"Grammar is not flattened: {grammar.to_string()}"
 
                     if rule.values[0].values[0].object.value == Aj:
-                        grammar_changed = True
                         # remove old rule
-                        # TODO: list.remove may throw!
-                        grammar.ast.ruleset.rules.remove(rule)
+                        removed_rules.add(id(rule))
                         # add new rules
                         gamma = rule.values[0].values[1:]
-                        for delta_rule in nonterminals_rules[Aj]:
+                        for delta_rule in nonterminals_rules.get(Aj, []):
                             assert (
                                 len(delta_rule.values) == 1
                             ), f"More than 1 multiple in `delta_rule`: {delta_rule.to_string()}"
-                            delta = copy.deepcopy(delta_rule.values[0])
+                            delta = delta_rule.values[0]
 
                             new_rule = Rule(
-                                variable=NonTerminal(Ai),
+                                variable=SYMBOLS.nonterminal(Ai),
                                 values=[Multiple(delta.values + gamma)],
                             )
-                            grammar.ast.ruleset.append(new_rule)
+                            new_rules.append(new_rule)
 
-        return (grammar_changed, grammar)
+        if len(removed_rules) == 0:
+            return (False, grammar)
+
+        rules = [
+            rule for rule in grammar.ast.ruleset.rules if id(rule) not in removed_rules
+        ]
+        new_grammar = Grammar(
+            ast=Root(grammar.ast.start, Ruleset(rules + new_rules)),
+            terminals=grammar.terminals,
+            non_terminals=grammar.non_terminals,
+        )
+        return (True, new_grammar)
 
     def to_greibah_weak_form(self, grammar: Grammar) -> Grammar:
+        # one generator of fresh names for all the passes of a conversion
+        fresh_names = self._fresh_names(grammar)
         grammar = self._remove_left_recursion(
-            self._remove_epsilon_rules(grammar)
+            self._remove_epsilon_rules(grammar, fresh_names), fresh_names
         ).flatten()
 
         (changed, grammar) = self._greibah_iteration(grammar)
@@ -76,11 +94,272 @@ class Transformer:
             (changed, grammar) = self._greibah_iteration(grammar)
 
         grammar = self._remove_isolated_rules(grammar)
+        grammar = self._remove_duplicate_alternatives(grammar)
+
+        grammar.non_terminals = get_non_terminals(grammar.ast)
+        grammar.terminals = get_terminals(grammar.ast)
+        return grammar
+
+    def to_chomsky_normal_form(self, grammar: Grammar) -> Grammar:
+        # S0 → S, where S0 does not appear in right parts
+        fresh_names = self._fresh_names(grammar)
+        start_nonterminal = fresh_names.nonterminal(grammar.ast.start.variable.value)
+        rules: List[Rule] = grammar.flatten().ast.ruleset.rules + [
+            Rule(start_nonterminal, [Multiple([Single(grammar.ast.start.variable)])])
+        ]
+        grammar = self._with_rules(grammar, start_nonterminal, rules)
+
+        is_epsilon_generating_grammar = self._is_epsilon_generating_grammar(grammar)
+
+        grammar = self._replace_terminals_in_long_rules(grammar, fresh_names)
+        grammar = self._binarize_rules(grammar, fresh_names)
+        # S0 does not appear in right parts, so S0 → ε is added below instead of a new
+        # start
+        grammar = self._remove_epsilon_rules(grammar, fresh_names, new_start=False)
+        grammar = self._remove_unit_rules(grammar)
+
+        if is_epsilon_generating_grammar:
+            grammar.ast.ruleset.append(
+                Rule(grammar.ast.start.variable, [Multiple([Single(SYMBOLS.empty)])])
+            )
+        grammar = self._remove_duplicate_alternatives(grammar)
 
         grammar.non_terminals = get_non_terminals(grammar.ast)
         grammar.terminals = get_terminals(grammar.ast)
         return grammar
 
+    def left_factor(self, grammar: Grammar) -> Grammar:
+        # A → αβ1 | … | αβn | γ: A → αA′ | γ, A′ → β1 | … | βn
+        # (identical alternatives are merged first)
+        fresh_names = self._fresh_names(grammar)
+        alternatives: dict[str, List[List[Single]]] = {}
+        variables: List[NonTerminal] = []
+        # frozen alternatives of every non-terminal, to merge identical ones
+        seen: dict[str, Set[Tuple[FrozenSingle, ...]]] = {}
+
+        for rule in grammar.ast.ruleset.rules:
+            nonterm = rule.variable.value
+            if nonterm not in alternatives:
+                alternatives[nonterm] = []
+                seen[nonterm] = set()
+                variables.append(rule.variable)
+
+            for multiple in rule.values:
+                singles = [
+                    single
+                    for single in multiple.values
+                    if not isinstance(single.object, Empty)
+                ]
+                key = tuple(freeze(single) for single in singles)
+                if key not in seen[nonterm]:
+                    seen[nonterm].add(key)
+                    alternatives[nonterm].append(singles)
+
+        index = 0
+        while index < len(variables):
+            variable = variables[index]
+            index += 1
+
+            # alternatives grouped by their first single, in order of appearance
+            groups: List[List[List[Single]]] = []
+            groups_by_head: dict[FrozenSingle, List[List[Single]]] = {}
+            for singles in alternatives[variable.value]:
+                if len(singles) == 0:
+                    groups.append([singles])
+                    continue
+                head = freeze(singles[0])
+                if head in groups_by_head:
+                    groups_by_head[head].append(singles)
+                else:
+                    groups_by_head[head] = [singles]
+                    groups.append(groups_by_head[head])
+
+            if all(len(group) == 1 for group in groups):
+                continue
+
+            new_alternatives: List[List[Single]] = []
+            for group in groups:
+                if len(group) == 1:
+                    new_alternatives.append(group[0])
+                    continue
+
+                prefix_length = 1
+                while all(
+                    len(singles) > prefix_length
+                    and freeze(singles[prefix_length])
+                    == freeze(group[0][prefix_length])
+                    for singles in group
+                ):
+                    prefix_length += 1
+
+                nonterm = fresh_names.nonterminal(variable.value)
+                variables.append(nonterm)
+
+                alternatives[nonterm.value] = []
+                seen[nonterm.value] = set()
+                for singles in group:
+                    suffix = singles[prefix_length:]
+                    key = tuple(freeze(single) for single in suffix)
+                    if key not in seen[nonterm.value]:
+                        seen[nonterm.value].add(key)
+                        alternatives[nonterm.value].append(suffix)
+
+                new_alternatives.append(group[0][:prefix_length] + [Single(nonterm)])
+
+            alternatives[variable.value] = new_alternatives
+
+        rules = [
+            Rule(
+                variable,
+                [
+                    Multiple(singles if len(singles) else [Single(SYMBOLS.empty)])
+                    for singles in alternatives[variable.value]
+                ],
+            )
+            for variable in variables
+        ]
+        return self._with_rules(grammar, grammar.ast.start.variable, rules)
+
+    def _is_chomsky_normal_form(self, grammar: Grammar) -> bool:
+        # A → BC | a, and S → ε if S does not appear in right parts
+        for rule in grammar.ast.ruleset.rules:
+            for multiple in rule.values:
+                objects = [single.object for single in multiple.values]
+
+                is_binary = len(objects) == 2 and all(
+                    isinstance(obj, NonTerminal)
+                    and obj.value != grammar.ast.start.variable.value
+                    for obj in objects
+                )
+                is_terminal = len(objects) == 1 and isinstance(objects[0], Terminal)
+                is_start_epsilon = (
+                    rule.variable.value == grammar.ast.start.variable.value
+                    and self._is_epsilon_generating_rule(
+                        Rule(rule.variable, [multiple])
+                    )
+                )
+
+                if not (is_binary or is_terminal or is_start_epsilon):
+                    return False
+
+        return True
+
+    def _with_rules(
+        self, grammar: Grammar, start_nonterminal: NonTerminal, rules: List[Rule]
+    ) -> Grammar:
+        ast = Root(Start(start_nonterminal), Ruleset(rules))
+        return Grammar(ast, get_terminals(ast), get_non_terminals(ast))
+
+    def _replace_terminals_in_long_rules(
+        self, grammar: Grammar, fresh_names: Optional[FreshNames] = None
+    ) -> Grammar:
+        # A → ... a ... (at least two singles): A → ... Ta ..., Ta → a;
+        # epsilons next to other singles are dropped
+        grammar = grammar.flatten()
+        fresh_names = fresh_names or self._fresh_names(grammar)
+        terminal_nonterminals: dict[str, NonTerminal] = {}
+        result_rules: List[Rule] = []
+
+        for rule in grammar.ast.ruleset.rules:
+            singles = [
+                single
+                for single in rule.values[0].values
+                if not isinstance(single.object, Empty)
+            ]
+
+            if len(singles) == 0:
+                result_rules.append(
+                    Rule(rule.variable, [Multiple([Single(SYMBOLS.empty)])])
+                )
+                continue
+            if len(singles) == 1:
+                result_rules.append(Rule(rule.variable, [Multiple(singles)]))
+                continue
+
+            new_multiple = Multiple([])
+            for single in singles:
+                if isinstance(single.object, Terminal):
+                    terminal = single.object.value
+                    if terminal not in terminal_nonterminals:
+                        nonterm = fresh_names.nonterminal("T")
+                        terminal_nonterminals[terminal] = nonterm
+                        result_rules.append(Rule(nonterm, [Multiple([single])]))
+                    single = Single(terminal_nonterminals[terminal])
+                new_multiple.append(single)
+
+            result_rules.append(Rule(rule.variable, [new_multiple]))
+
+        return self._with_rules(grammar, grammar.ast.start.variable, result_rules)
+
+    def _binarize_rules(
+        self, grammar: Grammar, fresh_names: Optional[FreshNames] = None
+    ) -> Grammar:
+        # A → X1 X2 ... Xk: A → X1 A1, A1 → X2 A2, ..., Ak-2 → Xk-1 Xk
+        grammar = grammar.flatten()
+        fresh_names = fresh_names or self._fresh_names(grammar)
+        result_rules: List[Rule] = []
+
+        for rule in grammar.ast.ruleset.rules:
+            singles = rule.values[0].values
+            variable = rule.variable
+
+            while len(singles) > 2:
+                nonterm = fresh_names.nonterminal(rule.variable.value)
+                result_rules.append(
+                    Rule(variable, [Multiple([singles[0], Single(nonterm)])])
+                )
+                variable = nonterm
+                singles = singles[1:]
+
+            result_rules.append(Rule(variable, [Multiple(singles)]))
+
+        return self._with_rules(grammar, grammar.ast.start.variable, result_rules)
+
+    def _remove_unit_rules(self, grammar: Grammar) -> Grammar:
+        # A → B, B → α: A → α
+        grammar = grammar.flatten()
+
+        is_unit_rule = lambda rule: len(rule.values[0].values) == 1 and isinstance(
+            rule.values[0].values[0].object, NonTerminal
+        )
+
+        unit_targets: dict[str, Set[str]] = {}
+        for rule in grammar.ast.ruleset.rules:
+            if is_unit_rule(rule):
+                unit_targets.setdefault(rule.variable.value, set()).add(
+                    rule.values[0].values[0].object.value
+                )
+
+        non_unit_rules: dict[str, List[Rule]] = {}
+        variables: List[NonTerminal] = []
+        for rule in grammar.ast.ruleset.rules:
+            if rule.variable.value not in non_unit_rules:
+                non_unit_rules[rule.variable.value] = []
+                variables.append(rule.variable)
+            if not is_unit_rule(rule):
+                non_unit_rules[rule.variable.value].append(rule)
+
+        result_rules: List[Rule] = []
+        for variable in variables:
+            # non-terminals reachable from `variable` by unit rules, in discovery order
+            reachable = [variable.value]
+            index = 0
+            while index < len(reachable):
+                for target in sorted(unit_targets.get(reachable[index], ())):
+                    if target not in reachable:
+                        reachable.append(target)
+                index += 1
+
+            added: Set[FrozenMultiple] = set()
+            for nonterm in reachable:
+                for rule in non_unit_rules.get(nonterm, []):
+                    key = freeze(rule.values[0])
+                    if key not in added:
+                        added.add(key)
+                        result_rules.append(Rule(variable, rule.values))
+
+        return self._with_rules(grammar, grammar.ast.start.variable, result_rules)
+
     def _is_greibah_weak_form(self, grammar: Grammar) -> bool:
         # A → aγ: a - terminal
         for rule in grammar.ast.ruleset.rules:
@@ -109,10 +388,15 @@ class Transformer:
 
         return not self._has_start_non_terminal_in_right_part(grammar)
 
-    def _remove_epsilon_rules(self, grammar: Grammar) -> Grammar:
+    def _remove_epsilon_rules(
+        self,
+        grammar: Grammar,
+        fresh_names: Optional[FreshNames] = None,
+        new_start: bool = True,
+    ) -> Grammar:
         grammar = grammar.flatten()
-        epsilon_generating_nonterminals = self._get_epsilon_generating_nonterminals(
-            grammar
+        epsilon_generating_nonterminals = set(
+            self.get_epsilon_generating_nonterminals(grammar)
         )
 
         rules = grammar.ast.ruleset.rules
@@ -133,9 +417,10 @@ class Transformer:
                 for single in multiple.values:
                     should_append = True
 
-                    if isinstance(
-                        single.object, NonTerminal
-                    ) and epsilon_generating_nonterminals.count(single.object.value):
+                    if (
+                        isinstance(single.object, NonTerminal)
+                        and single.object.value in epsilon_generating_nonterminals
+                    ):
                         if not (bits & (2**index)):
                             should_append = False
                         index += 1
@@ -154,10 +439,10 @@ class Transformer:
 
         start_nonterminal: NonTerminal = grammar.ast.start.variable
 
-        if is_epsilon_generating_grammar:
-            start_nonterminal = self._create_unique_nonterminal(
-                grammar.ast.start.variable.value,
-                grammar.non_terminals | grammar.terminals,
+        if is_epsilon_generating_grammar and new_start:
+            fresh_names = fresh_names or self._fresh_names(grammar)
+            start_nonterminal = fresh_names.nonterminal(
+                grammar.ast.start.variable.value
             )
 
             # S' -> S | ε
@@ -165,7 +450,7 @@ class Transformer:
                 Rule(
                     start_nonterminal,
                     [
-                        Multiple([Single(Empty())]),
+                        Multiple([Single(SYMBOLS.empty)]),
                         Multiple([Single(grammar.ast.start.variable)]),
                     ],
                 )
@@ -178,25 +463,39 @@ class Transformer:
         )
         return new_grammar
 
-    def _create_unique_nonterminal(
-        self, start: str, used_names: Set[str]
-    ) -> NonTerminal:
-        new_start = start
-        while new_start in used_names:
-            new_start += "'"
-        return NonTerminal(new_start)
+    def _remove_duplicate_alternatives(self, grammar: Grammar) -> Grammar:
+        # conversions may produce identical alternatives of a non-terminal, which would
+        # be followed or counted twice; the first of them is kept
+        seen: dict[str, Set[FrozenMultiple]] = {}
+        rules: List[Rule] = []
 
-    def _is_epsilon_generating_grammar(self, grammar: Grammar) -> bool:
         for rule in grammar.ast.ruleset.rules:
-            # if left part of rule is start and rule generates epsilon
-            if (
-                rule.variable.value == grammar.ast.start.variable.value
-                and self._is_epsilon_generating_rule(rule)
-            ):
-                return True
-        return False
+            keys = seen.setdefault(rule.variable.value, set())
+            values: List[Multiple] = []
+            for multiple in rule.values:
+                key = freeze(multiple)
+                if key not in keys:
+                    keys.add(key)
+                    values.append(multiple)
+
+            if len(values) == len(rule.values):
+                rules.append(rule)
+            elif len(values):
+                rules.append(Rule(rule.variable, values))
+
+        return self._with_rules(grammar, grammar.ast.start.variable, rules)
+
+    def _fresh_names(self, grammar: Grammar) -> FreshNames:
+        # names of the grammar are fixed: the sets are replaced, never changed
+        return SYMBOLS.fresh_names(grammar.non_terminals | grammar.terminals)
+
+    def _is_epsilon_generating_grammar(self, grammar: Grammar) -> bool:
+        # the start non-terminal derives epsilon, directly or through other ones
+        return grammar.ast.start.variable.value in (
+            self.get_epsilon_generating_nonterminals(grammar)
+        )
 
-    def _get_epsilon_generating_nonterminals(self, grammar: Grammar) -> List[str]:
+    def get_epsilon_generating_nonterminals(self, grammar: Grammar) -> List[str]:
         grammar = grammar.flatten()
         rules = grammar.ast.ruleset.rules
 
@@ -215,23 +514,29 @@ class Transformer:
             rule = rules[index]
             counter[index] = self._count_nonterminals_in_rule(rule)
 
-            if counter[index] == 0 and self._is_epsilon_generating_rule(rule):
+            if (
+                counter[index] == 0
+                and self._is_epsilon_generating_rule(rule)
+                and not is_epsilon[rule.variable.value]
+            ):
                 # current rule has the form: nonterm -> EPS | EPS | ... | EPS
                 queue.put(rule.variable.value)
                 is_epsilon[rule.variable.value] = True
 
         # Collect `concerned_rules`: for each nonterm find the rules that contain it in description
-        for nonterm in grammar.non_terminals:
-            for rule_index in range(len(rules)):
-                rule = rules[rule_index]
+        for rule_index in range(len(rules)):
+            rule = rules[rule_index]
+
+            # rules with terminals never generate epsilon
+            if self._has_terminals_in_rule(rule):
+                continue
 
-                for multiple in rule.values:
-                    for single in multiple.values:
-                        if (
-                            isinstance(single.object, NonTerminal)
-                            and single.object.value == nonterm
-                        ):
-                            concerned_rules[nonterm].append(rule_index)
+            for multiple in rule.values:
+                for single in multiple.values:
+                    if isinstance(single.object, NonTerminal):
+                        concerned_rules.setdefault(single.object.value, []).append(
+                            rule_index
+                        )
 
         while not queue.empty():
             nonterm = queue.get()
@@ -239,8 +544,8 @@ class Transformer:
             for rule_index in concerned_rules[nonterm]:
                 counter[rule_index] -= 1
 
-                if counter[rule_index] == 0:
-                    rule = rules[rule_index]
+                rule = rules[rule_index]
+                if counter[rule_index] == 0 and not is_epsilon[rule.variable.value]:
                     is_epsilon[rule.variable.value] = True
                     queue.put(rule.variable.value)
 
@@ -263,16 +568,25 @@ class Transformer:
 
         return result
 
+    def _has_terminals_in_rule(self, rule: Rule) -> bool:
+        for multiple in rule.values:
+            for single in multiple.values:
+                if isinstance(single.object, Terminal):
+                    return True
+
+        return False
+
     def _count_epsilon_generating_nonterminals_in_rule(
-        self, rule: Rule, epsilon_generating_nonterms: List[str]
+        self, rule: Rule, epsilon_generating_nonterms: Set[str]
     ) -> int:
         count = 0
 
         for multiple in rule.values:
             for single in multiple.values:
-                if isinstance(
-                    single.object, NonTerminal
-                ) and epsilon_generating_nonterms.count(single.object.value):
+                if (
+                    isinstance(single.object, NonTerminal)
+                    and single.object.value in epsilon_generating_nonterms
+                ):
                     count += 1
 
         return count
@@ -305,18 +619,21 @@ class Transformer:
             if nonterm not in nonterminals_rules:
                 nonterminals_rules[nonterm] = []
 
-            nonterminals_rules[nonterm].append(copy.deepcopy(rule))
+            nonterminals_rules[nonterm].append(rule)
 
         return nonterminals_rules
 
-    def _remove_left_recursion(self, grammar: Grammar) -> Grammar:
+    def _remove_left_recursion(
+        self, grammar: Grammar, fresh_names: Optional[FreshNames] = None
+    ) -> Grammar:
         grammar = grammar.flatten()
+        fresh_names = fresh_names or self._fresh_names(grammar)
 
         nonterminals_rules: dict[str, List[Rule]] = self.get_rules_by_nonterminal(
             grammar
         )
 
-        nonterminals: List[str] = sorted(list(copy.deepcopy(grammar.non_terminals)))
+        nonterminals: List[str] = sorted(grammar.non_terminals)
 
         # for Ai ∈ N
         for i in range(len(nonterminals)):
@@ -326,8 +643,8 @@ class Transformer:
                 Aj = nonterminals[j]
 
                 # for p ∈ { p ∣ Ai → Aj γ }
-                for p_Ai in nonterminals_rules[Ai]:
-                    multiple_Ai = copy.deepcopy(p_Ai.values[0])
+                for p_Ai in nonterminals_rules.get(Ai, []):
+                    multiple_Ai = p_Ai.values[0]
 
                     if (
                         multiple_Ai.values[0].object.value != Aj
@@ -341,17 +658,18 @@ class Transformer:
 
                     # Aj → δ1 ∣ … ∣ δk
                     # Ai → δ1 γ ∣ … ∣ δk γ, where p_Ai = Ai → Aj γ
-                    for p_Aj in nonterminals_rules[Aj]:
-                        delta = copy.deepcopy(p_Aj.values[0])
-                        delta.values += multiple_Ai.values[1:]
+                    for p_Aj in nonterminals_rules.get(Aj, []):
+                        delta = Multiple(p_Aj.values[0].values + multiple_Ai.values[1:])
 
                         new_rule_Ai = Rule(
-                            variable=NonTerminal(Ai), values=[delta]
+                            variable=SYMBOLS.nonterminal(Ai), values=[delta]
                         )  # Ai → δk γ
                         # TODO: should we add `new_rule_Ai` to the set of rules that we are iterating over?
                         grammar.ast.ruleset.append(new_rule_Ai)
 
-            grammar = self._remove_immediate_left_recursion(grammar, NonTerminal(Ai))
+            grammar = self._remove_immediate_left_recursion(
+                grammar, SYMBOLS.nonterminal(Ai), fresh_names
+            )
 
         grammar.non_terminals = get_non_terminals(grammar.ast)
         grammar.terminals = get_terminals(grammar.ast)
@@ -367,34 +685,41 @@ class Transformer:
                         return True
         return False
 
-    def _remove_start_non_terminal_from_right_part(self, grammar: Grammar) -> Grammar:
+    def _remove_start_non_terminal_from_right_part(
+        self, grammar: Grammar, fresh_names: Optional[FreshNames] = None
+    ) -> Grammar:
         start_non_terminal = grammar.ast.start.variable
-        new_grammar = copy.deepcopy(grammar)
 
-        if self._has_start_non_terminal_in_right_part(grammar):
-            new_start_non_terminal = self._create_unique_nonterminal(
-                start_non_terminal.value, grammar.terminals | grammar.non_terminals
-            )
+        if not self._has_start_non_terminal_in_right_part(grammar):
+            return grammar
 
-            new_grammar.ast.start.variable = new_start_non_terminal
-            new_grammar.ast.ruleset.append(
-                Rule(
-                    variable=new_start_non_terminal,
-                    values=[Multiple([Single(start_non_terminal)])],
-                )
+        fresh_names = fresh_names or self._fresh_names(grammar)
+        new_start_non_terminal = fresh_names.nonterminal(start_non_terminal.value)
+        rules = grammar.ast.ruleset.rules + [
+            Rule(
+                variable=new_start_non_terminal,
+                values=[Multiple([Single(start_non_terminal)])],
             )
+        ]
 
-        return new_grammar
+        return Grammar(
+            ast=Root(Start(new_start_non_terminal), Ruleset(rules)),
+            terminals=set(grammar.terminals),
+            non_terminals=set(grammar.non_terminals),
+        )
 
     def _remove_immediate_left_recursion(
-        self, grammar: Grammar, symbol: NonTerminal
+        self,
+        grammar: Grammar,
+        symbol: NonTerminal,
+        fresh_names: Optional[FreshNames] = None,
     ) -> Grammar:
         symbol_rule = Rule(symbol, [])
         new_grammar = grammar.flatten()
 
         for rule in new_grammar.ast.ruleset.rules:
             if rule.variable.value == symbol.value:
-                symbol_rule.values += copy.deepcopy(rule.values)
+                symbol_rule.values += rule.values
 
         # remove rules that are about to be changed
         new_grammar.ast.ruleset.rules = list(
@@ -427,15 +752,22 @@ class Transformer:
                 list(filter(is_symbol_included_immediately, symbol_rule.values)),
             )
         )
+        # A → A derives nothing new
+        alphas = [alpha for alpha in alphas if len(alpha.values)]
 
         # if no immediate recursion exists
         if len(alphas) == 0:
-            return grammar
+            if len(betas) == len(symbol_rule.values):
+                return grammar
+
+            new_grammar.ast.ruleset.append(Rule(symbol, betas))
+            new_grammar.non_terminals = get_non_terminals(new_grammar.ast)
+            new_grammar.terminals = get_terminals(new_grammar.ast)
+            return new_grammar
 
         # creating symbol': S -> S'
-        symbol_ = self._create_unique_nonterminal(
-            symbol.value, new_grammar.non_terminals | new_grammar.terminals
-        )
+        fresh_names = fresh_names or self._fresh_names(new_grammar)
+        symbol_ = fresh_names.nonterminal(symbol.value)
 
         # A → β1 A′ ∣ ... ∣ βm A′ ∣ β1 ∣ ... ∣ βm
         new_symbol_rule = Rule(
@@ -459,34 +791,22 @@ class Transformer:
 
     def _remove_isolated_rules(self, grammar: Grammar) -> Grammar:
         grammar = grammar.unflatten()
+        rules = grammar.ast.ruleset.rules
 
-        rules_count = len(grammar.ast.ruleset.rules)
-
-        isolated_rules: List[Rule] = []
-
-        for i in range(rules_count):
-            rule = grammar.ast.ruleset.rules[i]
-
-            if rule.variable.value == grammar.ast.start.variable.value:
-                continue
-
-            is_isolated = True
-
-            for j in range(rules_count):
-                if i == j:
-                    continue
-
-                for multiple in grammar.ast.ruleset.rules[j].values:
-                    for single in multiple.values:
-                        if single.object.value == rule.variable.value:
-                            is_isolated = False
-
-            if is_isolated:
-                isolated_rules.append(rule)
-
-        for rule in isolated_rules:
-            # TODO: `remove()` may throw!
-            grammar.ast.ruleset.rules.remove(rule)
+        # indices of the rules that mention every value in their right parts
+        mentioned_in: dict[str, Set[int]] = {}
+        for (index, rule) in enumerate(rules):
+            for multiple in rule.values:
+                for single in multiple.values:
+                    mentioned_in.setdefault(single.object.value, set()).add(index)
+
+        # a rule is isolated if no other rule mentions its non-terminal
+        grammar.ast.ruleset.rules = [
+            rule
+            for (index, rule) in enumerate(rules)
+            if rule.variable.value == grammar.ast.start.variable.value
+            or len(mentioned_in.get(rule.variable.value, set()) - {index})
+        ]
 
         grammar.non_terminals = get_non_terminals(grammar.ast)
         grammar.terminals = get_terminals(grammar.ast)